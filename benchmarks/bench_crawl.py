@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Benchmark end-to-end crawls of both scrapers against the local stand-in server
+Each scraper runs in its own process so peak RSS is its own; reports pages/sec,
+parse ms/page, peak RSS and crawl time
+
+Usage:
+    python benchmarks/standin_server.py synthesize
+    python benchmarks/bench_crawl.py --latency 0.02 --error-rate 0.01 --json bench_crawl.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from standin_server import DEFAULT_FIXTURES_DIR, MANIFEST, StandInServer, load_fixtures
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+SCRAPERS = ('list', 'optimized')
+
+# Request rate high enough that the stand-in, not the limiter, sets the pace
+BENCH_RATE = 1000.0
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, if the platform reports it"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def make_scraper(name, journal_path):
+    if name == 'list':
+        from scrape_ai_agents import AIAgentsListScraper
+        return AIAgentsListScraper(requests_per_second=BENCH_RATE, burst=100, cache_dir=None,
+                                   journal_path=journal_path, status_path=None)
+    from scrape_optimized import OptimizedAIAgentsScraper
+    return OptimizedAIAgentsScraper(requests_per_second=BENCH_RATE, burst=100, cache_dir=None,
+                                    journal_path=journal_path, status_path=None)
+
+
+def run_scraper(name, base_url):
+    """Crawl the stand-in with one scraper and return its measurements"""
+    logging.disable(logging.INFO)
+    with tempfile.TemporaryDirectory() as tmp:
+        scraper = make_scraper(name, os.path.join(tmp, 'journal.jsonl'))
+        scraper.base_url = base_url
+
+        fetched = []
+        parse_ms = []
+        get, parse = scraper.engine.get, scraper.parser.parse
+
+        def counted_get(url):
+            response = get(url)
+            fetched.append(response is not None)
+            return response
+
+        def timed_parse(content, **kwargs):
+            started = time.perf_counter()
+            soup = parse(content, **kwargs)
+            parse_ms.append((time.perf_counter() - started) * 1000)
+            return soup
+
+        scraper.engine.get = counted_get
+        scraper.parser.parse = timed_parse
+
+        started = time.perf_counter()
+        agents = scraper.scrape_all() if name == 'optimized' else scraper.scrape_all_agents()
+        elapsed = time.perf_counter() - started
+
+    pages = sum(fetched)
+    return {
+        'scraper': name,
+        'agents': len(agents),
+        'requests': len(fetched),
+        'pages': pages,
+        'failed': len(fetched) - pages,
+        'crawl_s': round(elapsed, 3),
+        'pages_per_s': round(pages / elapsed, 2) if elapsed else None,
+        'parse_ms_mean': round(statistics.mean(parse_ms), 3) if parse_ms else None,
+        'parse_ms_median': round(statistics.median(parse_ms), 3) if parse_ms else None,
+        'peak_rss_mb': round(peak_rss_mb(), 1) if resource is not None else None,
+    }
+
+
+def bench_scraper(name, base_url):
+    """run_scraper in a fresh interpreter"""
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), '--run-scraper', name, base_url],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--fixtures', default=DEFAULT_FIXTURES_DIR, help='fixture directory')
+    arg_parser.add_argument('--scrapers', nargs='+', choices=SCRAPERS, default=list(SCRAPERS))
+    arg_parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    arg_parser.add_argument('--jitter', type=float, default=0.0, help='extra random seconds per response')
+    arg_parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests that fail')
+    arg_parser.add_argument('--error-status', type=int, default=503)
+    arg_parser.add_argument('--seed', type=int, default=0, help='seed for jitter and error injection')
+    arg_parser.add_argument('--json', metavar='PATH', help='also write the results as JSON')
+    arg_parser.add_argument('--run-scraper', nargs=2, metavar=('NAME', 'BASE_URL'), help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+
+    if args.run_scraper:
+        print(json.dumps(run_scraper(*args.run_scraper)))
+        return 0
+
+    if not os.path.exists(os.path.join(args.fixtures, MANIFEST)):
+        print(f"No fixtures in {args.fixtures}, run benchmarks/standin_server.py record or synthesize first")
+        return 1
+
+    pages = load_fixtures(args.fixtures)
+    print(f"Fixtures: {len(pages)} pages, latency {args.latency}s (+{args.jitter}s), "
+          f"error rate {args.error_rate:.1%}")
+    print(f"{'scraper':10} {'agents':>6} {'pages':>6} {'failed':>6} {'crawl s':>8} {'pages/s':>8} "
+          f"{'parse ms':>9} {'peak MB':>8}")
+
+    results = []
+    for name in args.scrapers:
+        # Same seed per scraper, so both see the same error pattern
+        with StandInServer(pages, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                           error_status=args.error_status, seed=args.seed) as server:
+            result = bench_scraper(name, server.base_url)
+            result['server_requests'] = server.requests
+            result['injected_errors'] = server.errors
+        results.append(result)
+        parse_ms = f"{result['parse_ms_mean']:9.2f}" if result['parse_ms_mean'] is not None else f"{'-':>9}"
+        peak = f"{result['peak_rss_mb']:8.1f}" if result['peak_rss_mb'] is not None else f"{'-':>8}"
+        print(f"{name:10} {result['agents']:6} {result['pages']:6} {result['failed']:6} {result['crawl_s']:8.2f} "
+              f"{result['pages_per_s']:8.1f} {parse_ms} {peak}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'latency': args.latency, 'jitter': args.jitter, 'error_rate': args.error_rate,
+                       'results': results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
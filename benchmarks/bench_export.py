@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark size and load time of the compact database exports against the
+pretty-printed database
+
+Usage:
+    python benchmarks/bench_export.py [data/ai_agents_database.json] --repeat 50
+"""
+
+import argparse
+import gzip
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraping.export import export_database, load_columnar
+
+DEFAULT_DATABASE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'data', 'ai_agents_database.json')
+
+
+def load_json(filepath):
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def time_load(load, filepath, repeat):
+    """Load times in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        load(filepath)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('database', nargs='?', default=DEFAULT_DATABASE)
+    parser.add_argument('--repeat', type=int, default=20, help='loads per format')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        written = export_database(args.database, out_dir)
+        candidates = [('pretty json', args.database, load_json), ('min json', written['min'], load_json),
+                      ('columnar', written['columnar'], load_columnar)]
+        if 'msgpack' in written:
+            candidates.append(('msgpack', written['msgpack'], load_columnar))
+
+        reference = load_json(args.database)
+        print(f"{'format':12} {'size KB':>9} {'gzip KB':>9} {'load ms':>9} {'median ms':>10}")
+        for name, path, load in candidates:
+            if load(path) != reference:
+                print(f"{name}: round trip does not match the database")
+                return 1
+            with open(path, 'rb') as f:
+                raw = f.read()
+            timings = time_load(load, path, args.repeat)
+            print(f"{name:12} {len(raw) / 1024:9.1f} {len(gzip.compress(raw)) / 1024:9.1f} "
+                  f"{statistics.mean(timings):9.2f} {statistics.median(timings):10.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
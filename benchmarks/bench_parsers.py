@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-page parse time for each installed BeautifulSoup backend
+Runs over saved listing and agent pages (listing_*.html / agent_*.html)
+
+Usage:
+    python benchmarks/bench_parsers.py --save https://aiagentslist.com
+    python benchmarks/bench_parsers.py --pages benchmarks/pages --repeat 5
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from urllib.parse import urljoin
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraping import FetchEngine, PageParser, RateLimiter, available_parsers
+
+DEFAULT_PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pages')
+
+
+def save_pages(base_url, pages_dir, agent_count=10):
+    """Save a few listing pages and agent pages from the site"""
+    os.makedirs(pages_dir, exist_ok=True)
+    engine = FetchEngine(limiter=RateLimiter(rate=1.0, burst=1))
+    listing_urls = [base_url, f"{base_url}?page=2", f"{base_url}/categories"]
+    agent_paths = []
+
+    for i, url in enumerate(listing_urls):
+        response = engine.get(url)
+        if response is None:
+            continue
+        with open(os.path.join(pages_dir, f"listing_{i}.html"), 'wb') as f:
+            f.write(response.content)
+        soup = PageParser().parse(response.content)
+        for link in soup.find_all('a', href=lambda href: href and href.startswith('/agent/')):
+            if link['href'] not in agent_paths:
+                agent_paths.append(link['href'])
+
+    for i, path in enumerate(agent_paths[:agent_count]):
+        response = engine.get(urljoin(base_url, path))
+        if response is None:
+            continue
+        with open(os.path.join(pages_dir, f"agent_{i}.html"), 'wb') as f:
+            f.write(response.content)
+
+    engine.close()
+
+
+def load_pages(pages_dir):
+    """Read saved pages grouped by kind"""
+    pages = {'listing': [], 'agent': []}
+    for filename in sorted(os.listdir(pages_dir)):
+        kind = filename.split('_')[0]
+        if filename.endswith('.html') and kind in pages:
+            with open(os.path.join(pages_dir, filename), 'rb') as f:
+                pages[kind].append(f.read())
+    return pages
+
+
+def time_backend(backend, pages, repeat):
+    """Per-page parse times in milliseconds"""
+    parser = PageParser(backend)
+    timings = []
+    for _ in range(repeat):
+        for content in pages:
+            started = time.perf_counter()
+            parser.parse(content)
+            timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--pages', default=DEFAULT_PAGES_DIR, help='directory of saved pages')
+    arg_parser.add_argument('--save', metavar='BASE_URL', help='save fresh pages from this site first')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='passes over the page set')
+    args = arg_parser.parse_args()
+
+    if args.save:
+        save_pages(args.save.rstrip('/'), args.pages)
+
+    if not os.path.isdir(args.pages):
+        print(f"No saved pages in {args.pages}, run with --save first")
+        return 1
+
+    pages = load_pages(args.pages)
+    print(f"Pages: {len(pages['listing'])} listing, {len(pages['agent'])} agent")
+    print(f"{'backend':12} {'kind':8} {'mean ms':>9} {'median ms':>10} {'max ms':>8}")
+
+    for backend in available_parsers():
+        for kind, contents in pages.items():
+            if not contents:
+                continue
+            timings = time_backend(backend, contents, args.repeat)
+            print(f"{backend:12} {kind:8} {statistics.mean(timings):9.2f} "
+                  f"{statistics.median(timings):10.2f} {max(timings):8.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
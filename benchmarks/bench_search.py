@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark the full-text search index against a linear scan of the catalog
+The catalog can be scaled up with renamed copies of every agent to show how
+query latency grows with catalog size
+
+Usage:
+    python benchmarks/bench_search.py [data/ai_agents_database.json] --scale 1 10 100
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraping.search_index import SearchIndex, build_search_index
+
+DEFAULT_DATABASE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'data', 'ai_agents_database.json')
+QUERIES = ['code review', 'voice agent', 'marketing automation', 'customer support chatbot',
+           'data analysis', 'free image generat', 'sales', 'resea']
+SEARCH_FIELDS = ('name', 'title', 'description', 'meta_description', 'categories', 'tags')
+
+
+def scaled(database, factor):
+    """Catalog with factor renamed copies of every agent"""
+    agents = [
+        {**agent, 'name': f"{agent['name']}-{copy}" if copy else agent['name']}
+        for copy in range(factor) for agent in database['agents']
+    ]
+    return {**database, 'agents': agents}
+
+
+def scan(agents, query):
+    """Substring scan over every searchable field, as the site's searchAgents does"""
+    term = query.lower()
+    matches = []
+    for agent in agents:
+        for field in SEARCH_FIELDS:
+            value = agent.get(field)
+            values = value if isinstance(value, list) else [value]
+            if any(item and term in item.lower() for item in values):
+                matches.append(agent['name'])
+                break
+    return matches
+
+
+def time_queries(run, repeat):
+    """Per-query latency in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        for query in QUERIES:
+            started = time.perf_counter()
+            run(query)
+            timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def percentile(timings, fraction):
+    return sorted(timings)[min(len(timings) - 1, int(len(timings) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('database', nargs='?', default=DEFAULT_DATABASE)
+    parser.add_argument('--scale', type=int, nargs='+', default=[1, 10, 100], help='catalog size multipliers')
+    parser.add_argument('--repeat', type=int, default=5, help='passes over the query set')
+    args = parser.parse_args()
+
+    with open(args.database, 'r', encoding='utf-8') as f:
+        database = json.load(f)
+
+    print(f"{'agents':>8} {'build ms':>9} {'index KB':>9} {'index p50':>10} {'index p95':>10} "
+          f"{'scan p50':>9} {'scan p95':>9}")
+    for factor in args.scale:
+        catalog = scaled(database, factor)
+
+        started = time.perf_counter()
+        data = build_search_index(catalog)
+        build_ms = (time.perf_counter() - started) * 1000
+        size_kb = len(json.dumps(data, separators=(',', ':'))) / 1024
+        index = SearchIndex(data)
+
+        index_timings = time_queries(lambda query: index.search(query), args.repeat)
+        scan_timings = time_queries(lambda query: scan(catalog['agents'], query), args.repeat)
+        print(f"{len(catalog['agents']):8d} {build_ms:9.1f} {size_kb:9.1f} "
+              f"{statistics.median(index_timings):10.3f} {percentile(index_timings, 0.95):10.3f} "
+              f"{statistics.median(scan_timings):9.3f} {percentile(scan_timings, 0.95):9.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for aiagentslist.com serving recorded HTML fixtures
+Fixtures are a directory of page bodies plus manifest.json mapping request
+paths (with query) to files. Record them from the live site, or synthesize
+them from the scraped database for a fully offline corpus. Sitemaps are served
+with the site's origin rewritten to the stand-in's own address
+
+Usage:
+    python benchmarks/standin_server.py record https://aiagentslist.com --agents 100
+    python benchmarks/standin_server.py synthesize data/ai_agents_database.json
+    python benchmarks/standin_server.py serve --port 8765 --latency 0.05 --error-rate 0.02
+"""
+
+import argparse
+import hashlib
+from datetime import datetime, timezone
+import html
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urljoin, urlparse
+from xml.sax.saxutils import escape
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraping import FetchEngine, PageParser, RateLimiter
+from scraping.indexes import category_slug
+from scraping.sitemap import iter_chunks, iter_sitemap
+
+DEFAULT_FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+DEFAULT_DATABASE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'data', 'ai_agents_database.json')
+MANIFEST = 'manifest.json'
+
+# Absolute URLs in sitemaps point here; the server swaps in its own address
+SITE_ORIGIN = 'https://aiagentslist.com'
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+# Agent cards per synthesized listing page
+PAGE_SIZE = 12
+
+
+def request_path(url):
+    """Path plus query of a URL, as the stand-in sees it"""
+    parsed = urlparse(url)
+    path = parsed.path or '/'
+    return f"{path}?{parsed.query}" if parsed.query else path
+
+
+def fixture_filename(path):
+    """Readable, collision-free file name for a request path"""
+    stem = path.strip('/').replace('/', '_').replace('?', '_').replace('=', '-') or 'index'
+    return f"{stem[:80]}_{hashlib.sha1(path.encode('utf-8')).hexdigest()[:8]}.html"
+
+
+def write_fixtures(pages, directory):
+    """Write {path: body} pages and their manifest"""
+    os.makedirs(directory, exist_ok=True)
+    manifest = {}
+    for path, body in pages.items():
+        filename = fixture_filename(path)
+        with open(os.path.join(directory, filename), 'wb') as f:
+            f.write(body)
+        manifest[path] = filename
+    with open(os.path.join(directory, MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_fixtures(directory):
+    """Read fixtures into {path: body}"""
+    with open(os.path.join(directory, MANIFEST), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    pages = {}
+    for path, filename in manifest.items():
+        with open(os.path.join(directory, filename), 'rb') as f:
+            pages[path] = f.read()
+    return pages
+
+
+def record_fixtures(base_url, directory, max_pages=3, agent_count=50):
+    """Save listing, category and agent pages from the live site"""
+    engine = FetchEngine(limiter=RateLimiter(rate=1.0, burst=1))
+    parser = PageParser()
+    pages = {}
+    agent_paths = []
+
+    def save(url):
+        response = engine.get(url)
+        if response is None:
+            return None
+        pages[request_path(url)] = response.content
+        soup = parser.parse(response.content)
+        for link in soup.find_all('a', href=lambda href: href and href.startswith('/agent/')):
+            if link['href'] not in agent_paths:
+                agent_paths.append(link['href'])
+        return soup
+
+    sitemaps = [f"{base_url}/sitemap.xml"]
+    while sitemaps:
+        response = engine.get(sitemaps.pop(0))
+        if response is not None:
+            pages[request_path(response.url)] = response.content
+            sitemaps += [url for kind, url, lastmod in iter_sitemap(iter_chunks(response.content))
+                         if kind == 'sitemap' and request_path(url) not in pages]
+
+    listing_urls = [base_url]
+    categories = save(f"{base_url}/categories")
+    if categories is not None:
+        for link in categories.find_all('a', href=lambda href: href and href.startswith('/categories/')):
+            listing_urls.append(urljoin(base_url, link['href']))
+
+    for listing_url in dict.fromkeys(listing_urls):
+        for page in range(1, max_pages + 1):
+            soup = save(listing_url if page == 1 else f"{listing_url}?page={page}")
+            if soup is None or not soup.find('a', href=lambda href: href and f"page={page + 1}" in href):
+                break
+
+    for path in agent_paths[:agent_count]:
+        save(urljoin(base_url, path))
+
+    engine.close()
+    return write_fixtures(pages, directory)
+
+
+def listing_html(agents, page, pages, base_path):
+    """A listing page in the shape both scrapers read: agent cards, pagination, a Next link"""
+    cards = ''.join(
+        f'<div class="agent-card"><a href="/agent/{html.escape(agent["name"])}">{html.escape(agent["name"].title())}</a>'
+        f'<p>{html.escape(agent.get("description") or "")}</p><span>{html.escape(agent.get("pricing") or "")}</span></div>'
+        for agent in agents)
+    links = ' '.join(f'<a href="{base_path}?page={number}">{number}</a>' for number in range(1, pages + 1))
+    next_link = f'<a href="{base_path}?page={page + 1}">Next</a>' if page < pages else ''
+    return (f'<html><head><title>AI Agents List</title></head><body><nav><a href="/categories">Categories</a></nav>'
+            f'<main>{cards}</main><div class="pagination">{links} {next_link}</div></body></html>')
+
+
+def agent_html(agent):
+    """An agent page carrying the fields the detail extractors look for"""
+    categories = ''.join(f'<a href="/categories/{category_slug(category)}">{html.escape(category)}</a>'
+                         for category in agent.get('categories') or [])
+    tags = ''.join(f'<a href="#{html.escape(tag.lstrip("#"))}">{html.escape(tag)}</a>' for tag in agent.get('tags') or [])
+    links = ''.join(f'<a href="{html.escape(url)}">Visit</a>' for url in agent.get('external_links') or [])
+    return (f'<html><head><title>{html.escape(agent.get("detailed_title") or agent["name"])}</title>'
+            f'<meta name="description" content="{html.escape(agent.get("meta_description") or "")}">'
+            f'<meta property="og:title" content="{html.escape(agent["name"])}"></head><body>'
+            f'<h1>{html.escape(agent.get("detailed_title") or agent["name"].title())}</h1>'
+            f'<p>{html.escape(agent.get("description") or "")}</p><div>{html.escape(agent.get("pricing_info") or "Free")}</div>'
+            f'<div>{categories}</div><div>{tags}</div><div>{links}</div></body></html>')
+
+
+def sitemap_xml(entries, index=False):
+    """A urlset (or sitemap index) of (path, lastmod) entries on SITE_ORIGIN"""
+    tag = 'sitemap' if index else 'url'
+    body = ''.join(f'<{tag}><loc>{escape(SITE_ORIGIN + path)}</loc>'
+                   + (f'<lastmod>{lastmod}</lastmod>' if lastmod else '') + f'</{tag}>'
+                   for path, lastmod in entries)
+    root = 'sitemapindex' if index else 'urlset'
+    return f'<?xml version="1.0" encoding="UTF-8"?>\n<{root} xmlns="{SITEMAP_NS}">{body}</{root}>\n'.encode('utf-8')
+
+
+def synthesize_fixtures(database_path, directory, page_size=PAGE_SIZE):
+    """Build a corpus from the scraped database: main listing, categories, every agent page and sitemaps"""
+    with open(database_path, 'r', encoding='utf-8') as f:
+        database = json.load(f)
+    agents = database.get('agents', [])
+    pages = {}
+    scraped_at = database.get('metadata', {}).get('scraped_at')
+    # Everything was last modified when the database was scraped
+    lastmod = (datetime.fromisoformat(scraped_at).astimezone(timezone.utc).isoformat(timespec='seconds')
+               if scraped_at else None)
+
+    def add_listing(members, base_path):
+        count = max(1, math.ceil(len(members) / page_size))
+        for page in range(1, count + 1):
+            path = base_path if page == 1 else f"{base_path}?page={page}"
+            chunk = members[(page - 1) * page_size:page * page_size]
+            pages[path] = listing_html(chunk, page, count, base_path).encode('utf-8')
+
+    add_listing(agents, '/')
+
+    category_links = []
+    for category in database.get('categories', []):
+        members = [agent for agent in agents
+                   if category['name'] in {category_slug(name) for name in agent.get('categories') or []}]
+        members = members[:category.get('count') or len(members)]
+        add_listing(members, f"/categories/{category['name']}")
+        category_links.append(f'<a href="/categories/{category["name"]}">{html.escape(category["title"])}</a>')
+    pages['/categories'] = f'<html><body>{"".join(category_links)}</body></html>'.encode('utf-8')
+
+    for agent in agents:
+        pages[f"/agent/{agent['name']}"] = agent_html(agent).encode('utf-8')
+
+    pages['/sitemap-agents.xml'] = sitemap_xml((f"/agent/{agent['name']}", lastmod) for agent in agents)
+    pages['/sitemap-categories.xml'] = sitemap_xml((f"/categories/{category['name']}", lastmod)
+                                                   for category in database.get('categories', []))
+    pages['/sitemap.xml'] = sitemap_xml([('/sitemap-agents.xml', lastmod), ('/sitemap-categories.xml', lastmod)],
+                                        index=True)
+
+    return write_fixtures(pages, directory)
+
+
+class StandInServer:
+    """Threaded HTTP server for fixture pages with injected latency and errors
+
+    Every response waits latency plus up to jitter seconds. A fraction error_rate
+    of requests get error_status instead (with Retry-After if retry_after is set).
+    Pages carry ETags and honour If-None-Match, like the real site's CDN
+    """
+
+    def __init__(self, pages, host='127.0.0.1', port=0, latency=0.0, jitter=0.0, error_rate=0.0,
+                 error_status=503, retry_after=None, seed=0):
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self.pages = {}
+        self.etags = {}
+        for path, body in pages.items():
+            self.put(path, body)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.not_found = 0
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def put(self, path, body):
+        """Serve body at path from now on"""
+        if path.endswith('.xml'):
+            body = body.replace(SITE_ORIGIN.encode('utf-8'), self.base_url.encode('utf-8'))
+        self.pages[path] = body
+        self.etags[path] = '"' + hashlib.md5(body).hexdigest() + '"'
+
+    def _draw(self):
+        """Delay and whether to fail, for one request"""
+        with self.lock:
+            self.requests += 1
+            delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0.0)
+            fail = self.error_rate > 0 and self.random.random() < self.error_rate
+            if fail:
+                self.errors += 1
+        return delay, fail
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                delay, fail = server._draw()
+                if delay:
+                    time.sleep(delay)
+
+                if fail:
+                    self.send_response(server.error_status)
+                    if server.retry_after is not None:
+                        self.send_header('Retry-After', str(server.retry_after))
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                path = self.path
+                if path not in server.pages and path.rstrip('/') in server.pages:
+                    path = path.rstrip('/')
+                body = server.pages.get(path)
+                if body is None:
+                    with server.lock:
+                        server.not_found += 1
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                etag = server.etags[path]
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                content_type = 'application/xml' if path.endswith('.xml') else 'text/html; charset=utf-8'
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('ETag', etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def start(self):
+        """Serve in a background thread"""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.thread is not None:
+            self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--fixtures', default=DEFAULT_FIXTURES_DIR, help='fixture directory')
+    commands = arg_parser.add_subparsers(dest='command', required=True)
+
+    record = commands.add_parser('record', help='record fixtures from the live site')
+    record.add_argument('base_url')
+    record.add_argument('--max-pages', type=int, default=3, help='pages per listing')
+    record.add_argument('--agents', type=int, default=50, help='agent pages to record')
+
+    synthesize = commands.add_parser('synthesize', help='build fixtures from a scraped database')
+    synthesize.add_argument('database', nargs='?', default=DEFAULT_DATABASE)
+
+    serve = commands.add_parser('serve', help='serve fixtures until interrupted')
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    serve.add_argument('--jitter', type=float, default=0.0, help='extra random seconds per response')
+    serve.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests that fail')
+    serve.add_argument('--error-status', type=int, default=503)
+    serve.add_argument('--retry-after', type=int, help='Retry-After seconds sent with injected errors')
+    args = arg_parser.parse_args()
+
+    if args.command == 'record':
+        manifest = record_fixtures(args.base_url.rstrip('/'), args.fixtures, args.max_pages, args.agents)
+        print(f"Recorded {len(manifest)} pages to {args.fixtures}")
+        return 0
+    if args.command == 'synthesize':
+        manifest = synthesize_fixtures(args.database, args.fixtures)
+        print(f"Wrote {len(manifest)} pages to {args.fixtures}")
+        return 0
+
+    if not os.path.exists(os.path.join(args.fixtures, MANIFEST)):
+        print(f"No fixtures in {args.fixtures}, run record or synthesize first")
+        return 1
+    server = StandInServer(load_fixtures(args.fixtures), port=args.port, latency=args.latency, jitter=args.jitter,
+                           error_rate=args.error_rate, error_status=args.error_status, retry_after=args.retry_after)
+    print(f"Serving {len(server.pages)} pages at {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
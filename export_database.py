@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Export the AI agents database in compact forms (minified JSON, columnar JSON, msgpack)
+plus the precomputed lookup indexes used by the site and the full-text search index.
+"""
+
+import argparse
+import os
+import shutil
+
+from scraping.export import export_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export compact forms of the AI agents database")
+    parser.add_argument('database', nargs='?', default=os.path.join("data", "ai_agents_database.json"),
+                        help="database to export (default: data/ai_agents_database.json)")
+    parser.add_argument('--out-dir', help="directory for the exports (default: next to the database)")
+    parser.add_argument('--publish', metavar='PATH',
+                        help="also copy the minified JSON here, e.g. src/data/ai_agents_database.json, "
+                             "with its indexes alongside")
+    args = parser.parse_args()
+
+    original_size = os.path.getsize(args.database)
+    written = export_database(args.database, args.out_dir)
+
+    print(f"{args.database}: {original_size / 1024:.1f} KB")
+    for export_format, path in written.items():
+        size = os.path.getsize(path)
+        print(f"  {export_format:9} {path}: {size / 1024:.1f} KB ({size / original_size * 100:.0f}%)")
+
+    if args.publish:
+        shutil.copyfile(written['min'], args.publish)
+        indexes_path = f"{os.path.splitext(args.publish)[0]}.indexes.json"
+        shutil.copyfile(written['indexes'], indexes_path)
+        print(f"Published minified database to {args.publish} and indexes to {indexes_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,70 +1,80 @@
 #!/usr/bin/env python3
 """
 Monitor the progress of the AI agents scraping process.
+Reads the small status file the scrapers keep up to date (--status), so each
+check costs the same however far the crawl has got.
 """
 
+import argparse
 import os
 import time
-import json
 from datetime import datetime
 
-def monitor_progress():
-    """Monitor scraping progress by checking for output files and process status"""
-    
+from scraping.progress import DEFAULT_STATUS_PATH, read_status
+
+def process_running(pid):
+    """Whether a process with this pid is still alive"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+def format_duration(seconds):
+    """Seconds as h:mm:ss"""
+    if seconds is None:
+        return "unknown"
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}"
+
+def monitor_progress(status_path=DEFAULT_STATUS_PATH):
+    """Print the scraper's live status"""
+
     print(f"=== AI Agents Scraper Monitor ===")
-    print(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print()
-    
-    # Check for running processes
-    print("Checking for running Python processes...")
-    os.system("ps aux | grep python | grep scrape | grep -v grep")
+    print(f"Checked at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print()
-    
-    # Check for output files
-    print("Checking for output files...")
-    
-    # Check data directory
-    data_dir = "./data"
-    if os.path.exists(data_dir):
-        files = os.listdir(data_dir)
-        if files:
-            print(f"Files in data directory: {files}")
-            for file in files:
-                if file.endswith('.json'):
-                    filepath = os.path.join(data_dir, file)
-                    try:
-                        with open(filepath, 'r') as f:
-                            data = json.load(f)
-                            if isinstance(data, dict) and 'agents' in data:
-                                print(f"  {file}: {len(data['agents'])} agents found")
-                            elif isinstance(data, list):
-                                print(f"  {file}: {len(data)} items found")
-                    except Exception as e:
-                        print(f"  {file}: Error reading - {e}")
-        else:
-            print("Data directory is empty")
-    else:
-        print("Data directory not found")
-    
-    # Check for any JSON files in current directory
-    json_files = [f for f in os.listdir('.') if f.endswith('.json') and 'ai_agents' in f.lower()]
-    if json_files:
-        print(f"AI agents JSON files found: {json_files}")
-        for file in json_files:
-            try:
-                with open(file, 'r') as f:
-                    data = json.load(f)
-                    if isinstance(data, dict) and 'agents' in data:
-                        print(f"  {file}: {len(data['agents'])} agents")
-                    elif isinstance(data, list):
-                        print(f"  {file}: {len(data)} items")
-            except Exception as e:
-                print(f"  {file}: Error reading - {e}")
-    else:
-        print("No AI agents JSON files found in current directory")
-    
+
+    status = read_status(status_path)
+    if status is None:
+        print(f"No status file at {status_path}, is a scraper running?")
+        print()
+        print("=== End Monitor ===")
+        return None
+
+    state = status['state']
+    if state == 'running' and not process_running(status['pid']):
+        state = 'stopped (process exited without finishing)'
+
+    total = status['total'] if status['total'] is not None else '?'
+    print(f"Scraper pid {status['pid']}: {state}")
+    print(f"Phase: {status['phase']} (running {format_duration(status['phase_elapsed_s'])}, "
+          f"total {format_duration(status['elapsed_s'])})")
+    print(f"Completed: {status['completed']}/{total}, failed: {status['failed']}, queued: {status['queue_depth']}")
+    eta = format_duration(status['eta_s']) if status['state'] == 'running' else '-'
+    print(f"Throughput: {status['throughput_per_s']:.2f}/s, ETA: {eta}")
+    print(f"Last update: {status['updated_at']}")
+
     print()
     print("=== End Monitor ===")
+    return status
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the live progress of a running scraper")
+    parser.add_argument('--status', default=DEFAULT_STATUS_PATH, help="status file the scraper writes")
+    parser.add_argument('--watch', type=float, metavar='SECONDS',
+                        help="keep checking at this interval until the scraper finishes")
+    args = parser.parse_args()
+
+    status = monitor_progress(args.status)
+    while args.watch and status is not None and status['state'] == 'running' and process_running(status['pid']):
+        time.sleep(args.watch)
+        print()
+        status = monitor_progress(args.status)
 
 if __name__ == "__main__":
-    monitor_progress()
+    main()
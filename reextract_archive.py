@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Rebuild the AI agents database from the raw page archive, without the network.
+Replays the pages a crawl archived (--archive) through the current extractors,
+parsing in one worker process per core, so extractor fixes can be applied to
+past crawls in seconds.
+"""
+
+import argparse
+import os
+
+from scrape_optimized import OptimizedAIAgentsScraper
+from scraping import ArchiveSession, PageArchive
+from scraping.export import export_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-extract the AI agents database from archived pages")
+    parser.add_argument('archive', nargs='?', default=os.path.join("data", "page_archive.warc.gz"),
+                        help="page archive written by the scrapers (default: data/page_archive.warc.gz)")
+    parser.add_argument('--output', default="ai_agents_database.json",
+                        help="database file name under data/ (default: ai_agents_database.json)")
+    parser.add_argument('--base-url', help="site the archive was crawled from (default: its most archived host)")
+    parser.add_argument('--parse-workers', type=int, default=os.cpu_count() or 1,
+                        help="worker processes parsing pages (default: one per core)")
+    parser.add_argument('--metrics', default=os.path.join("data", "reextract_metrics.json"),
+                        help="where to write the run's timing metrics")
+    args = parser.parse_args()
+
+    archive = PageArchive(args.archive)
+    entries = archive.load()
+    if not entries:
+        parser.error(f"{args.archive} has no archived pages")
+
+    # Archived pages answer instantly, so nothing is rate limited and derived results are not reused
+    scraper = OptimizedAIAgentsScraper(requests_per_second=1e6, burst=1e6, max_per_host=64, detail_workers=64,
+                                       parse_workers=args.parse_workers, cache_dir=None, journal_path=os.devnull,
+                                       status_path=None, session=ArchiveSession(archive))
+    scraper.base_url = args.base_url or archive.origins()[0][0]
+
+    try:
+        agents = scraper.scrape_all()
+        # The database describes the site as of the last complete full crawl in the archive, not as of
+        # this run. Without one, every page is only known to be current as of the oldest archived copy
+        dates = [entry['date'] for entry in entries.values()]
+        crawl_started_at = archive.crawl_started_at()
+        scraper.crawl_started_at = crawl_started_at or min(dates)
+        filepath = scraper.save_to_json(args.output, scraped_at=crawl_started_at or max(dates))
+        exports = export_database(filepath, database=scraper.database())
+    finally:
+        scraper.save_metrics(args.metrics)
+        scraper.engine.close()
+
+    print(f"\n✅ Re-extraction completed!")
+    print(f"🗄️  Archived pages: {len(entries)} from {args.archive}")
+    print(f"📊 Total agents: {len(agents)}")
+    print(f"📁 Database: {filepath}")
+    print(f"📦 Compact exports: {', '.join(exports.values())}")
+    missing = scraper.metrics.summary()['status_codes'].get('404', 0)
+    if missing:
+        # Pages that failed or were missing during the crawl were never archived
+        print(f"⚠️  Pages not in the archive: {missing}")
+
+
+if __name__ == "__main__":
+    main()
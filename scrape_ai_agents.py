@@ -4,22 +4,35 @@ AI Agents List Scraper
 Scrapes all AI agents from https://aiagentslist.com/ and saves to JSON database
 """
 
+import argparse
 import requests
-from bs4 import BeautifulSoup
 import json
-import time
-import random
 from urllib.parse import urljoin, urlparse
 import logging
+import sys
 from datetime import datetime
 import os
 
+from scraping import (CheckpointJournal, FetchEngine, HTTPCache, PageArchive, PageParser, ProgressReporter, RateLimiter,
+                      ScraperBase, ScrapeMetrics, URLCanonicalizer, write_database)
+from scraping import extractors, parsing, urls
+from scraping.export import export_database
+from scraping.extractors import scan_agent_page
+from scraping.http_cache import code_version
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-class AIAgentsListScraper:
-    def __init__(self):
+# Results cached with a page are reused only while the code that extracted them is unchanged
+EXTRACTION_VERSION = code_version(sys.modules[__name__], extractors, parsing, urls)
+
+PRICING_KEYWORDS = ('free', 'paid', 'pricing', '$')
+
+class AIAgentsListScraper(ScraperBase):
+    def __init__(self, requests_per_second=1.0, burst=3, parser=None, cache_dir='.http_cache',
+                 journal_path=os.path.join("data", "ai_agents_progress.jsonl"),
+                 status_path=os.path.join("data", "scrape_status.json"), archive_path=None):
         self.base_url = "https://aiagentslist.com"
         self.session = requests.Session()
         self.session.headers.update({
@@ -30,28 +43,66 @@ class AIAgentsListScraper:
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1'
         })
+        # Rate limiting replaces fixed sleeps between requests
+        self.limiter = RateLimiter(rate=requests_per_second, burst=burst)
+        # Conditional requests against the on-disk cache make repeat crawls mostly headers-only
+        self.cache = HTTPCache(cache_dir, derived_version=EXTRACTION_VERSION) if cache_dir else None
+        # Where crawl time goes: fetch/parse/extract latencies, limiter sleeps, statuses, cache hits
+        self.metrics = ScrapeMetrics()
+        # Raw copy of every fetched page, so extraction can be rerun later without the site
+        self.archive = PageArchive(archive_path) if archive_path else None
+        self.engine = FetchEngine(self.session, timeout=30, limiter=self.limiter, cache=self.cache,
+                                  metrics=self.metrics, archive=self.archive)
+        self.parser = PageParser(parser, metrics=self.metrics)
+        # One line per agent with details, so a killed run can resume
+        self.journal = CheckpointJournal(journal_path, key='listing_url')
+        # Small live status file for monitor_progress.py
+        self.progress = ProgressReporter(status_path)
         self.agents_data = []
+        # Metadata of the last saved database
+        self.metadata = None
         self.categories = []
+        # Listings that stopped on a page that could not be fetched: (category or None, page)
+        self.failed_listings = []
+        # When the last crawl began; pages changed after this may have been fetched before the change
+        self.crawl_started_at = None
+        # Every agent and listing URL goes through here before it is fetched or compared
+        self.urls = URLCanonicalizer()
         
-    def delay(self):
-        """Add random delay between requests to be respectful"""
-        time.sleep(random.uniform(1, 3))
+    def get_page(self, url, mode=None):
+        """Get a page with error handling; mode 'categories' parses only the category links"""
+        response = self.engine.get(url)
+        if response is None:
+            return None
+        with self.metrics.time('parse'):
+            if mode == 'categories':
+                return self.parser.parse_category_links(response.content)
+            return self.parser.parse(response.content)
+            
+    def get_listing(self, url, name, summarize):
+        """What summarize(soup) finds on a listing page, or None if the page could not be fetched
         
-    def get_page(self, url):
-        """Get a page with error handling"""
-        try:
-            logger.info(f"Fetching: {url}")
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
-            return BeautifulSoup(response.content, 'html5lib')
-        except requests.RequestException as e:
-            logger.error(f"Error fetching {url}: {e}")
+        Only the agent cards and links are parsed, and unchanged pages reuse the summary
+        stored under name last time
+        """
+        response = self.engine.get(url)
+        if response is None:
             return None
             
+        def build():
+            with self.metrics.time('parse'):
+                soup = self.parser.parse_listing(response.content)
+            if not soup:
+                return None
+            with self.metrics.time('extract'):
+                return summarize(soup)
+            
+        return self.engine.extract(response, name, build)
+            
     def extract_categories(self):
         """Extract all categories from the categories page"""
         categories_url = f"{self.base_url}/categories"
-        soup = self.get_page(categories_url)
+        soup = self.get_page(categories_url, mode='categories')
         
         if not soup:
             return []
@@ -64,7 +115,8 @@ class AIAgentsListScraper:
         for link in category_links:
             href = link.get('href')
             if href and href.startswith('/categories/') and href != '/categories':
-                category_name = href.split('/categories/')[-1]
+                url = self.canonical(href)
+                category_name = urlparse(url).path.partition('/categories/')[2]
                 category_title = link.get_text(strip=True)
                 
                 # Extract count if available
@@ -79,7 +131,7 @@ class AIAgentsListScraper:
                 categories.append({
                     'name': category_name,
                     'title': category_title,
-                    'url': urljoin(self.base_url, href),
+                    'url': url,
                     'count': count
                 })
                 
@@ -88,83 +140,66 @@ class AIAgentsListScraper:
         
     def extract_agent_details(self, agent_url):
         """Extract detailed information from an individual agent page"""
-        soup = self.get_page(agent_url)
-        if not soup:
+        response = self.engine.get(agent_url)
+        if response is None:
             return None
             
+        def build():
+            with self.metrics.time('parse'):
+                soup = self.parser.parse(response.content)
+            if not soup:
+                return None
+            with self.metrics.time('extract'):
+                return self.extract_agent_page(soup, agent_url)
+            
+        # Unchanged pages reuse the details extracted last time
+        return self.engine.extract(response, 'agent_details', build)
+        
+    def extract_agent_page(self, soup, agent_url):
+        """Extract detailed information from a parsed agent page"""
         agent_data = {'url': agent_url}
         
         try:
-            # Extract title
-            title_elem = soup.find('h1')
-            if title_elem:
-                agent_data['title'] = title_elem.get_text(strip=True)
-                
-            # Extract description
-            desc_elem = soup.find('meta', {'name': 'description'})
-            if desc_elem:
-                agent_data['description'] = desc_elem.get('content', '')
+            # Single walk over the tree collects everything below
+            scan = scan_agent_page(soup, self.base_url, pricing_keywords=PRICING_KEYWORDS)
+            
+            if scan['title'] is not None:
+                agent_data['title'] = scan['title']
+            if scan['meta_description'] is not None:
+                agent_data['description'] = scan['meta_description']
                 
-            # Try to find main content description
-            content_divs = soup.find_all('div', class_=lambda x: x and ('description' in x.lower() or 'content' in x.lower()))
-            for div in content_divs:
+            # Main content description
+            for div in scan['content_divs']:
                 text = div.get_text(strip=True)
                 if len(text) > 50:  # Only consider substantial text
                     agent_data['long_description'] = text
                     break
                     
-            # Extract pricing
-            pricing_elem = soup.find(text=lambda text: text and any(word in text.lower() for word in ['free', 'paid', 'pricing', '$']))
-            if pricing_elem:
-                agent_data['pricing'] = pricing_elem.strip()
+            if scan['pricing'] is not None:
+                agent_data['pricing'] = scan['pricing']
                 
-            # Extract tags/categories
-            tag_links = soup.find_all('a', href=lambda href: href and ('/categories/' in href or '/tags/' in href))
-            tags = []
-            categories = []
-            
-            for link in tag_links:
-                href = link.get('href', '')
-                text = link.get_text(strip=True)
-                if '/categories/' in href:
-                    categories.append(text)
-                elif '/tags/' in href:
-                    tags.append(text)
-                    
-            if tags:
-                agent_data['tags'] = tags
-            if categories:
-                agent_data['categories'] = categories
+            # Tags/categories
+            if scan['tags']:
+                agent_data['tags'] = scan['tags']
+            if scan['categories']:
+                agent_data['categories'] = scan['categories']
                 
-            # Extract website/external links
-            external_links = []
-            for link in soup.find_all('a', href=True):
-                href = link.get('href')
-                if href and not href.startswith('/') and not self.base_url in href:
-                    if href.startswith('http'):
-                        external_links.append(href)
-                        
-            if external_links:
-                agent_data['external_links'] = list(set(external_links))
+            # Website/external links
+            if scan['external_links']:
+                agent_data['external_links'] = list(set(scan['external_links']))
                 
-            # Extract any additional metadata
-            meta_tags = soup.find_all('meta')
-            for meta in meta_tags:
-                property_name = meta.get('property') or meta.get('name')
-                content = meta.get('content')
-                if property_name and content:
-                    if 'og:' in property_name or 'twitter:' in property_name:
-                        agent_data[f'meta_{property_name.replace(":", "_")}'] = content
+            # Open Graph and Twitter metadata
+            agent_data.update(scan['social_meta'])
                         
         except Exception as e:
             logger.error(f"Error extracting details from {agent_url}: {e}")
             
         return agent_data
         
-    def extract_agents_from_category(self, category_url, category_name):
+    def extract_agents_from_category(self, category_url, category_name, start_page=1):
         """Extract all agents from a category page"""
         agents = []
-        page = 1
+        page = start_page
         
         while True:
             if page == 1:
@@ -172,47 +207,22 @@ class AIAgentsListScraper:
             else:
                 url = f"{category_url}?page={page}"
                 
-            soup = self.get_page(url)
-            if not soup:
+            page_agents = self.get_listing(url, 'category_listing',
+                                           lambda soup: self.category_page_agents(soup, category_name, page))
+            if page_agents is None:
+                # A 404 past the last page ends the listing; only transient failures get another pass
+                if self.engine.failed_transiently(url):
+                    self.failed_listings.append(({'url': category_url, 'name': category_name}, page))
                 break
                 
-            # Find agent links on this page
-            agent_links = soup.find_all('a', href=lambda href: href and '/agent/' in href)
-            
-            if not agent_links:
+            if not page_agents:
                 logger.info(f"No more agents found on page {page} for category {category_name}")
                 break
                 
-            logger.info(f"Found {len(agent_links)} agents on page {page} for category {category_name}")
-            
-            for link in agent_links:
-                href = link.get('href')
-                if href and '/agent/' in href:
-                    agent_url = urljoin(self.base_url, href)
-                    
-                    # Extract basic info from the listing
-                    agent_data = {
-                        'listing_url': agent_url,
-                        'category': category_name,
-                        'page': page
-                    }
-                    
-                    # Get title from link text or nearby elements
-                    title = link.get_text(strip=True)
-                    if title:
-                        agent_data['title'] = title
-                        
-                    # Try to get description from parent elements
-                    parent = link.parent
-                    if parent:
-                        desc_text = parent.get_text(strip=True)
-                        if len(desc_text) > len(title) + 10:
-                            agent_data['short_description'] = desc_text
-                            
-                    agents.append(agent_data)
+            logger.info(f"Found {len(page_agents)} agents on page {page} for category {category_name}")
+            agents.extend(page_agents)
                     
             page += 1
-            self.delay()  # Be respectful with requests
             
             # Safety check to avoid infinite loops
             if page > 50:
@@ -221,10 +231,43 @@ class AIAgentsListScraper:
                 
         return agents
         
-    def extract_agents_from_main_page(self):
+    def category_page_agents(self, soup, category_name, page):
+        """Agents linked from a parsed category listing page"""
+        agents = []
+        
+        # Find agent links on this page
+        for link in soup.find_all('a', href=lambda href: href and '/agent/' in href):
+            href = link.get('href')
+            if href and '/agent/' in href:
+                agent_url = urljoin(self.base_url, href)
+                
+                # Extract basic info from the listing
+                agent_data = {
+                    'listing_url': agent_url,
+                    'category': category_name,
+                    'page': page
+                }
+                
+                # Get title from link text or nearby elements
+                title = link.get_text(strip=True)
+                if title:
+                    agent_data['title'] = title
+                    
+                # Try to get description from parent elements
+                parent = link.parent
+                if parent:
+                    desc_text = parent.get_text(strip=True)
+                    if len(desc_text) > len(title) + 10:
+                        agent_data['short_description'] = desc_text
+                        
+                agents.append(agent_data)
+                
+        return agents
+        
+    def extract_agents_from_main_page(self, start_page=1):
         """Extract agents from the main page"""
         agents = []
-        page = 1
+        page = start_page
         
         while True:
             if page == 1:
@@ -232,52 +275,60 @@ class AIAgentsListScraper:
             else:
                 url = f"{self.base_url}?page={page}"
                 
-            soup = self.get_page(url)
-            if not soup:
+            summary = self.get_listing(url, 'main_listing', lambda soup: self.main_page_summary(soup, page))
+            if summary is None:
+                if self.engine.failed_transiently(url):
+                    self.failed_listings.append((None, page))
                 break
                 
-            # Find agent links
-            agent_links = soup.find_all('a', href=lambda href: href and '/agent/' in href)
-            
-            if not agent_links:
+            if not summary['agents']:
                 logger.info(f"No more agents found on main page {page}")
                 break
                 
-            logger.info(f"Found {len(agent_links)} agents on main page {page}")
-            
-            for link in agent_links:
-                href = link.get('href')
-                if href and '/agent/' in href:
-                    agent_url = urljoin(self.base_url, href)
-                    
-                    agent_data = {
-                        'listing_url': agent_url,
-                        'source': 'main_page',
-                        'page': page
-                    }
-                    
-                    title = link.get_text(strip=True)
-                    if title:
-                        agent_data['title'] = title
-                        
-                    agents.append(agent_data)
+            logger.info(f"Found {len(summary['agents'])} agents on main page {page}")
+            agents.extend(summary['agents'])
                     
-            # Check for next page
-            next_link = soup.find('a', text='Next') or soup.find('a', {'aria-label': 'Next'})
-            if not next_link:
+            if not summary['has_next']:
                 break
                 
             page += 1
-            self.delay()
             
             if page > 50:  # Safety limit
                 break
                 
         return agents
         
-    def scrape_all_agents(self):
+    def main_page_summary(self, soup, page):
+        """Agents linked from a parsed main listing page, and whether it links to a next page"""
+        agents = []
+        
+        # Find agent links
+        for link in soup.find_all('a', href=lambda href: href and '/agent/' in href):
+            href = link.get('href')
+            if href and '/agent/' in href:
+                agent_url = urljoin(self.base_url, href)
+                
+                agent_data = {
+                    'listing_url': agent_url,
+                    'source': 'main_page',
+                    'page': page
+                }
+                
+                title = link.get_text(strip=True)
+                if title:
+                    agent_data['title'] = title
+                    
+                agents.append(agent_data)
+                
+        # Check for next page
+        next_link = soup.find('a', text='Next') or soup.find('a', {'aria-label': 'Next'})
+        return {'agents': agents, 'has_next': bool(next_link)}
+        
+    def scrape_all_agents(self, resume=False):
         """Main scraping function"""
         logger.info("Starting AI Agents List scraping...")
+        self.crawl_started_at = datetime.now().isoformat()
+        self.engine.start_crawl(self.crawl_started_at)
         
         # Get categories
         self.categories = self.extract_categories()
@@ -286,27 +337,41 @@ class AIAgentsListScraper:
         all_agents = []
         
         # First, get agents from main page
+        self.progress.phase('listings', total=len(self.categories) + 1)
         logger.info("Scraping main page...")
         main_page_agents = self.extract_agents_from_main_page()
         all_agents.extend(main_page_agents)
+        self.progress.advance(queued=len(self.categories))
         
         # Then scrape each category
-        for category in self.categories:
+        for i, category in enumerate(self.categories):
             logger.info(f"Scraping category: {category['title']}")
-            self.delay()
             
             category_agents = self.extract_agents_from_category(
                 category['url'], 
                 category['name']
             )
             all_agents.extend(category_agents)
+            self.progress.advance(queued=len(self.categories) - i - 1)
             
-        # Remove duplicates based on URL
+        # Listings cut short by a failed page carry on from it once everything else is done
+        failed_listings, self.failed_listings = self.failed_listings, []
+        for category, page in failed_listings:
+            if category is None:
+                logger.info(f"Retrying main page from page {page}")
+                all_agents.extend(self.extract_agents_from_main_page(start_page=page))
+            else:
+                logger.info(f"Retrying category {category['name']} from page {page}")
+                all_agents.extend(self.extract_agents_from_category(category['url'], category['name'], start_page=page))
+            
+        # Remove duplicates based on canonical URL, before any detail page is requested
         seen_urls = set()
         unique_agents = []
         
         for agent in all_agents:
             url = agent.get('listing_url')
+            if url:
+                url = agent['listing_url'] = self.canonical(url)
             if url and url not in seen_urls:
                 seen_urls.add(url)
                 unique_agents.append(agent)
@@ -315,26 +380,64 @@ class AIAgentsListScraper:
         
         # Now get detailed information for each agent
         detailed_agents = []
+        self.agents_data = detailed_agents
         
-        for i, agent in enumerate(unique_agents):
-            logger.info(f"Getting details for agent {i+1}/{len(unique_agents)}: {agent.get('title', 'Unknown')}")
-            
-            detailed_info = self.extract_agent_details(agent['listing_url'])
-            if detailed_info:
+        completed = {self.canonical(url): agent for url, agent in self.journal.load().items()} if resume else {}
+        self.journal.open(resume=resume)
+        self.progress.phase('details', total=len(unique_agents))
+        dead_letters = []
+        reused = 0
+        failed = 0
+        
+        try:
+            for i, agent in enumerate(unique_agents):
+                if agent['listing_url'] in completed:
+                    detailed_agents.append(completed[agent['listing_url']])
+                    reused += 1
+                    self.progress.advance(queued=len(unique_agents) - i - 1)
+                    continue
+                    
+                logger.info(f"Getting details for agent {i+1}/{len(unique_agents)}: {agent.get('title', 'Unknown')}")
+                
+                detailed_info = self.extract_agent_details(agent['listing_url'])
+                if detailed_info is None:
+                    # Transient failures are retried after the other agents; kept without details if they fail again
+                    if self.engine.failed_transiently(agent['listing_url']):
+                        dead_letters.append(len(detailed_agents))
+                    else:
+                        failed += 1
+                        self.progress.advance(completed=0, failed=1, queued=len(unique_agents) - i - 1)
+                    detailed_agents.append(agent)
+                    continue
+                    
                 # Combine basic info with detailed info
                 combined_agent = {**agent, **detailed_info}
                 detailed_agents.append(combined_agent)
-            else:
-                detailed_agents.append(agent)
+                self.journal.append(combined_agent)
+                self.progress.advance(queued=len(unique_agents) - i - 1)
                 
-            self.delay()
+            if dead_letters:
+                logger.warning(f"Retrying {len(dead_letters)} agents whose detail pages failed")
+            for position in dead_letters:
+                agent = detailed_agents[position]
+                detailed_info = self.extract_agent_details(agent['listing_url'])
+                if detailed_info is None:
+                    # Left out of the journal so --resume tries it again
+                    failed += 1
+                    self.progress.advance(completed=0, failed=1)
+                    continue
+                detailed_agents[position] = {**agent, **detailed_info}
+                self.journal.append(detailed_agents[position])
+                self.progress.advance()
+        finally:
+            self.journal.close()
+            
+        if failed or reused or self.engine.dead_letters:
+            # Pages fetched in an earlier run, or not at all, may have changed since this run began
+            self.crawl_started_at = None
+        else:
+            self.engine.complete_crawl(self.crawl_started_at)
             
-            # Save progress every 50 agents
-            if (i + 1) % 50 == 0:
-                self.save_progress(detailed_agents, f"progress_{i+1}")
-                
-        self.agents_data = detailed_agents
-        
         return detailed_agents
         
     def save_progress(self, data, filename_suffix=""):
@@ -354,21 +457,19 @@ class AIAgentsListScraper:
         os.makedirs("data", exist_ok=True)
         filepath = os.path.join("data", filename)
         
-        # Create the final database structure
-        database = {
-            'metadata': {
-                'scraped_at': datetime.now().isoformat(),
-                'total_agents': len(self.agents_data),
-                'total_categories': len(self.categories),
-                'source_url': self.base_url,
-                'scraper_version': '1.0'
-            },
-            'categories': self.categories,
-            'agents': self.agents_data
+        metadata = {
+            'scraped_at': datetime.now().isoformat(),
+            'total_agents': len(self.agents_data),
+            'total_categories': len(self.categories),
+            'source_url': self.base_url,
+            'scraper_version': '1.0',
+            # None when this run left pages unfetched; discovery then refetches them all
+            'crawl_started_at': self.crawl_started_at
         }
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(database, f, indent=2, ensure_ascii=False)
+        # Agents are streamed one at a time into a temp file that is renamed into place
+        write_database(filepath, metadata, self.categories, iter(self.agents_data))
+        self.metadata = metadata
             
         logger.info(f"Database saved to {filepath}")
         logger.info(f"Total agents scraped: {len(self.agents_data)}")
@@ -377,30 +478,55 @@ class AIAgentsListScraper:
         return filepath
 
 def main():
-    scraper = AIAgentsListScraper()
+    parser = argparse.ArgumentParser(description="Scrape all AI agents from aiagentslist.com")
+    parser.add_argument('--resume', action='store_true',
+                        help="skip agents already recorded in the progress journal")
+    parser.add_argument('--metrics', default=os.path.join("data", "scrape_metrics.json"),
+                        help="where to write the run's timing and request metrics")
+    parser.add_argument('--prometheus', metavar='PATH',
+                        help="also write the metrics in Prometheus text format")
+    parser.add_argument('--status', default=os.path.join("data", "scrape_status.json"),
+                        help="live progress file read by monitor_progress.py")
+    parser.add_argument('--archive', default=os.path.join("data", "page_archive.warc.gz"),
+                        help="raw page archive appended to for reextract_archive.py")
+    parser.add_argument('--no-archive', action='store_true',
+                        help="do not keep raw copies of fetched pages")
+    args = parser.parse_args()
+    
+    scraper = AIAgentsListScraper(status_path=args.status, archive_path=None if args.no_archive else args.archive)
     
     try:
         # Scrape all agents
-        agents = scraper.scrape_all_agents()
+        agents = scraper.scrape_all_agents(resume=args.resume)
         
         # Save to JSON
         filepath = scraper.save_to_json()
+        exports = export_database(filepath, database=scraper.database())
+        scraper.progress.finish()
         
         print(f"\n✅ Scraping completed successfully!")
         print(f"📊 Total agents scraped: {len(agents)}")
         print(f"📁 Database saved to: {filepath}")
+        print(f"📦 Compact exports: {', '.join(exports.values())}")
+        print(f"🔗 Duplicate URL variants folded: {scraper.urls.stats()['collisions']}")
         
     except KeyboardInterrupt:
-        logger.info("Scraping interrupted by user")
+        scraper.progress.finish('interrupted')
+        logger.info(f"Scraping interrupted by user, rerun with --resume to continue from {scraper.journal.path}")
         if scraper.agents_data:
             scraper.save_progress(scraper.agents_data, "interrupted")
             print("Progress saved before interruption")
     except Exception as e:
         logger.error(f"Scraping failed: {e}")
+        scraper.progress.finish('failed')
         if scraper.agents_data:
             scraper.save_progress(scraper.agents_data, "error")
             print("Progress saved after error")
         raise
+    finally:
+        scraper.save_metrics(args.metrics, args.prometheus)
+        # Closes the page archive along with the worker pool and connections
+        scraper.engine.close()
 
 if __name__ == "__main__":
     main()
@@ -4,65 +4,142 @@ Optimized AI Agents List Scraper
 Efficiently scrapes all AI agents from https://aiagentslist.com/
 """
 
+import argparse
+import asyncio
 import requests
-from bs4 import BeautifulSoup
 import json
-import time
-import random
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlparse
+from xml.etree.ElementTree import ParseError
 import logging
 from datetime import datetime
+import math
 import os
 import re
+import sys
+
+from scraping import (CheckpointJournal, CrawlFrontier, FetchEngine, HTTPCache, PageArchive, PageParser, ParsePool,
+                      ProgressReporter, RateLimiter, ScraperBase, ScrapeMetrics, URLCanonicalizer,
+                      write_database)
+from scraping import extractors, parsing, urls
+from scraping.export import export_database
+from scraping.extractors import scan_agent_page, scan_listing_card
+from scraping.http_cache import code_version
+from scraping.sitemap import iter_chunks, iter_sitemap
+from scraping.urls import agent_key
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-class OptimizedAIAgentsScraper:
-    def __init__(self):
+# Results cached with a page are reused only while the code that extracted them is unchanged
+EXTRACTION_VERSION = code_version(sys.modules[__name__], extractors, parsing, urls)
+
+# Listing card fields compared by incremental runs
+LISTING_FIELDS = ('title', 'description', 'pricing')
+
+# Sitemap indexes nested deeper than this are not followed
+MAX_SITEMAP_DEPTH = 2
+
+# Scraper instance owned by a parse worker process, set up by init_parse_worker
+_worker_scraper = None
+
+def init_parse_worker(base_url, parser):
+    """Give a parse worker process its own network-free scraper for extraction"""
+    global _worker_scraper
+    _worker_scraper = OptimizedAIAgentsScraper(parser=parser, cache_dir=None)
+    _worker_scraper.base_url = base_url
+
+def run_parse_worker(method, content, *args):
+    """Call one of the scraper's parse_*_content methods inside a worker process
+    
+    Returns the result with the parse/extract timings and counters (parser
+    fallbacks) it recorded, for the parent's metrics
+    """
+    value = getattr(_worker_scraper, method)(content, *args)
+    metrics = _worker_scraper.metrics
+    return value, metrics.take_timings(), metrics.take_counters()
+
+class OptimizedAIAgentsScraper(ScraperBase):
+    def __init__(self, max_per_host=4, requests_per_second=4.0, burst=8, parser=None, detail_workers=8,
+                 parse_workers=0, cache_dir='.http_cache', journal_path=os.path.join("data", "ai_agents_details.jsonl"),
+                 status_path=os.path.join("data", "scrape_status.json"), archive_path=None, session=None):
         self.base_url = "https://aiagentslist.com"
-        self.session = requests.Session()
+        # A stand-in session (such as an ArchiveSession replaying a past crawl) replaces the network
+        self.session = session or requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
             'Connection': 'keep-alive'
         })
+        # Token bucket pacing requests (4/s with bursts of 8 by default), slowing down when the server does
+        self.limiter = RateLimiter(rate=requests_per_second, burst=burst)
+        # Conditional requests against the on-disk cache make repeat crawls mostly headers-only
+        self.cache = HTTPCache(cache_dir, derived_version=EXTRACTION_VERSION) if cache_dir else None
+        # Where crawl time goes: fetch/parse/extract latencies, limiter sleeps, statuses, cache hits
+        self.metrics = ScrapeMetrics()
+        # Raw copy of every fetched page, so extraction can be rerun later without the site
+        self.archive = PageArchive(archive_path) if archive_path else None
+        # Shared connection pool with a cap on in-flight requests per host
+        self.engine = FetchEngine(self.session, max_per_host=max_per_host, timeout=15, limiter=self.limiter,
+                                  cache=self.cache, metrics=self.metrics, archive=self.archive)
+        self.parser = PageParser(parser, metrics=self.metrics)
+        # Parse/extract in worker processes once parsing, not the network, is the bottleneck
+        self.parse_workers = parse_workers
+        self.parse_pool = None
+        self.detail_workers = detail_workers
+        # One line per enriched agent, so a killed run can resume the detail phase
+        self.journal = CheckpointJournal(journal_path)
+        # Small live status file for monitor_progress.py
+        self.progress = ProgressReporter(status_path)
         self.agents_data = []
+        # Metadata of the last saved database
+        self.metadata = None
         self.categories = []
+        self.changes = None
+        # When the last crawl began; pages changed after this may have been fetched before the change.
+        # Runs that leave pages unfetched keep the stored database's value instead
+        self.crawl_started_at = None
+        # Detail records taken from the journal of an earlier, interrupted run
+        self.reused_details = 0
+        # Every agent and listing URL goes through here before it is fetched or compared
+        self.urls = URLCanonicalizer()
         
-    def delay(self):
-        """Add short delay between requests"""
-        time.sleep(random.uniform(0.5, 1.5))
+    def parse_page(self, content, mode=None):
+        """Parse raw page content; mode 'listing' or 'categories' builds only what those extractors read"""
+        with self.metrics.time('parse'):
+            if mode == 'listing':
+                return self.parser.parse_listing(content)
+            if mode == 'categories':
+                return self.parser.parse_category_links(content)
+            return self.parser.parse(content)
         
-    def get_page(self, url):
+    def get_page(self, url, mode=None):
         """Get a page with error handling"""
-        try:
-            logger.info(f"Fetching: {url}")
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
-            return BeautifulSoup(response.content, 'html5lib')
-        except Exception as e:
-            logger.error(f"Error fetching {url}: {e}")
+        response = self.engine.get(url)
+        if response is None:
             return None
-            
+        return self.parse_page(response.content, mode)
+        
     def extract_categories(self):
         """Extract all categories"""
         categories_url = f"{self.base_url}/categories"
-        soup = self.get_page(categories_url)
+        soup = self.get_page(categories_url, mode='categories')
         
         if not soup:
             return []
             
         categories = []
+        seen = set()
         
         # Look for category cards/links
         for link in soup.find_all('a', href=True):
             href = link.get('href')
             if href and '/categories/' in href and href != '/categories':
-                category_name = href.split('/categories/')[-1]
-                if category_name and category_name not in [cat['name'] for cat in categories]:
+                url = self.canonical(href)
+                category_name = urlparse(url).path.partition('/categories/')[2]
+                if category_name and category_name not in seen:
+                    seen.add(category_name)
                     text = link.get_text(strip=True)
                     
                     # Extract count from text
@@ -74,7 +151,7 @@ class OptimizedAIAgentsScraper:
                     categories.append({
                         'name': category_name,
                         'title': text,
-                        'url': urljoin(self.base_url, href),
+                        'url': url,
                         'count': count
                     })
                     
@@ -84,6 +161,8 @@ class OptimizedAIAgentsScraper:
     def extract_agent_info_from_listing(self, soup, source_info=""):
         """Extract agent info from listing page"""
         agents = []
+        # Cards hold several links at times; each is scanned once
+        cards = {}
         
         # Find all agent links
         agent_links = soup.find_all('a', href=lambda href: href and '/agent/' in href)
@@ -108,95 +187,226 @@ class OptimizedAIAgentsScraper:
             if title:
                 agent_data['title'] = title
                 
-            # Look for description in parent elements
             parent = link.find_parent()
-            if parent:
-                # Try to find description text
-                desc_candidates = parent.find_all(text=True)
-                description_parts = []
-                
-                for text in desc_candidates:
-                    text = text.strip()
-                    if len(text) > 20 and text not in [title, agent_name]:
-                        # Check if it looks like a description
-                        if any(word in text.lower() for word in ['ai', 'tool', 'help', 'automat', 'generat', 'creat']):
-                            description_parts.append(text)
-                            
-                if description_parts:
-                    agent_data['description'] = ' '.join(description_parts[:2])  # Take first 2 parts
-                    
-            # Look for pricing info
-            pricing_text = parent.get_text() if parent else ""
-            if any(word in pricing_text.lower() for word in ['free', 'paid', '$', 'pricing']):
-                pricing_match = re.search(r'(free|paid|free \+ paid|\$[\d,]+)', pricing_text, re.IGNORECASE)
-                if pricing_match:
-                    agent_data['pricing'] = pricing_match.group(1)
+            if not parent:
+                agents.append(agent_data)
+                continue
+            if id(parent) not in cards:
+                cards[id(parent)] = scan_listing_card(parent)
+            candidates, pricing = cards[id(parent)]
+            
+            description_parts = [text for text in candidates if text != title and text != agent_name][:2]
+            if description_parts:
+                agent_data['description'] = ' '.join(description_parts)
+            if pricing:
+                agent_data['pricing'] = pricing
                     
             agents.append(agent_data)
             
         return agents
         
-    def scrape_category_pages(self, category_url, category_name, max_pages=10):
-        """Scrape all pages of a category"""
-        all_agents = []
+    def listing_page_url(self, listing_url, page):
+        """URL of a page of a paginated listing"""
+        if page == 1:
+            return listing_url
+        return f"{listing_url}?page={page}"
         
-        for page in range(1, max_pages + 1):
-            if page == 1:
-                url = category_url
-            else:
-                url = f"{category_url}?page={page}"
-                
-            soup = self.get_page(url)
-            if not soup:
-                break
-                
-            agents = self.extract_agent_info_from_listing(soup, f"category:{category_name}:page:{page}")
-            
-            if not agents:
-                logger.info(f"No agents found on page {page} for {category_name}")
-                break
+    def has_next_page(self, soup, page, kind):
+        """Whether a listing page links to the page after it"""
+        if kind == 'main':
+            # Look for pagination
+            pagination = soup.find('div', class_=lambda x: x and 'pagination' in x.lower())
+            return bool(pagination) and str(page + 1) in pagination.get_text()
+        # Check if there's a next page
+        return bool(soup.find('a', href=lambda href: href and 'page=' in href and f"page={page+1}" in href))
+        
+    def last_linked_page(self, soup, kind):
+        """Highest page number a listing page links to"""
+        if kind == 'main':
+            pagination = soup.find('div', class_=lambda x: x and 'pagination' in x.lower())
+            numbers = re.findall(r'\d+', pagination.get_text()) if pagination else []
+        else:
+            numbers = [match.group(1) for link in soup.find_all('a', href=True)
+                       for match in [re.search(r'page=(\d+)', link['href'])] if match]
+        return max((int(number) for number in numbers), default=1)
+        
+    def planned_last_page(self, summary, listing):
+        """Last page a listing should span, from its advertised count or its pagination links"""
+        page_size = len(summary['agents'])
+        if listing['count'] and page_size:
+            last = math.ceil(listing['count'] / page_size)
+        else:
+            last = summary['last_linked']
+        return min(listing['max_pages'], last)
+        
+    def new_listing(self, kind, listing_url, name=None, group=0, max_pages=10, count=None):
+        """Crawl state for one paginated listing"""
+        return {
+            'kind': kind,
+            'listing_url': listing_url,
+            'name': name,
+            'group': group,
+            'max_pages': max_pages,
+            'count': count,
+            'end': max_pages,  # Lowered once the real last page is known
+            'committed': 0,
+            'pages': {}
+        }
+        
+    def listing_source(self, listing, page):
+        """Source label recorded on agents found on a listing page"""
+        if listing['kind'] == 'main':
+            return f"main:page:{page}"
+        return f"category:{listing['name']}:page:{page}"
+        
+    def summarize_listing_page(self, soup, listing, page):
+        """Agents on a listing page plus the pagination facts the crawl needs"""
+        return {
+            'agents': self.extract_agent_info_from_listing(soup, self.listing_source(listing, page)),
+            'has_next': self.has_next_page(soup, page, listing['kind']),
+            'last_linked': self.last_linked_page(soup, listing['kind']) if page == 1 else page
+        }
+        
+    def parse_listing_content(self, content, listing, page):
+        """Summary of a raw listing page, or None if it does not parse"""
+        soup = self.parse_page(content, mode='listing')
+        if not soup:
+            return None
+        with self.metrics.time('extract'):
+            return self.summarize_listing_page(soup, listing, page)
+        
+    def parse_agent_content(self, content, agent_url):
+        """Details from a raw agent page"""
+        soup = self.parse_page(content)
+        if not soup:
+            return {}
+        with self.metrics.time('extract'):
+            return self.extract_detailed_agent_info(soup, agent_url)
+        
+    async def extract_page(self, response, name, method, *args):
+        """Run a parse_*_content method on a fetched page, reusing the stored result if the page was not modified
+        
+        With a parse pool the raw bytes go to a worker process and a plain dict comes back;
+        otherwise parsing runs on the fetch engine's threads
+        """
+        if self.cache is not None:
+            value = self.cache.get_derived(response, name)
+            if value is not None:
+                self.metrics.count('extract_reused')
+                return value
                 
-            logger.info(f"Found {len(agents)} agents on page {page} for {category_name}")
-            all_agents.extend(agents)
+        if self.parse_pool:
+            value, timings, counters = await self.parse_pool.run(run_parse_worker, method, response.content, *args)
+            self.metrics.merge_timings(timings)
+            self.metrics.merge_counters(counters)
+        else:
+            value = await self.engine.to_thread(getattr(self, method), response.content, *args)
             
-            # Check if there's a next page
-            if not soup.find('a', href=lambda href: href and 'page=' in href and f"page={page+1}" in href):
-                break
-                
-            self.delay()
+        if self.cache is not None:
+            await self.engine.to_thread(self.cache.put_derived, response, name, value)
+        return value
+        
+    async def scrape_listing_page(self, listing, page):
+        """Fetch and summarize one listing page, or None if it could not be fetched"""
+        response = await self.engine.fetch(self.listing_page_url(listing['listing_url'], page))
+        if response is None:
+            return None
             
-        return all_agents
+        # Only what summarizing needs crosses to a worker, not the listing's page buffer
+        labels = {'kind': listing['kind'], 'name': listing['name']}
+        return await self.extract_page(response, 'listing', 'parse_listing_content', labels, page)
         
-    def scrape_main_pages(self, max_pages=20):
-        """Scrape main listing pages"""
-        all_agents = []
+    async def crawl_listings(self, listings, on_page):
+        """Crawl listings through one frontier, fetching all planned pages of each at once
         
-        for page in range(1, max_pages + 1):
-            if page == 1:
-                url = self.base_url
-            else:
-                url = f"{self.base_url}?page={page}"
+        on_page(listing, page, agents) is called in page order per listing, and only
+        for pages up to the listing's real end. Pages that fail are dead-lettered and
+        fetched once more after everything else, so one timeout cannot cut a listing short
+        """
+        frontier = CrawlFrontier(self.canonical)
+        dead_letters = []
+        final_pass = False
+        
+        def queue_page(listing, page):
+            # First pages of every listing go ahead of deeper pagination
+            frontier.add(self.listing_page_url(listing['listing_url'], page), priority=page, page=page, listing=listing)
+            
+        def commit_pages(listing):
+            # Pages complete out of order; hand them on in order and drop anything past the end
+            while listing['committed'] < listing['end'] and listing['committed'] + 1 in listing['pages']:
+                page = listing['committed'] + 1
+                agents, has_next = listing['pages'].pop(page)
+                listing['committed'] = page
                 
-            soup = self.get_page(url)
-            if not soup:
-                break
+                if not agents:
+                    logger.info(f"No agents found on {self.listing_source(listing, page)}")
+                else:
+                    logger.info(f"Found {len(agents)} agents on {self.listing_source(listing, page)}")
+                    on_page(listing, page, agents)
+                    
+                if not agents or not has_next:
+                    listing['end'] = page
+                elif page < listing['max_pages']:
+                    # Keep following pagination past the planned pages
+                    queue_page(listing, page + 1)
+                    
+            if listing['committed'] >= listing['end']:
+                listing['pages'].clear()
                 
-            agents = self.extract_agent_info_from_listing(soup, f"main:page:{page}")
-            
-            if not agents:
-                logger.info(f"No agents found on main page {page}")
-                break
+        async def crawl_page(task):
+            listing = task['listing']
+            page = task['page']
+            if page > listing['end']:
+                self.progress.advance(queued=frontier.queue.qsize())
+                return  # Speculative page past the real end
                 
-            logger.info(f"Found {len(agents)} agents on main page {page}")
-            all_agents.extend(agents)
-            
-            # Look for pagination
-            pagination = soup.find('div', class_=lambda x: x and 'pagination' in x.lower()) if soup else None
-            if not pagination or str(page + 1) not in pagination.get_text():
-                break
+            summary = await self.scrape_listing_page(listing, page)
+            if summary is None:
+                # A 404 or other final answer is not worth asking again
+                if not final_pass and self.engine.failed_transiently(self.listing_page_url(listing['listing_url'], page)):
+                    # Later pages wait in the buffer until this one is retried
+                    dead_letters.append((listing, page))
+                    return
+                self.progress.advance(completed=0, failed=1, queued=frontier.queue.qsize())
+                summary = {'agents': [], 'has_next': False}
+            else:
+                self.progress.advance(queued=frontier.queue.qsize())
                 
-            self.delay()
+            if page == 1 and summary['agents']:
+                # Issue every expected page at once instead of one round trip per page
+                for planned_page in range(2, self.planned_last_page(summary, listing) + 1):
+                    queue_page(listing, planned_page)
+                self.progress.advance(completed=0, queued=frontier.queue.qsize(), total=len(frontier.seen))
+                    
+            listing['pages'][page] = (summary['agents'], summary['has_next'])
+            commit_pages(listing)
             
+        for listing in listings:
+            queue_page(listing, 1)
+        self.progress.phase('listings', total=len(frontier.seen))
+        await frontier.drain(crawl_page, workers=self.engine.max_per_host * 2)
+        
+        if dead_letters:
+            logger.warning(f"Retrying {len(dead_letters)} failed listing pages")
+            frontier = CrawlFrontier(self.canonical)
+            final_pass = True
+            for listing, page in dead_letters:
+                queue_page(listing, page)
+            await frontier.drain(crawl_page, workers=self.engine.max_per_host * 2)
+        
+    def scrape_category_pages(self, category_url, category_name, max_pages=10, count=None):
+        """Scrape all pages of a category"""
+        listing = self.new_listing('category', category_url, category_name, max_pages=max_pages, count=count)
+        return self.engine.run(self.crawl_listing(listing))
+        
+    def scrape_main_pages(self, max_pages=20):
+        """Scrape main listing pages"""
+        return self.engine.run(self.crawl_listing(self.new_listing('main', self.base_url, max_pages=max_pages)))
+        
+    async def crawl_listing(self, listing):
+        """Agents on every page of one listing, in page order"""
+        all_agents = []
+        await self.crawl_listings([listing], lambda listing, page, agents: all_agents.extend(agents))
         return all_agents
         
     def get_detailed_agent_info(self, agent_url):
@@ -205,51 +415,40 @@ class OptimizedAIAgentsScraper:
         if not soup:
             return {}
             
+        return self.extract_detailed_agent_info(soup, agent_url)
+        
+    async def aget_detailed_agent_info(self, agent_url):
+        """Async get_detailed_agent_info through the fetch engine; None if the page could not be fetched"""
+        response = await self.engine.fetch(agent_url)
+        if response is None:
+            return None
+            
+        # Unchanged pages reuse the details extracted last time
+        return await self.extract_page(response, 'details', 'parse_agent_content', agent_url)
+        
+    def extract_detailed_agent_info(self, soup, agent_url):
+        """Extract detailed info from a parsed agent page"""
         details = {}
         
         try:
-            # Title
-            title = soup.find('h1')
-            if title:
-                details['detailed_title'] = title.get_text(strip=True)
-                
-            # Meta description
-            meta_desc = soup.find('meta', {'name': 'description'})
-            if meta_desc:
-                details['meta_description'] = meta_desc.get('content', '')
-                
-            # Look for pricing
-            pricing_keywords = ['free', 'paid', 'pricing', '$', 'cost']
-            for elem in soup.find_all(text=lambda text: text and any(word in text.lower() for word in pricing_keywords)):
-                if elem.strip():
-                    details['pricing_info'] = elem.strip()
-                    break
-                    
-            # Look for website/demo links
-            external_links = []
-            for link in soup.find_all('a', href=True):
-                href = link.get('href')
-                if href and href.startswith('http') and self.base_url not in href:
-                    external_links.append(href)
-                    
-            if external_links:
-                details['external_links'] = list(set(external_links))
-                
-            # Look for categories/tags
-            categories = []
-            tags = []
+            # Single walk over the tree collects everything below
+            scan = scan_agent_page(soup, self.base_url)
             
-            for link in soup.find_all('a', href=True):
-                href = link.get('href')
-                text = link.get_text(strip=True)
+            if scan['title'] is not None:
+                details['detailed_title'] = scan['title']
+            if scan['meta_description'] is not None:
+                details['meta_description'] = scan['meta_description']
+            if scan['pricing'] is not None:
+                details['pricing_info'] = scan['pricing']
                 
-                if '/categories/' in href:
-                    categories.append(text)
-                elif '/tags/' in href or href.startswith('#'):
-                    tags.append(text)
-                    
-            if categories:
-                details['categories'] = list(set(categories))
+            # Website/demo links
+            if scan['external_links']:
+                details['external_links'] = list(set(scan['external_links']))
+                
+            # Categories/tags
+            tags = scan['tags'] + scan['anchor_tags']
+            if scan['categories']:
+                details['categories'] = list(set(scan['categories']))
             if tags:
                 details['tags'] = list(set(tags))
                 
@@ -258,104 +457,537 @@ class OptimizedAIAgentsScraper:
             
         return details
         
-    def scrape_all(self):
+    def scrape_all(self, resume=False):
         """Main scraping function"""
+        return self.run(self.scrape_all_async(resume), 'full')
+        
+    async def scrape_all_async(self, resume=False):
+        """Crawl listings and details concurrently through the fetch engine"""
         logger.info("Starting optimized AI Agents scraping...")
         
-        # Get categories
-        self.categories = self.extract_categories()
+        unique_agents = await self.crawl_all_listings()
+        
+        # Listing data is the database from here on; details are merged in as they arrive
+        self.agents_data = unique_agents
+        failed = await self.enrich_details(unique_agents, resume)
+        if failed:
+            # Listed so the next incremental or discovery run fetches them again
+            self.changes = {'mode': 'full', 'failed': [agent['name'] for agent in failed]}
+        self.settle_crawl_start(not failed)
+        
+        return self.agents_data
+        
+    def scrape_incremental(self, filepath=os.path.join("data", "ai_agents_database.json"), resume=False):
+        """Refresh an existing database, fetching details only for new or changed agents"""
+        return self.run(self.scrape_incremental_async(filepath, resume), 'incremental')
+        
+    def run(self, coro, mode):
+        """Run a crawl coroutine, with parse worker processes for its duration if configured"""
+        started = self.crawl_started_at = datetime.now().isoformat()
+        self.engine.start_crawl(started, mode)
+        if self.parse_workers:
+            self.parse_pool = ParsePool(self.parse_workers, initializer=init_parse_worker,
+                                        initargs=(self.base_url, self.parser.backend))
+        try:
+            result = self.engine.run(coro)
+        finally:
+            if self.parse_pool:
+                self.parse_pool.close()
+                self.parse_pool = None
+        # The run kept its own start only if it fetched everything it set out to
+        if self.crawl_started_at == started:
+            self.engine.complete_crawl(started)
+        return result
         
-        # Collect all agents
-        all_agents_dict = {}  # Use dict to avoid duplicates
+    async def scrape_incremental_async(self, filepath, resume=False):
+        """Diff a fresh listing crawl against the stored database"""
+        logger.info(f"Starting incremental AI Agents scraping against {filepath}...")
         
-        # Scrape main pages first
-        logger.info("Scraping main pages...")
-        main_agents = self.scrape_main_pages()
+        with open(filepath, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+        # Agents are matched by name, which survives host changes in stored URLs
+        stored_agents = {agent_key(agent['name']): agent for agent in previous.get('agents', [])}
+        retry_names = self.failed_last_run(previous)
         
-        for agent in main_agents:
-            all_agents_dict[agent['url']] = agent
+        listing_agents = await self.crawl_all_listings()
+        if not listing_agents:
+            logger.error("Listing crawl found no agents, keeping the stored database")
+            self.agents_data = previous.get('agents', [])
+            self.categories = self.categories or previous.get('categories', [])
+            # Agents still owed a detail fetch stay owed
+            self.changes = {
+                'mode': 'incremental',
+                'previous_scraped_at': previous.get('metadata', {}).get('scraped_at'),
+                'new': [], 'changed': [], 'removed': [], 'retried': [],
+                'unchanged': len(self.agents_data),
+                'failed': sorted(retry_names)
+            }
+            self.settle_crawl_start(False, previous)
+            return self.agents_data
             
-        # Scrape categories
-        for i, category in enumerate(self.categories):
-            logger.info(f"Scraping category {i+1}/{len(self.categories)}: {category['name']}")
+        agents = []
+        stale_agents = []
+        new_names = []
+        changed_names = []
+        retried_names = []
+        
+        for agent in listing_agents:
+            stored = stored_agents.get(agent['name'])
+            if stored is None:
+                new_names.append(agent['name'])
+                stale_agents.append(agent)
+                agents.append(agent)
+            elif self.listing_changed(stored, agent):
+                changed_names.append(agent['name'])
+                stale_agents.append(agent)
+                agents.append(agent)
+            elif agent['name'] in retry_names:
+                retried_names.append(agent['name'])
+                stale_agents.append(agent)
+                agents.append(agent)
+            else:
+                agents.append(self.merge_listing_categories(stored, agent))
+                
+        listed_names = {agent['name'] for agent in listing_agents}
+        removed_names = [name for name in stored_agents if name not in listed_names]
+        
+        logger.info(f"{len(new_names)} new, {len(changed_names)} changed, {len(removed_names)} removed agents; "
+                    f"retrying {len(retried_names)} that failed last run")
+        
+        self.changes = {
+            'mode': 'incremental',
+            'previous_scraped_at': previous.get('metadata', {}).get('scraped_at'),
+            'new': new_names,
+            'changed': changed_names,
+            'removed': removed_names,
+            'retried': retried_names,
+            'unchanged': len(agents) - len(stale_agents)
+        }
+        
+        # Only new and changed agents need their detail pages again
+        self.agents_data = agents
+        failed = await self.enrich_details(stale_agents, resume)
+        # A changed agent keeps its stored record until its page can be fetched
+        self.keep_stored_details(failed, stored_agents)
+        self.changes['failed'] = [agent['name'] for agent in failed]
+        # Unchanged cards say nothing about their detail pages, which were not fetched
+        self.settle_crawl_start(False, previous)
+        
+        return self.agents_data
+        
+    def scrape_discovery(self, filepath=os.path.join("data", "ai_agents_database.json"), sitemap_url=None,
+                         resume=False):
+        """Refresh from the site's sitemap instead of walking every listing page"""
+        return self.run(self.scrape_discovery_async(filepath, sitemap_url, resume), 'discovery')
+        
+    def sitemap_entries(self, sitemap_url, content):
+        """Entries of one sitemap or feed body, with relative locations resolved"""
+        return [(kind, urljoin(sitemap_url, url), lastmod)
+                for kind, url, lastmod in iter_sitemap(iter_chunks(content))]
+        
+    async def read_sitemap(self, sitemap_url):
+        """{url: lastmod} for every page a sitemap or feed lists, following sitemap indexes"""
+        pages = {}
+        seen = set()
+        level = [sitemap_url]
+        for depth in range(MAX_SITEMAP_DEPTH + 1):
+            level = [url for url in dict.fromkeys(level) if url not in seen]
+            if not level:
+                break
+            seen.update(level)
+            nested = []
+            for url, response in zip(level, await self.engine.fetch_all(level)):
+                if response is None:
+                    continue
+                try:
+                    entries = await self.engine.to_thread(self.sitemap_entries, url, response.content)
+                except ParseError as e:
+                    logger.warning(f"Could not read sitemap {url}: {e}")
+                    continue
+                for kind, loc, lastmod in entries:
+                    if kind == 'sitemap':
+                        nested.append(loc)
+                    elif loc not in pages or (lastmod and (pages[loc] is None or lastmod > pages[loc])):
+                        pages[loc] = lastmod
+            level = nested
+        if level:
+            logger.warning(f"Not following {len(level)} sitemaps nested deeper than {MAX_SITEMAP_DEPTH} levels")
+        return pages
+        
+    async def scrape_discovery_async(self, filepath, sitemap_url=None, resume=False):
+        """Enumerate agents from the sitemap and refresh only what changed
+        
+        Agents come from the sitemap with their lastmod. Category listings are crawled
+        only for membership, and only for categories modified since the crawl behind the
+        stored database began; detail pages are fetched only for agents modified since then
+        """
+        sitemap_url = sitemap_url or f"{self.base_url}/sitemap.xml"
+        logger.info(f"Starting sitemap discovery from {sitemap_url}...")
+        
+        previous = {}
+        if os.path.exists(filepath):
+            with open(filepath, 'r', encoding='utf-8') as f:
+                previous = json.load(f)
+        stored_agents = {agent_key(agent['name']): agent for agent in previous.get('agents', [])}
+        retry_names = self.failed_last_run(previous)
+        # A page edited mid-crawl can predate scraped_at yet postdate its own fetch; the crawl start is safe
+        since = self.previous_crawl_start(previous)
+        # Both are written in local time without an offset
+        since = datetime.fromisoformat(since).astimezone() if since else None
+        
+        def modified(lastmod):
+            return since is None or lastmod is None or lastmod > since
             
-            category_agents = self.scrape_category_pages(category['url'], category['name'])
+        self.progress.phase('sitemap')
+        agent_lastmod = {}
+        category_lastmod = {}
+        for url, lastmod in (await self.read_sitemap(sitemap_url)).items():
+            path = urlparse(self.canonical(url)).path
+            if path.startswith('/agent/'):
+                entries, name = agent_lastmod, agent_key(path)
+            elif path.startswith('/categories/'):
+                entries, name = category_lastmod, path.partition('/categories/')[2]
+            else:
+                continue
+            # Variants of one URL count as modified when any of them is
+            if name not in entries or (lastmod and (entries[name] is None or lastmod > entries[name])):
+                entries[name] = lastmod
+                
+        if not agent_lastmod:
+            logger.error("Sitemap lists no agents, falling back to a listing crawl")
+            if previous:
+                return await self.scrape_incremental_async(filepath, resume)
+            return await self.scrape_all_async(resume)
+        logger.info(f"Sitemap lists {len(agent_lastmod)} agents and {len(category_lastmod)} categories")
+        
+        # Agents in categories the sitemap says are unchanged keep their stored records
+        crawled = set()
+        
+        def crawl_category(category):
+            if previous and not modified(category_lastmod.get(category['name'])):
+                return False
+            crawled.add(category['name'])
+            return True
             
-            for agent in category_agents:
-                if agent['url'] not in all_agents_dict:
-                    all_agents_dict[agent['url']] = agent
+        await self.crawl_all_listings(main=False, crawl_category=crawl_category)
+        cards = {agent['name']: agent for agent in self.all_agents_dict.values()}
+        
+        unlisted = [name for name in agent_lastmod if name not in cards and name not in stored_agents]
+        if unlisted:
+            # New agents outside every crawled category only show up on the main listing
+            logger.info(f"{len(unlisted)} new agents are in no crawled category, crawling the main listing")
+            await self.crawl_listings([self.new_listing('main', self.base_url, group=0, max_pages=20)],
+                                      self.merge_listing_agents)
+            cards = {agent['name']: agent for agent in self.all_agents_dict.values()}
+            unlisted = [name for name in unlisted if name not in cards]
+            if unlisted:
+                logger.warning(f"{len(unlisted)} sitemap agents are on no listing page, skipping them")
+                
+        category_order = {category['name']: i for i, category in enumerate(self.categories)}
+        agents = []
+        stale_agents = []
+        new_names = []
+        changed_names = []
+        retried_names = []
+        
+        for name, lastmod in agent_lastmod.items():
+            card = cards.get(name)
+            stored = stored_agents.get(name)
+            if card is None and stored is None:
+                continue
+                
+            if stored is None:
+                agent = card
+                new_names.append(name)
+                stale_agents.append(agent)
+            elif (modified(lastmod) or (card is not None and self.listing_changed(stored, card))
+                  or name in retry_names):
+                if card is None:
+                    agent = {**stored, 'url': urljoin(self.base_url, f"/agent/{name}")}
                 else:
-                    # Merge category info
-                    existing = all_agents_dict[agent['url']]
-                    if 'categories' not in existing:
-                        existing['categories'] = []
-                    if category['name'] not in existing['categories']:
-                        existing['categories'].append(category['name'])
-                        
-            self.delay()
+                    agent = card
+                    # Listing membership in categories that were not crawled carries over
+                    kept = [category for category in stored.get('categories', [])
+                            if category in category_order and category not in crawled]
+                    if kept:
+                        agent['categories'] = sorted(kept + agent.get('categories', []), key=category_order.get)
+                (changed_names if name not in retry_names else retried_names).append(name)
+                stale_agents.append(agent)
+            else:
+                agent = stored if card is None else self.merge_listing_categories(stored, card, crawled)
+            agents.append(agent)
             
-        logger.info(f"Found {len(all_agents_dict)} unique agents")
+        removed_names = [name for name in stored_agents if name not in agent_lastmod]
         
-        # Convert to list
-        unique_agents = list(all_agents_dict.values())
+        logger.info(f"{len(new_names)} new, {len(changed_names)} changed, {len(removed_names)} removed agents; "
+                    f"{len(crawled)} of {len(self.categories)} categories crawled")
         
-        # Get detailed info for a sample of agents (to avoid taking too long)
-        detailed_agents = []
-        sample_size = min(100, len(unique_agents))  # Limit to 100 for detailed scraping
+        self.changes = {
+            'mode': 'discovery',
+            'previous_scraped_at': previous.get('metadata', {}).get('scraped_at'),
+            'new': new_names,
+            'changed': changed_names,
+            'removed': removed_names,
+            'retried': retried_names,
+            'unchanged': len(agents) - len(stale_agents),
+            'unlisted': unlisted,
+            'categories_crawled': len(crawled),
+            'categories_reused': len(self.categories) - len(crawled)
+        }
         
-        logger.info(f"Getting detailed info for {sample_size} agents...")
+        self.agents_data = agents
+        failed = await self.enrich_details(stale_agents, resume)
+        self.keep_stored_details(failed, stored_agents)
+        self.changes['failed'] = [agent['name'] for agent in failed]
+        # Pages the sitemap calls unchanged since the stored crawl are as fresh as this run
+        self.settle_crawl_start(not failed, previous)
         
-        for i, agent in enumerate(unique_agents[:sample_size]):
-            if i % 10 == 0:
-                logger.info(f"Processing detailed info {i+1}/{sample_size}")
-                
-            details = self.get_detailed_agent_info(agent['url'])
-            combined_agent = {**agent, **details}
-            detailed_agents.append(combined_agent)
-            
-            self.delay()
+        return self.agents_data
+        
+    def previous_crawl_start(self, previous):
+        """Start of the crawl a stored database is known to be as fresh as, or None if unknown"""
+        metadata = previous.get('metadata', {})
+        if 'crawl_started_at' in metadata:
+            return metadata['crawl_started_at']
+        # Databases saved before crawl starts were recorded only have their save time
+        return metadata.get('scraped_at')
+        
+    def settle_crawl_start(self, revalidated, previous=None):
+        """Keep this run's start as crawl_started_at only if the run fetched every page a discovery run would skip
+        
+        Otherwise the database is only as fresh as the crawl behind the stored one
+        """
+        if not revalidated or self.reused_details or self.engine.dead_letters:
+            self.crawl_started_at = self.previous_crawl_start(previous or {})
+        
+    def failed_last_run(self, previous):
+        """Names of agents whose detail pages the run behind a stored database could not fetch"""
+        return set((previous.get('metadata', {}).get('changes') or {}).get('failed', []))
+        
+    def listing_changed(self, stored, agent):
+        """Whether an agent's listing card differs from the stored record"""
+        return any(stored.get(field) != agent.get(field) for field in LISTING_FIELDS)
+        
+    def merge_listing_categories(self, stored, card, crawled=None):
+        """Stored record with its category membership taken from this run's listing card
+        
+        Categories a detail page listed win over listing membership, as in a full crawl.
+        With crawled, membership in categories outside it carries over from the stored record
+        """
+        order = {category['name']: i for i, category in enumerate(self.categories)}
+        stored_categories = stored.get('categories', [])
+        if any(category not in order for category in stored_categories):
+            return stored
+        categories = list(card.get('categories', []))
+        if crawled is not None:
+            categories += [category for category in stored_categories
+                           if category not in crawled and category not in categories]
+        merged = dict(stored)
+        if categories:
+            merged['categories'] = sorted(categories, key=order.get)
+        else:
+            merged.pop('categories', None)
+        return merged
+        
+    def keep_stored_details(self, failed, stored_agents):
+        """Put back the stored record of agents whose detail refetch failed
+        
+        Listing fields stay as stored too, so the next run still sees the card as changed
+        and fetches the page again; only category membership follows this run's listings
+        """
+        for agent in failed:
+            stored = stored_agents.get(agent['name'])
+            if stored is not None:
+                merged = self.merge_listing_categories(stored, agent)
+                agent.clear()
+                agent.update(merged)
+        
+    async def crawl_all_listings(self, main=True, crawl_category=None):
+        """Crawl the main listing and every category, returning unique agents in crawl order
+        
+        main=False skips the main listing, and crawl_category(category) can narrow
+        the categories crawled; self.categories always lists them all
+        """
+        # Get categories
+        self.categories = await self.engine.to_thread(self.extract_categories)
+        
+        # Main pages, category pages and their pagination share one frontier
+        self.all_agents_dict = {}  # Use dict to avoid duplicates
+        self.listing_ranks = {}
+        listings = [self.new_listing('main', self.base_url, group=0, max_pages=20)] if main else []
+        for i, category in enumerate(self.categories):
+            if crawl_category is None or crawl_category(category):
+                listings.append(self.new_listing('category', category['url'], category['name'], group=i + 1,
+                                                 max_pages=10, count=category.get('count')))
             
-        # Add remaining agents without detailed info
-        for agent in unique_agents[sample_size:]:
-            detailed_agents.append(agent)
+        logger.info(f"Crawling {'main pages and ' if main else ''}{len(listings) - main} categories...")
+        await self.crawl_listings(listings, self.merge_listing_agents)
+        
+        # Restore sequential crawl order: main pages first, then categories in listing order
+        all_agents_dict = dict(sorted(self.all_agents_dict.items(), key=lambda item: self.listing_ranks[item[0]]))
+        category_order = {category['name']: i for i, category in enumerate(self.categories)}
+        for agent in all_agents_dict.values():
+            if 'categories' in agent:
+                agent['categories'].sort(key=lambda name: category_order.get(name, len(category_order)))
+                
+        logger.info(f"Found {len(all_agents_dict)} unique agents")
+        
+        # Convert to list
+        return list(all_agents_dict.values())
+        
+    def merge_listing_agents(self, listing, page, agents):
+        """Merge one listing page into all_agents_dict, whatever order pages arrive in"""
+        for position, agent in enumerate(agents):
+            # Variants of an agent's URL make one record and one detail fetch
+            agent['url'] = self.canonical(agent['url'])
+            agent['name'] = agent_key(agent['url'])
+            rank = (listing['group'], page, position)
+            existing = self.all_agents_dict.get(agent['url'])
             
-        self.agents_data = detailed_agents
-        return detailed_agents
+            if existing is None:
+                self.all_agents_dict[agent['url']] = agent
+                self.listing_ranks[agent['url']] = rank
+                existing = agent
+            elif rank < self.listing_ranks[agent['url']]:
+                # Listing fields come from the earliest page in crawl order
+                categories = existing.get('categories')
+                existing.clear()
+                existing.update(agent)
+                if categories:
+                    existing['categories'] = categories
+                self.listing_ranks[agent['url']] = rank
+                
+            # Merge category info
+            if listing['name']:
+                if 'categories' not in existing:
+                    existing['categories'] = []
+                if listing['name'] not in existing['categories']:
+                    existing['categories'].append(listing['name'])
+                    
+    async def enrich_details(self, agents, resume=False):
+        """Fetch detail pages for every agent through a pool of workers
         
-    def save_to_json(self, filename="ai_agents_database.json"):
-        """Save to JSON file"""
+        Agents whose page could not be fetched get a second pass at the end; any still
+        failing are left out of the journal so a resumed run tries them again, and returned
+        """
+        completed = {self.canonical(url): agent for url, agent in self.journal.load().items()} if resume else {}
+        queue = asyncio.Queue()
+        for agent in agents:
+            if agent['url'] in completed:
+                agent.update(completed[agent['url']])
+                self.reused_details += 1
+            else:
+                queue.put_nowait(agent)
+                
+        total = queue.qsize()
+        done = 0
+        dead_letters = []
+        failed = []
+        final_pass = False
+        logger.info(f"Getting detailed info for {total} agents with {self.detail_workers} workers...")
+        self.progress.phase('details', total=total)
+        
+        async def worker():
+            nonlocal done
+            while True:
+                try:
+                    agent = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                details = await self.aget_detailed_agent_info(agent['url'])
+                if details is None:
+                    if not final_pass and self.engine.failed_transiently(agent['url']):
+                        dead_letters.append(agent)
+                        continue
+                    failed.append(agent)
+                    self.progress.advance(completed=0, failed=1, queued=queue.qsize())
+                else:
+                    agent.update(details)
+                    self.journal.append(agent)
+                    self.progress.advance(queued=queue.qsize())
+                done += 1
+                if done % 10 == 0 or done == total:
+                    logger.info(f"Processed detailed info {done}/{total}")
+                    
+        self.journal.open(resume=resume)
+        try:
+            await asyncio.gather(*(worker() for _ in range(self.detail_workers)))
+            if dead_letters:
+                logger.warning(f"Retrying {len(dead_letters)} agents whose detail pages failed")
+                final_pass = True
+                for agent in dead_letters:
+                    queue.put_nowait(agent)
+                await asyncio.gather(*(worker() for _ in range(self.detail_workers)))
+        finally:
+            self.journal.close()
+        return failed
+        
+    def save_to_json(self, filename="ai_agents_database.json", scraped_at=None):
+        """Save to JSON file; scraped_at overrides the current time (re-extraction keeps the crawl's)"""
         os.makedirs("data", exist_ok=True)
         filepath = os.path.join("data", filename)
         
-        database = {
-            'metadata': {
-                'scraped_at': datetime.now().isoformat(),
-                'total_agents': len(self.agents_data),
-                'total_categories': len(self.categories),
-                'source_url': self.base_url,
-                'scraper_version': '2.0_optimized'
-            },
-            'categories': self.categories,
-            'agents': self.agents_data
+        metadata = {
+            'scraped_at': scraped_at or datetime.now().isoformat(),
+            'total_agents': len(self.agents_data),
+            'total_categories': len(self.categories),
+            'source_url': self.base_url,
+            'scraper_version': '2.0_optimized',
+            # None when no crawl is known to have fetched everything; discovery then refetches it all
+            'crawl_started_at': self.crawl_started_at,
+            **({'changes': self.changes} if self.changes else {})
         }
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(database, f, indent=2, ensure_ascii=False)
+        # Agents are streamed one at a time into a temp file that is renamed into place
+        write_database(filepath, metadata, self.categories, iter(self.agents_data))
+        self.metadata = metadata
             
         logger.info(f"Database saved to {filepath}")
         return filepath
 
 def main():
-    scraper = OptimizedAIAgentsScraper()
+    parser = argparse.ArgumentParser(description="Scrape AI agents from aiagentslist.com")
+    parser.add_argument('--incremental', action='store_true',
+                        help="refresh data/ai_agents_database.json, fetching details only for new or changed agents")
+    parser.add_argument('--discover', action='store_true',
+                        help="refresh from the site's sitemap, crawling only changed categories and agents")
+    parser.add_argument('--sitemap', metavar='URL',
+                        help="sitemap or feed to discover agents from (default: <site>/sitemap.xml)")
+    parser.add_argument('--resume', action='store_true',
+                        help="skip agents already recorded in the detail journal")
+    parser.add_argument('--parse-workers', type=int, default=0,
+                        help="parse pages in this many worker processes instead of fetch threads")
+    parser.add_argument('--metrics', default=os.path.join("data", "scrape_metrics.json"),
+                        help="where to write the run's timing and request metrics")
+    parser.add_argument('--prometheus', metavar='PATH',
+                        help="also write the metrics in Prometheus text format")
+    parser.add_argument('--status', default=os.path.join("data", "scrape_status.json"),
+                        help="live progress file read by monitor_progress.py")
+    parser.add_argument('--archive', default=os.path.join("data", "page_archive.warc.gz"),
+                        help="raw page archive appended to for reextract_archive.py")
+    parser.add_argument('--no-archive', action='store_true',
+                        help="do not keep raw copies of fetched pages")
+    args = parser.parse_args()
+    
+    scraper = OptimizedAIAgentsScraper(parse_workers=args.parse_workers, status_path=args.status,
+                                       archive_path=None if args.no_archive else args.archive)
     
     try:
-        agents = scraper.scrape_all()
+        if args.discover:
+            agents = scraper.scrape_discovery(sitemap_url=args.sitemap, resume=args.resume)
+        elif args.incremental:
+            agents = scraper.scrape_incremental(resume=args.resume)
+        else:
+            agents = scraper.scrape_all(resume=args.resume)
         filepath = scraper.save_to_json()
+        exports = export_database(filepath, database=scraper.database())
+        scraper.progress.finish()
         
         print(f"\n✅ Scraping completed!")
         print(f"📊 Total agents: {len(agents)}")
         print(f"📁 Database: {filepath}")
         print(f"📋 Categories: {len(scraper.categories)}")
+        print(f"📦 Compact exports: {', '.join(exports.values())}")
         
         # Show some statistics
         with_descriptions = sum(1 for agent in agents if agent.get('description'))
@@ -363,12 +995,27 @@ def main():
         
         print(f"📝 Agents with descriptions: {with_descriptions}")
         print(f"💰 Agents with pricing info: {with_pricing}")
+        url_stats = scraper.urls.stats()
+        print(f"🔗 Duplicate URL variants folded: {url_stats['collisions']}")
+        
+        if scraper.changes and scraper.changes['mode'] != 'full':
+            print(f"🔄 New: {len(scraper.changes['new'])}, changed: {len(scraper.changes['changed'])}, "
+                  f"removed: {len(scraper.changes['removed'])}")
+        if scraper.changes and scraper.changes['failed']:
+            print(f"⚠️  Agents without fresh details (retried next run): {len(scraper.changes['failed'])}")
         
     except Exception as e:
         logger.error(f"Scraping failed: {e}")
+        scraper.progress.finish('failed')
         if scraper.agents_data:
+            # An interrupted run vouches for no crawl start
+            scraper.crawl_started_at = None
             scraper.save_to_json("ai_agents_partial.json")
             print("Partial data saved")
+    finally:
+        scraper.save_metrics(args.metrics, args.prometheus)
+        # Closes the page archive along with the worker pool and connections
+        scraper.engine.close()
 
 if __name__ == "__main__":
     main()
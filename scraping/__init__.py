@@ -0,0 +1,42 @@
+"""
+Shared building blocks for the AI agents scrapers
+"""
+
+from .archive import ArchiveSession, PageArchive
+from .checkpoint import CheckpointJournal
+from .circuit_breaker import CircuitBreaker
+from .db_writer import write_database
+from .engine import FetchEngine
+from .frontier import CrawlFrontier
+from .http_cache import HTTPCache
+from .metrics import ScrapeMetrics
+from .parse_pool import ParsePool
+from .parsing import PageParser, available_parsers, choose_parser
+from .progress import ProgressReporter
+from .rate_limiter import RateLimiter, parse_retry_after
+from .scraper_base import ScraperBase
+from .search_index import SearchIndex, build_search_index
+from .urls import URLCanonicalizer
+
+__all__ = [
+    'ArchiveSession',
+    'CheckpointJournal',
+    'CircuitBreaker',
+    'CrawlFrontier',
+    'FetchEngine',
+    'HTTPCache',
+    'PageArchive',
+    'PageParser',
+    'ParsePool',
+    'ProgressReporter',
+    'RateLimiter',
+    'ScrapeMetrics',
+    'ScraperBase',
+    'SearchIndex',
+    'URLCanonicalizer',
+    'available_parsers',
+    'build_search_index',
+    'choose_parser',
+    'parse_retry_after',
+    'write_database',
+]
@@ -0,0 +1,345 @@
+"""
+Append-only raw page archive
+Every page the fetch engine downloads is stored as a gzip-compressed WARC
+response record, one gzip member per record, with a JSONL offset index beside
+it. Pages already archived with the same body are not stored again, and each
+crawl leaves warcinfo records with its start time, its mode and, once it has
+fetched everything, its completion. The archive can answer
+requests in place of the network, so the extractors can be rerun over a past
+crawl without fetching anything
+"""
+
+import base64
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import uuid
+import zlib
+from collections import Counter
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+logger = logging.getLogger(__name__)
+
+# Headers describing the transfer rather than the page; the stored body is already decoded
+TRANSFER_HEADERS = frozenset({'content-encoding', 'transfer-encoding', 'content-length', 'connection', 'keep-alive'})
+
+COMPRESS_LEVEL = 6
+
+# Bytes read at a time when scanning the data file for records
+CHUNK_SIZE = 1 << 16
+
+# warcinfo fields describing a crawl, by index entry key
+CRAWL_FIELDS = {'crawl_started_at': 'crawl-started-at', 'mode': 'crawl-mode', 'completed_at': 'crawl-completed-at'}
+
+
+def utc_now():
+    """Current time as a WARC-Date"""
+    return datetime.now(timezone.utc).isoformat(timespec='seconds').replace('+00:00', 'Z')
+
+
+def payload_digest(body):
+    """WARC-style payload digest"""
+    return 'sha1:' + base64.b32encode(hashlib.sha1(body).digest()).decode('ascii')
+
+
+def warc_record(url, status, reason, headers, body, date):
+    """Uncompressed WARC/1.1 response record for one page"""
+    http_headers = [(name, value) for name, value in headers.items() if name.lower() not in TRANSFER_HEADERS]
+    http_headers.append(('Content-Length', str(len(body))))
+    payload = (f"HTTP/1.1 {status} {reason}\r\n"
+               + ''.join(f"{name}: {value}\r\n" for name, value in http_headers)
+               + "\r\n").encode('latin-1', errors='replace') + body
+    warc_headers = (
+        "WARC/1.1\r\n"
+        "WARC-Type: response\r\n"
+        f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>\r\n"
+        f"WARC-Date: {date}\r\n"
+        f"WARC-Target-URI: {url}\r\n"
+        f"WARC-Payload-Digest: {payload_digest(body)}\r\n"
+        "Content-Type: application/http; msgtype=response\r\n"
+        f"Content-Length: {len(payload)}\r\n"
+        "\r\n"
+    ).encode('utf-8')
+    return warc_headers + payload + b"\r\n\r\n"
+
+
+def warcinfo_record(info, date):
+    """Uncompressed WARC/1.1 warcinfo record about a crawl; info is keyed like CRAWL_FIELDS"""
+    fields = ("software: ai-agents-directory scraper\r\n"
+              + ''.join(f"{CRAWL_FIELDS[key]}: {value}\r\n" for key, value in info.items())).encode('utf-8')
+    warc_headers = (
+        "WARC/1.1\r\n"
+        "WARC-Type: warcinfo\r\n"
+        f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>\r\n"
+        f"WARC-Date: {date}\r\n"
+        "Content-Type: application/warc-fields\r\n"
+        f"Content-Length: {len(fields)}\r\n"
+        "\r\n"
+    ).encode('utf-8')
+    return warc_headers + fields + b"\r\n\r\n"
+
+
+def parse_warc_record(record):
+    """(status, reason, headers, body) of an uncompressed response record"""
+    warc_head, _, rest = record.partition(b"\r\n\r\n")
+    length = None
+    for line in warc_head.split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b'content-length':
+            length = int(value)
+    payload = rest[:length]
+    http_head, _, body = payload.partition(b"\r\n\r\n")
+    lines = http_head.decode('latin-1').split("\r\n")
+    _, status, reason = (lines[0].split(' ', 2) + [''])[:3]
+    headers = CaseInsensitiveDict()
+    for line in lines[1:]:
+        name, _, value = line.partition(':')
+        headers[name.strip()] = value.strip()
+    return int(status), reason, headers, body
+
+
+def iter_members(path, start=0):
+    """(offset, length, uncompressed bytes) of each complete gzip member from start on
+
+    Stops at the first member that is cut short or corrupt
+    """
+    with open(path, 'rb') as f:
+        f.seek(start)
+        offset = start
+        data = b''
+        while True:
+            data = data or f.read(CHUNK_SIZE)
+            if not data:
+                return
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            parts = []
+            length = 0
+            try:
+                while True:
+                    parts.append(decompressor.decompress(data))
+                    if decompressor.eof:
+                        length += len(data) - len(decompressor.unused_data)
+                        data = decompressor.unused_data
+                        break
+                    length += len(data)
+                    data = f.read(CHUNK_SIZE)
+                    if not data:
+                        return
+            except zlib.error:
+                return
+            yield offset, length, b''.join(parts)
+            offset += length
+
+
+def record_entry(record):
+    """Index entry (without offset and length) for an uncompressed record"""
+    head, _, body = record.partition(b"\r\n\r\n")
+    fields = {}
+    for line in head.decode('utf-8', errors='replace').split("\r\n")[1:]:
+        name, _, value = line.partition(':')
+        fields[name.strip().lower()] = value.strip()
+    if fields.get('warc-type') == 'warcinfo':
+        info = {}
+        for line in body.decode('utf-8', errors='replace').split("\r\n"):
+            name, _, value = line.partition(':')
+            info[name.strip()] = value.strip()
+        entry = {'type': 'warcinfo', 'date': fields.get('warc-date')}
+        entry.update({key: info[name] for key, name in CRAWL_FIELDS.items() if name in info})
+        return entry
+    return {'type': 'response', 'url': fields['warc-target-uri'], 'status': parse_warc_record(record)[0],
+            'date': fields.get('warc-date'), 'digest': fields.get('warc-payload-digest')}
+
+
+class PageArchive:
+    def __init__(self, path):
+        self.path = path
+        self.index_path = path + '.idx'
+        self.lock = threading.Lock()
+        self.entries = None
+        # {crawl start: {'mode': ..., 'completed': ...}} in the order crawls began
+        self.crawls = {}
+        self.file = None
+        self.index_file = None
+
+    def load(self):
+        """Latest index entry per URL, indexing or dropping records a crash left without an index line"""
+        with self.lock:
+            return self._load()
+
+    def _add(self, entry):
+        if entry.get('type') == 'warcinfo':
+            # Archives from before modes were recorded have crawls of unknown mode, never complete
+            crawl = self.crawls.setdefault(entry['crawl_started_at'], {'mode': None, 'completed': False})
+            if entry.get('mode'):
+                crawl['mode'] = entry['mode']
+            if entry.get('completed_at'):
+                crawl['completed'] = True
+        else:
+            self.entries[entry['url']] = entry
+
+    def _load(self):
+        if self.entries is not None:
+            return self.entries
+        self.entries = {}
+
+        valid_size = 0
+        data_end = 0
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'rb') as f:
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break
+                    self._add(entry)
+                    data_end = max(data_end, entry['offset'] + entry['length'])
+                    valid_size += len(line)
+            if valid_size < os.path.getsize(self.index_path):
+                logger.warning(f"Truncating incomplete tail of {self.index_path}")
+                os.truncate(self.index_path, valid_size)
+
+        if os.path.exists(self.path) and os.path.getsize(self.path) > data_end:
+            self._index_tail(data_end)
+        logger.info(f"Loaded {len(self.entries)} archived pages from {self.path}")
+        return self.entries
+
+    def _index_tail(self, start):
+        """Index the records after start that have no index line, dropping one cut short by a crash"""
+        if start:
+            logger.warning(f"Indexing records past the end of {self.index_path}")
+        else:
+            logger.warning(f"Rebuilding {self.index_path} from {self.path}")
+        end = start
+        recovered = 0
+        with open(self.index_path, 'a', encoding='utf-8') as index_file:
+            for offset, length, record in iter_members(self.path, start):
+                entry = record_entry(record)
+                entry['offset'], entry['length'] = offset, length
+                index_file.write(json.dumps(entry) + '\n')
+                self._add(entry)
+                end = offset + length
+                recovered += 1
+        if os.path.getsize(self.path) > end:
+            logger.warning(f"Truncating incomplete record at the end of {self.path}")
+            os.truncate(self.path, end)
+        logger.info(f"Indexed {recovered} records from {self.path}")
+
+    def _write(self, record, entry):
+        """Append one uncompressed record and its index entry, filling in offset and length"""
+        record = gzip.compress(record, COMPRESS_LEVEL)
+        if self.file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.file = open(self.path, 'ab')
+            self.index_file = open(self.index_path, 'a', encoding='utf-8')
+        entry['offset'] = self.file.tell()
+        entry['length'] = len(record)
+        self.file.write(record)
+        self.file.flush()
+        # The index line goes last, so a record only counts once it is fully written
+        self.index_file.write(json.dumps(entry) + '\n')
+        self.index_file.flush()
+
+    def _write_info(self, info):
+        date = utc_now()
+        entry = {'type': 'warcinfo', 'date': date, **info}
+        with self.lock:
+            self._load()
+            self._write(warcinfo_record(info, date), entry)
+            self._add(entry)
+
+    def start_crawl(self, crawl_started_at, mode='full'):
+        """Mark the start of a crawl: 'full' fetches every page, other modes only some"""
+        self._write_info({'crawl_started_at': crawl_started_at, 'mode': mode})
+
+    def complete_crawl(self, crawl_started_at):
+        """Mark a crawl as having fetched every page it set out to, so its pages were current when it began"""
+        self._write_info({'crawl_started_at': crawl_started_at, 'completed_at': utc_now()})
+
+    def crawl_started_at(self):
+        """Start of the most recent complete full crawl recorded in the archive, or None
+
+        Incremental runs, discovery runs and crawls that failed or were cut short leave
+        pages behind that may be older than their start, so they do not count
+        """
+        with self.lock:
+            self._load()
+            complete = [start for start, crawl in self.crawls.items() if crawl['mode'] == 'full' and crawl['completed']]
+            return complete[-1] if complete else None
+
+    def append(self, url, response):
+        """Archive a fetched page; False if the same body is already the latest for url"""
+        body = response.content
+        digest = payload_digest(body)
+        date = utc_now()
+        with self.lock:
+            entries = self._load()
+            if entries.get(url, {}).get('digest') == digest:
+                return False
+            entry = {'type': 'response', 'url': url, 'status': response.status_code, 'date': date, 'digest': digest}
+            self._write(warc_record(url, response.status_code, response.reason or 'OK', response.headers, body, date),
+                        entry)
+            entries[url] = entry
+            return True
+
+    def read(self, entry):
+        """(status, reason, headers, body) of an indexed record"""
+        with open(self.path, 'rb') as f:
+            f.seek(entry['offset'])
+            return parse_warc_record(gzip.decompress(f.read(entry['length'])))
+
+    def get(self, url):
+        entry = self.load().get(url)
+        return self.read(entry) if entry else None
+
+    def origins(self):
+        """Archived page count per scheme://host, most common first"""
+        return Counter('{0.scheme}://{0.netloc}'.format(urlsplit(url)) for url in self.load()).most_common()
+
+    def close(self):
+        with self.lock:
+            for f in (self.file, self.index_file):
+                if f:
+                    f.close()
+            self.file = None
+            self.index_file = None
+
+
+class ArchiveSession:
+    """Answers GET requests from a PageArchive in place of requests.Session
+
+    URLs that were never archived come back as 404, like pages the crawl did not find
+    """
+
+    def __init__(self, archive):
+        self.archive = archive
+        self.headers = {}
+
+    def mount(self, prefix, adapter):
+        pass
+
+    def get(self, url, **kwargs):
+        response = Response()
+        response.url = url
+        found = self.archive.get(url)
+        if found is None:
+            response.status_code, response.reason = 404, 'Not Archived'
+            response._content = b''
+        else:
+            response.status_code, response.reason, response.headers, response._content = found
+            response.encoding = get_encoding_from_headers(response.headers)
+        return response
+
+    def close(self):
+        pass
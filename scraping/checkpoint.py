@@ -0,0 +1,66 @@
+"""
+Append-only JSONL checkpoint journal
+One line per completed record, so checkpoint cost stays constant per record
+and a killed crawl can resume from what was written
+"""
+
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class CheckpointJournal:
+    def __init__(self, path, key='url'):
+        self.path = path
+        self.key = key
+        self.lock = threading.Lock()
+        self.file = None
+
+    def load(self):
+        """Completed records by key, dropping a line left half-written by a crash"""
+        records = {}
+        if not os.path.exists(self.path):
+            return records
+
+        valid_size = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                records[record[self.key]] = record
+                valid_size += len(line)
+
+        if valid_size < os.path.getsize(self.path):
+            logger.warning(f"Truncating incomplete tail of {self.path}")
+            with open(self.path, 'rb+') as f:
+                f.truncate(valid_size)
+
+        logger.info(f"Loaded {len(records)} checkpointed records from {self.path}")
+        return records
+
+    def open(self, resume=False):
+        """Open for appending; a fresh run starts an empty journal"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+        return self
+
+    def append(self, record):
+        """Write one completed record"""
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self.lock:
+            self.file.write(line)
+            self.file.flush()
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
@@ -0,0 +1,89 @@
+"""
+Per-host circuit breaker for the fetch engine
+After a run of failures a host's circuit opens and requests to it wait instead
+of failing; once the pause is over a single trial request decides whether the
+circuit closes again or stays open for longer
+"""
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class _HostCircuit:
+    def __init__(self, reset_timeout):
+        self.failures = 0
+        self.tripped = False
+        self.open_until = 0.0
+        self.trial_thread = None
+        self.reset_timeout = reset_timeout
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, max_reset_timeout=300.0, metrics=None):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        # Circuits opened are counted as circuit_trips
+        self.metrics = metrics
+        self.condition = threading.Condition()
+        self.hosts = {}
+
+    def _circuit(self, host):
+        if host not in self.hosts:
+            self.hosts[host] = _HostCircuit(self.reset_timeout)
+        return self.hosts[host]
+
+    def wait(self, host):
+        """Block until a request to host may go out, returning the seconds spent waiting"""
+        started = time.monotonic()
+        with self.condition:
+            while True:
+                circuit = self._circuit(host)
+                now = time.monotonic()
+                if not circuit.tripped:
+                    break
+                if now < circuit.open_until:
+                    self.condition.wait(circuit.open_until - now)
+                elif circuit.trial_thread is not None:
+                    # Another request is probing the host; wait for its outcome
+                    self.condition.wait()
+                else:
+                    circuit.trial_thread = threading.get_ident()
+                    break
+        return time.monotonic() - started
+
+    def record(self, host, ok):
+        """Report how a request that passed wait() went; every such request must be recorded"""
+        with self.condition:
+            circuit = self._circuit(host)
+            if ok:
+                if circuit.tripped:
+                    logger.info(f"Circuit for {host} closed, resuming")
+                circuit.failures = 0
+                circuit.tripped = False
+                circuit.trial_thread = None
+                circuit.reset_timeout = self.reset_timeout
+                self.condition.notify_all()
+                return
+
+            circuit.failures += 1
+            if circuit.tripped:
+                if circuit.trial_thread != threading.get_ident():
+                    return  # A request sent before the circuit opened
+                # The trial failed too: stay open, for longer each time
+                circuit.trial_thread = None
+                circuit.reset_timeout = min(self.max_reset_timeout, circuit.reset_timeout * 2)
+                circuit.open_until = time.monotonic() + circuit.reset_timeout
+                logger.warning(f"Circuit for {host} still failing, pausing {circuit.reset_timeout:.0f}s")
+                self.condition.notify_all()
+            elif circuit.failures >= self.failure_threshold:
+                circuit.tripped = True
+                circuit.open_until = time.monotonic() + circuit.reset_timeout
+                if self.metrics:
+                    self.metrics.count('circuit_trips')
+                logger.warning(f"Circuit for {host} opened after {circuit.failures} failures, "
+                               f"pausing {circuit.reset_timeout:.0f}s")
+                self.condition.notify_all()
@@ -0,0 +1,80 @@
+"""
+Streaming, atomic writer for the agents database
+Serializes one agent at a time into a temp file and renames it into place,
+so memory stays flat and readers never see a half-written database
+"""
+
+import json
+import os
+import tempfile
+
+# indent=None writes the minified form
+COMPACT_SEPARATORS = (',', ':')
+
+
+def _nested(value, indent, level):
+    """JSON for a value nested `level` deep, laid out as json.dump(indent=...) would"""
+    if indent is None:
+        return json.dumps(value, ensure_ascii=False, separators=COMPACT_SEPARATORS)
+    text = json.dumps(value, indent=indent, ensure_ascii=False)
+    return text.replace('\n', '\n' + ' ' * (indent * level))
+
+
+def iter_database_chunks(metadata, categories, agents, indent=2):
+    """Yield the database document piece by piece, agents pulled lazily from an iterable"""
+    pad = '' if indent is None else '\n' + ' ' * indent
+    item_pad = '' if indent is None else '\n' + ' ' * (indent * 2)
+    key_separator = ':' if indent is None else ': '
+
+    yield '{'
+    yield f'{pad}"metadata"{key_separator}{_nested(metadata, indent, 1)},'
+    yield f'{pad}"categories"{key_separator}{_nested(categories, indent, 1)},'
+    yield f'{pad}"agents"{key_separator}['
+
+    first = True
+    for agent in agents:
+        if not first:
+            yield ','
+        yield item_pad + _nested(agent, indent, 2)
+        first = False
+
+    yield ']' if first else pad + ']'
+    yield '' if indent is None else '\n'
+    yield '}'
+
+
+def _target_mode(filepath):
+    """Permissions for the replacement file: the existing file's, or what open() would give a new one"""
+    try:
+        return os.stat(filepath).st_mode & 0o7777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def atomic_write(filepath, chunks, binary=False):
+    """Write chunks to a temp file next to filepath, then atomically replace it"""
+    directory = os.path.dirname(filepath) or '.'
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(prefix='.tmp_', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb' if binary else 'w', encoding=None if binary else 'utf-8') as f:
+            for chunk in chunks:
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file 0600; readers of the old file must still be able to read the new one
+        os.chmod(tmp_path, _target_mode(filepath))
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+    return filepath
+
+
+def write_database(filepath, metadata, categories, agents, indent=2):
+    """Stream the database to filepath; indent=None writes minified JSON"""
+    return atomic_write(filepath, iter_database_chunks(metadata, categories, agents, indent))
@@ -0,0 +1,228 @@
+"""
+Asyncio fetch engine for the scrapers
+Runs blocking requests calls on a worker pool over one shared connection pool,
+with a cap on in-flight requests per host. Transient failures are retried with
+jittered exponential backoff behind a per-host circuit breaker; URLs that still
+fail are kept as dead letters for a later pass. Successful responses can be
+copied to a raw page archive for offline re-extraction
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .circuit_breaker import CircuitBreaker
+from .rate_limiter import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Statuses worth asking again for; anything else (404 and friends) is final
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class FetchEngine:
+    def __init__(self, session=None, max_per_host=4, max_workers=16, timeout=15, limiter=None, cache=None,
+                 metrics=None, connect_timeout=5, retries=3, backoff_base=0.5, backoff_cap=30.0, breaker=None,
+                 archive=None):
+        self.session = session or requests.Session()
+        self.max_per_host = max_per_host
+        self.max_workers = max_workers
+        # Dead hosts fail fast on connect while slow pages still get the full read timeout
+        self.timeout = (connect_timeout, timeout) if connect_timeout else timeout
+        self.limiter = limiter or RateLimiter()
+        self.cache = cache
+        self.metrics = metrics
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.breaker = breaker or CircuitBreaker(metrics=metrics)
+        self.archive = archive
+        self.dead_letters = {}
+        self._dead_letters_lock = threading.Lock()
+
+        # One pool shared by every worker, sized so no worker waits on a connection
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers, pool_block=True)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='fetch')
+        self._host_slots = {}
+
+    def backoff(self, attempt):
+        """Full-jitter exponential delay before retry number attempt"""
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** (attempt - 1)))
+
+    def get(self, url):
+        """Fetch a URL, retrying transient failures; returns the response or None on error"""
+        host = urlparse(url).netloc
+        for attempt in range(self.retries + 1):
+            if attempt:
+                delay = self.backoff(attempt)
+                logger.info(f"Retrying {url} in {delay:.1f}s (attempt {attempt + 1}/{self.retries + 1})")
+                if self.metrics:
+                    self.metrics.count('retries')
+                    self.metrics.add_sleep(delay)
+                time.sleep(delay)
+
+            waited = self.breaker.wait(host)
+            if self.metrics and waited:
+                self.metrics.add_sleep(waited)
+            response, error, transient = None, None, False
+            try:
+                response, error, transient = self._attempt(url)
+            finally:
+                # Final errors like 404 still mean the host is answering
+                self.breaker.record(host, not transient)
+
+            if url in self.dead_letters and not transient:
+                # Settled one way or the other; no longer worth another pass
+                with self._dead_letters_lock:
+                    self.dead_letters.pop(url, None)
+            if error is None:
+                if self.archive:
+                    self.archive_page(url, response)
+                return response
+            if not transient:
+                logger.error(f"Error fetching {url}: {error}")
+                if self.metrics:
+                    self.metrics.count('errors')
+                return None
+
+        logger.error(f"Giving up on {url} after {self.retries + 1} attempts: {error}")
+        with self._dead_letters_lock:
+            self.dead_letters[url] = {
+                'url': url,
+                'error': str(error),
+                'attempts': self.retries + 1,
+                'failed_at': datetime.now().isoformat(),
+            }
+        if self.metrics:
+            self.metrics.count('errors')
+        return None
+
+    def failed_transiently(self, url):
+        """Whether url was given up on after transient failures, so a later pass may still get it"""
+        with self._dead_letters_lock:
+            return url in self.dead_letters
+
+    def start_crawl(self, crawl_started_at, mode='full'):
+        """Record a crawl's start and mode in the archive, if there is one"""
+        if not self.archive:
+            return
+        try:
+            self.archive.start_crawl(crawl_started_at, mode)
+        except OSError as e:
+            logger.warning(f"Could not record the crawl start in the archive: {e}")
+
+    def complete_crawl(self, crawl_started_at):
+        """Record in the archive, if there is one, that a crawl fetched every page it set out to"""
+        if not self.archive:
+            return
+        try:
+            self.archive.complete_crawl(crawl_started_at)
+        except OSError as e:
+            logger.warning(f"Could not record the crawl completion in the archive: {e}")
+
+    def archive_page(self, url, response):
+        # A full disk or similar costs the archive copy, never the page itself
+        try:
+            self.archive.append(url, response)
+        except OSError as e:
+            logger.warning(f"Could not archive {url}: {e}")
+
+    def _attempt(self, url):
+        """One request: (response, error, whether the error is worth retrying)"""
+        try:
+            # Revalidate cached pages instead of downloading them again
+            entry = self.cache.lookup(url) if self.cache else None
+            headers = self.cache.conditional_headers(entry) if entry else None
+
+            waited = self.limiter.acquire()
+            logger.info(f"Fetching: {url}")
+            if self.metrics:
+                self.metrics.count('requests')
+            started = time.monotonic()
+            response = self.session.get(url, timeout=self.timeout, headers=headers)
+            latency = time.monotonic() - started
+            self.limiter.record(response.status_code, latency, response.headers.get('Retry-After'))
+            if self.metrics:
+                self.metrics.record_fetch(waited, latency, response.status_code, len(response.content))
+
+            if response.status_code == 304 and entry:
+                cached = self.cache.revalidated(entry)
+                if cached is None:
+                    # The stored body is gone and its entry dropped, so this asks for the page unconditionally
+                    logger.warning(f"Cached body for {url} is missing, fetching it again")
+                    return self._attempt(url)
+                logger.info(f"Not modified: {url}")
+                response = cached
+                if self.metrics:
+                    self.metrics.count('cache_hits')
+            else:
+                response.raise_for_status()
+                response.from_cache = False
+                if self.cache:
+                    self.cache.store(url, response)
+            response.cache_url = url
+            return response, None, False
+        except (requests.ConnectionError, requests.Timeout) as e:
+            return None, e, True
+        except requests.HTTPError as e:
+            return None, e, e.response is not None and e.response.status_code in RETRY_STATUSES
+        except Exception as e:
+            return None, e, False
+
+    def extract(self, response, name, build):
+        """Run build for a fetched page, reusing the stored result if the page was not modified"""
+        if self.cache is None:
+            return build()
+        value = self.cache.get_derived(response, name)
+        if value is not None:
+            if self.metrics:
+                self.metrics.count('extract_reused')
+            return value
+        value = build()
+        self.cache.put_derived(response, name, value)
+        return value
+
+    def _slot(self, url):
+        """Semaphore bounding in-flight requests for the URL's host"""
+        host = urlparse(url).netloc
+        if host not in self._host_slots:
+            self._host_slots[host] = asyncio.Semaphore(self.max_per_host)
+        return self._host_slots[host]
+
+    async def to_thread(self, func, *args):
+        """Run a blocking call on the engine's worker pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    async def fetch(self, url):
+        """Fetch a URL without blocking the event loop"""
+        async with self._slot(url):
+            return await self.to_thread(self.get, url)
+
+    async def fetch_all(self, urls):
+        """Fetch several URLs concurrently, preserving input order"""
+        return await asyncio.gather(*(self.fetch(url) for url in urls))
+
+    def run(self, coro):
+        """Run a crawl coroutine to completion on a fresh event loop"""
+        # Semaphores are bound to the loop that first uses them
+        self._host_slots = {}
+        return asyncio.run(coro)
+
+    def close(self):
+        """Release the worker pool and pooled connections"""
+        self.executor.shutdown(wait=True)
+        self.session.close()
+        if self.archive:
+            self.archive.close()
@@ -0,0 +1,153 @@
+"""
+Compact exports of the agents database
+Writes minified JSON plus a columnar form where repeated strings (categories,
+tags, pricing labels, sources, links) are interned into one string table,
+the same columnar document as msgpack when msgpack is installed, the
+precomputed lookup indexes used by the site and the full-text search index
+"""
+
+import json
+import os
+
+from .db_writer import atomic_write, write_database
+from .indexes import build_indexes
+from .search_index import build_search_index
+
+try:
+    import msgpack
+except ImportError:  # optional dependency
+    msgpack = None
+
+COLUMNAR_FORMAT = 'ai-agents-columnar'
+COLUMNAR_VERSION = 1
+
+# Fields whose values repeat across agents and are stored as string-table indexes
+INTERNED_FIELDS = ('source', 'pricing', 'pricing_info', 'categories', 'tags', 'external_links')
+
+
+def to_columnar(database):
+    """Columnar document: one array per agent field, repeated strings interned"""
+    strings = []
+    string_ids = {}
+
+    def intern(value):
+        if not isinstance(value, str):
+            raise TypeError(f"Cannot intern non-string value {value!r}")
+        if value not in string_ids:
+            string_ids[value] = len(strings)
+            strings.append(value)
+        return string_ids[value]
+
+    agents = database.get('agents', [])
+    fields = []
+    for agent in agents:
+        for field in agent:
+            if field not in fields:
+                fields.append(field)
+
+    columns = {}
+    for field in fields:
+        # Missing fields are stored as null
+        values = [agent.get(field) for agent in agents]
+        if field in INTERNED_FIELDS:
+            values = [
+                None if value is None
+                else [intern(item) for item in value] if isinstance(value, list)
+                else intern(value)
+                for value in values
+            ]
+        columns[field] = values
+
+    return {
+        'format': COLUMNAR_FORMAT,
+        'version': COLUMNAR_VERSION,
+        'metadata': database.get('metadata', {}),
+        'categories': database.get('categories', []),
+        'interned': [field for field in fields if field in INTERNED_FIELDS],
+        'strings': strings,
+        'agent_count': len(agents),
+        'columns': columns
+    }
+
+
+def from_columnar(document):
+    """Rebuild the regular database structure from a columnar document"""
+    if document.get('format') != COLUMNAR_FORMAT or document.get('version') != COLUMNAR_VERSION:
+        raise ValueError("Not a supported columnar agents database")
+
+    strings = document['strings']
+    interned = set(document['interned'])
+    agents = [{} for _ in range(document['agent_count'])]
+
+    for field, values in document['columns'].items():
+        for agent, value in zip(agents, values):
+            if value is None:
+                continue
+            if field in interned:
+                value = [strings[i] for i in value] if isinstance(value, list) else strings[value]
+            agent[field] = value
+
+    return {
+        'metadata': document['metadata'],
+        'categories': document['categories'],
+        'agents': agents
+    }
+
+
+def load_columnar(filepath):
+    """Load a columnar export (.json or .msgpack) back into the regular structure"""
+    if filepath.endswith('.msgpack'):
+        if msgpack is None:
+            raise RuntimeError("msgpack is not installed")
+        with open(filepath, 'rb') as f:
+            return from_columnar(msgpack.unpackb(f.read(), raw=False))
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return from_columnar(json.load(f))
+
+
+def export_paths(filepath, out_dir=None):
+    """Output paths for each export format, next to the database by default"""
+    directory = out_dir or os.path.dirname(filepath) or '.'
+    base = os.path.splitext(os.path.basename(filepath))[0]
+    return {
+        'min': os.path.join(directory, f"{base}.min.json"),
+        'columnar': os.path.join(directory, f"{base}.columnar.json"),
+        'msgpack': os.path.join(directory, f"{base}.msgpack"),
+        'indexes': os.path.join(directory, f"{base}.indexes.json"),
+        'search': os.path.join(directory, f"{base}.search.json")
+    }
+
+
+def export_database(filepath, out_dir=None, database=None):
+    """Write the compact exports of a database file, returning the paths written
+
+    A scraper that still holds the database passes it as database, so the file
+    it just streamed out is not read back into a second copy
+    """
+    if database is None:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            database = json.load(f)
+
+    paths = export_paths(filepath, out_dir)
+    written = {}
+
+    written['min'] = write_database(paths['min'], database.get('metadata', {}), database.get('categories', []),
+                                    iter(database.get('agents', [])), indent=None)
+
+    columnar = to_columnar(database)
+    written['columnar'] = atomic_write(paths['columnar'], [
+        json.dumps(columnar, ensure_ascii=False, separators=(',', ':'))
+    ])
+
+    if msgpack is not None:
+        written['msgpack'] = atomic_write(paths['msgpack'], [msgpack.packb(columnar, use_bin_type=True)], binary=True)
+
+    written['indexes'] = atomic_write(paths['indexes'], [
+        json.dumps(build_indexes(database), ensure_ascii=False, separators=(',', ':'))
+    ])
+
+    written['search'] = atomic_write(paths['search'], [
+        json.dumps(build_search_index(database), ensure_ascii=False, separators=(',', ':'))
+    ])
+
+    return written
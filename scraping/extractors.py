@@ -0,0 +1,103 @@
+"""
+Extraction helpers shared by the scrapers
+"""
+
+import re
+
+from bs4 import CData, NavigableString, Tag
+
+PRICING_KEYWORDS = ('free', 'paid', 'pricing', '$', 'cost')
+CONTENT_CLASS_WORDS = ('description', 'content')
+
+# Listing cards: text that reads like a description, and a price mention
+DESCRIPTION_WORDS = re.compile(r'ai|tool|help|automat|generat|creat')
+PRICING_HINT = re.compile(r'free|paid|\$|pricing')
+LISTING_PRICE = re.compile(r'(free|paid|free \+ paid|\$[\d,]+)', re.IGNORECASE)
+
+# String types get_text() joins; comments and script bodies are left out
+VISIBLE_STRINGS = (NavigableString, CData)
+
+
+def _is_content_div(tag):
+    """Div whose class mentions description or content"""
+    return any(word in value.lower() for value in tag.get('class') or [] for word in CONTENT_CLASS_WORDS)
+
+
+def scan_listing_card(card):
+    """Description candidates and pricing of a listing card in one walk of its subtree
+
+    Candidates are the stripped text nodes longer than 20 characters that
+    mention a description word, in document order
+    """
+    candidates = []
+    visible = []
+    for node in card.descendants:
+        if not isinstance(node, NavigableString):
+            continue
+        if type(node) in VISIBLE_STRINGS:
+            visible.append(node)
+        text = node.strip()
+        if len(text) > 20 and DESCRIPTION_WORDS.search(text.lower()):
+            candidates.append(text)
+
+    pricing = None
+    text = ''.join(visible)
+    if PRICING_HINT.search(text.lower()):
+        match = LISTING_PRICE.search(text)
+        if match:
+            pricing = match.group(1)
+    return candidates, pricing
+
+
+def scan_agent_page(soup, base_url, pricing_keywords=PRICING_KEYWORDS):
+    """Collect title, meta, pricing, links, categories and tags in one walk of the tree"""
+    scan = {
+        'title': None,
+        'meta_description': None,
+        'social_meta': {},
+        'pricing': None,
+        'external_links': [],
+        'categories': [],
+        'tags': [],
+        'anchor_tags': [],
+        'content_divs': []
+    }
+
+    for node in soup.descendants:
+        if isinstance(node, NavigableString):
+            if scan['pricing'] is None:
+                text = node.lower()
+                if any(word in text for word in pricing_keywords) and node.strip():
+                    scan['pricing'] = node.strip()
+            continue
+
+        if not isinstance(node, Tag):
+            continue
+
+        if node.name == 'a':
+            href = node.get('href')
+            if href is None:
+                continue
+            if href.startswith('http') and base_url not in href:
+                scan['external_links'].append(href)
+            if '/categories/' in href:
+                scan['categories'].append(node.get_text(strip=True))
+            elif '/tags/' in href:
+                scan['tags'].append(node.get_text(strip=True))
+            elif href.startswith('#'):
+                scan['anchor_tags'].append(node.get_text(strip=True))
+        elif node.name == 'meta':
+            name = node.get('name')
+            content = node.get('content')
+            if name == 'description' and scan['meta_description'] is None:
+                scan['meta_description'] = node.get('content', '')
+            property_name = node.get('property') or name
+            if property_name and content and ('og:' in property_name or 'twitter:' in property_name):
+                scan['social_meta'][f'meta_{property_name.replace(":", "_")}'] = content
+        elif node.name == 'h1':
+            if scan['title'] is None:
+                scan['title'] = node.get_text(strip=True)
+        elif node.name == 'div' and _is_content_div(node):
+            scan['content_divs'].append(node)
+
+    return scan
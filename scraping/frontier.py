@@ -0,0 +1,48 @@
+"""
+Crawl frontier: one prioritized, URL-deduplicated work queue drained by parallel workers
+"""
+
+import asyncio
+import itertools
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CrawlFrontier:
+    def __init__(self, canonicalize=None):
+        self.queue = asyncio.PriorityQueue()
+        self.seen = set()
+        self.order = itertools.count()
+        self.canonicalize = canonicalize
+
+    def add(self, url, priority=0, **meta):
+        """Queue a URL once, by its canonical form if the frontier has one; lower priority values are crawled first"""
+        if self.canonicalize:
+            url = self.canonicalize(url)
+        if url in self.seen:
+            return False
+        self.seen.add(url)
+        task = {'url': url, 'priority': priority, **meta}
+        self.queue.put_nowait((priority, next(self.order), task))
+        return True
+
+    async def drain(self, handler, workers=8):
+        """Run handler over queued tasks until the queue is empty, handlers may add more"""
+        async def worker():
+            while True:
+                _, _, task = await self.queue.get()
+                try:
+                    await handler(task)
+                except Exception as e:
+                    logger.error(f"Error crawling {task['url']}: {e}")
+                finally:
+                    self.queue.task_done()
+
+        tasks = [asyncio.create_task(worker()) for _ in range(workers)]
+        try:
+            await self.queue.join()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
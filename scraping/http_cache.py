@@ -0,0 +1,197 @@
+"""
+On-disk HTTP cache with ETag/Last-Modified revalidation
+Entries are keyed by URL and hold the body, response headers and validators,
+plus any results extracted from the body so unchanged pages need no re-parse.
+Extracted results are tagged with a version of the extraction code and count
+as missing once that code changes
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+# Headers that describe the transfer, not the stored (already decoded) body
+SKIPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection'}
+
+
+def code_version(*modules):
+    """Short hash of the modules' source, for tagging results extracted by that code"""
+    digest = hashlib.sha1()
+    for module in modules:
+        with open(module.__file__, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+class HTTPCache:
+    def __init__(self, directory='.http_cache', max_bytes=200 * 1024 * 1024, max_age=30 * 24 * 3600,
+                 derived_version=None):
+        self.directory = directory
+        self.derived_version = derived_version
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        # key -> (size, last validated) for eviction
+        self.index = {}
+        for filename in os.listdir(directory):
+            if filename.endswith('.json'):
+                meta = self._read_meta(filename[:-5])
+                if meta:
+                    self.index[filename[:-5]] = (meta['size'], meta['validated_at'])
+        self.evict()
+
+    def _key(self, url):
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+    def _path(self, key, suffix):
+        return os.path.join(self.directory, f"{key}.{suffix}")
+
+    def _read_meta(self, key):
+        try:
+            with open(self._path(key, 'json'), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, path, data, mode='w'):
+        """Write via a temp file so readers never see a partial entry"""
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        if mode == 'wb':
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+        else:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _remove(self, key):
+        for suffix in ('json', 'body'):
+            try:
+                os.remove(self._path(key, suffix))
+            except FileNotFoundError:
+                pass
+        self.index.pop(key, None)
+
+    def lookup(self, url):
+        """Stored entry for a URL, or None when missing or expired"""
+        key = self._key(url)
+        with self.lock:
+            if key not in self.index:
+                return None
+            meta = self._read_meta(key)
+            if not meta or time.time() - meta['validated_at'] > self.max_age:
+                self._remove(key)
+                return None
+            return meta
+
+    def conditional_headers(self, entry):
+        """If-None-Match / If-Modified-Since headers for revalidating an entry"""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, url, response):
+        """Store a 200 response that carries validators"""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+
+        key = self._key(url)
+        now = time.time()
+        meta = {
+            'url': url,
+            'headers': {name: value for name, value in response.headers.items() if name.lower() not in SKIPPED_HEADERS},
+            'etag': etag,
+            'last_modified': last_modified,
+            'size': len(response.content),
+            'validated_at': now,
+            'derived': {},
+            'derived_version': self.derived_version
+        }
+        with self.lock:
+            self._write(self._path(key, 'body'), response.content, mode='wb')
+            self._write(self._path(key, 'json'), meta)
+            self.index[key] = (meta['size'], now)
+        self.evict()
+
+    def revalidated(self, entry):
+        """Rebuild the response for an entry the server answered 304 for"""
+        key = self._key(entry['url'])
+        now = time.time()
+        with self.lock:
+            try:
+                with open(self._path(key, 'body'), 'rb') as f:
+                    content = f.read()
+            except OSError:
+                self._remove(key)
+                return None
+            entry['validated_at'] = now
+            self._write(self._path(key, 'json'), entry)
+            self.index[key] = (entry['size'], now)
+
+        response = Response()
+        response.status_code = 200
+        response._content = content
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.url = entry['url']
+        response.encoding = 'utf-8'
+        response.from_cache = True
+        response.cache_entry = entry
+        return response
+
+    def get_derived(self, response, name):
+        """Stored extraction result for a response that was not modified, else None"""
+        if getattr(response, 'from_cache', False):
+            entry = response.cache_entry
+            # Results from older extraction code are stale even though the page is not
+            if entry.get('derived_version') == self.derived_version:
+                return entry['derived'].get(name)
+        return None
+
+    def put_derived(self, response, name, value):
+        """Store an extraction result with the response's cache entry"""
+        url = getattr(response, 'cache_url', None)
+        if url is None:
+            return
+        key = self._key(url)
+        with self.lock:
+            entry = getattr(response, 'cache_entry', None)
+            meta = entry if entry is not None else self._read_meta(key)
+            if meta is not None and key in self.index:
+                if meta.get('derived_version') != self.derived_version:
+                    meta['derived'] = {}
+                    meta['derived_version'] = self.derived_version
+                meta['derived'][name] = value
+                self._write(self._path(key, 'json'), meta)
+
+    def evict(self):
+        """Drop expired entries, then least recently validated ones until under the size budget"""
+        now = time.time()
+        with self.lock:
+            for key, (_, validated_at) in list(self.index.items()):
+                if now - validated_at > self.max_age:
+                    self._remove(key)
+
+            total = sum(size for size, _ in self.index.values())
+            if total <= self.max_bytes:
+                return
+            for key, (size, _) in sorted(self.index.items(), key=lambda item: item[1][1]):
+                self._remove(key)
+                total -= size
+                if total <= self.max_bytes:
+                    break
+            logger.info(f"HTTP cache evicted down to {total} bytes")
@@ -0,0 +1,49 @@
+"""
+Precomputed lookup indexes for the site's data layer
+Mirrors the lookups in src/utils/data/database.ts so they resolve by key
+instead of scanning every agent
+"""
+
+import re
+
+
+def category_slug(category):
+    """Slug used by getAgentsByCategory: lowercase, whitespace runs to hyphens"""
+    return re.sub(r'\s+', '-', category.lower())
+
+
+def build_indexes(database):
+    """Index artifact: name, category slug and tag to agent positions, featured agents, categories by count"""
+    agents = database.get('agents', [])
+    categories = database.get('categories', [])
+
+    by_name = {}
+    by_category = {}
+    by_tag = {}
+    featured = []
+
+    for position, agent in enumerate(agents):
+        # First agent wins, as with Array.find
+        by_name.setdefault(agent['name'], position)
+
+        for slug in dict.fromkeys(category_slug(category) for category in agent.get('categories') or []):
+            by_category.setdefault(slug, []).append(position)
+
+        for tag in dict.fromkeys(agent.get('tags') or []):
+            by_tag.setdefault(tag, []).append(position)
+
+        if agent.get('detailed_title') and agent.get('tags'):
+            featured.append(position)
+
+    categories_by_count = sorted(range(len(categories)), key=lambda i: -(categories[i].get('count') or 0))
+
+    return {
+        # Lets the site detect an index built from a different database
+        'scraped_at': database.get('metadata', {}).get('scraped_at'),
+        'total_agents': len(agents),
+        'by_name': by_name,
+        'by_category': by_category,
+        'by_tag': by_tag,
+        'featured': featured,
+        'categories_by_count': categories_by_count
+    }
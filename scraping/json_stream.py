@@ -0,0 +1,107 @@
+"""
+Incremental reader for the database JSON
+Walks the top-level object in fixed-size chunks with json.JSONDecoder.raw_decode,
+yielding large arrays one element at a time so the whole file is never in memory
+"""
+
+import json
+import re
+
+CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = ' \t\n\r'
+
+# Numbers and literals have no closing character; they end at whitespace or a delimiter
+_SCALAR_END = re.compile(r'[\s,\]}:]')
+
+
+class _ChunkedText:
+    """Text buffer over a file that is read further only as values need it"""
+
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def fill(self):
+        """Read another chunk, dropping what has been consumed; False at end of file"""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character without consuming it, or '' at end of file"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, chars):
+        char = self.peek()
+        if char == '' or char not in chars:
+            raise ValueError(f"Expected one of {chars!r} at offset {self.pos}, found {char!r}")
+        self.pos += 1
+        return char
+
+    def value(self):
+        """Decode the next complete JSON value"""
+        if self.peek() not in '{["':
+            # Make sure the whole scalar is buffered, or "2." of "2.5" would decode as 2
+            while not _SCALAR_END.search(self.buffer, self.pos) and self.fill():
+                pass
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # Strings, arrays and objects fail to decode until their closing character is read
+                if self.fill():
+                    continue
+                raise
+            self.pos = end
+            return value
+
+    def items(self):
+        """Elements of the array that starts here, one at a time"""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.expect(',]') == ']':
+                return
+
+
+def iter_database(f, stream_keys=('agents',), chunk_size=CHUNK_SIZE):
+    """(key, value) pairs of the top-level object in f
+
+    Arrays under stream_keys are not built: they yield (key, element) once per element
+    """
+    text = _ChunkedText(f, chunk_size)
+    text.expect('{')
+    if text.peek() == '}':
+        return
+    while True:
+        key = text.value()
+        if not isinstance(key, str):
+            raise ValueError(f"Expected an object key, found {key!r}")
+        text.expect(':')
+        if key in stream_keys and text.peek() == '[':
+            for item in text.items():
+                yield key, item
+        else:
+            yield key, text.value()
+        if text.expect(',}') == '}':
+            return
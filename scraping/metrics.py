@@ -0,0 +1,164 @@
+"""
+Per-stage timing and counters for a scrape run
+Latency histograms for fetch, parse and extract plus rate-limit sleep,
+bytes, status codes, retries, circuit trips, parser fallbacks and cache
+hits, exported as a JSON summary or a Prometheus text file
+"""
+
+import json
+import statistics
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from .db_writer import atomic_write
+
+STAGES = ('fetch', 'parse', 'extract')
+
+# Histogram bucket upper bounds in seconds, as exported to Prometheus
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+COUNTERS = ('requests', 'errors', 'retries', 'cache_hits', 'extract_reused', 'circuit_trips',
+            'parse_fallbacks')
+
+PROMETHEUS_PREFIX = 'ai_agents_scraper'
+
+
+class ScrapeMetrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.timings = {stage: [] for stage in STAGES}
+        self.sleep_seconds = 0.0
+        self.bytes = 0
+        self.status_codes = Counter()
+        self.counters = Counter({name: 0 for name in COUNTERS})
+
+    def observe(self, stage, seconds):
+        with self.lock:
+            self.timings.setdefault(stage, []).append(seconds)
+
+    @contextmanager
+    def time(self, stage):
+        """Record the duration of the block under stage"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def count(self, name, n=1):
+        with self.lock:
+            self.counters[name] += n
+
+    def add_sleep(self, seconds):
+        """Time deliberately spent waiting: retry backoff or an open circuit"""
+        with self.lock:
+            self.sleep_seconds += seconds
+
+    def record_fetch(self, waited, latency, status, size):
+        """One HTTP exchange: limiter wait, round trip, status and body size"""
+        with self.lock:
+            self.sleep_seconds += waited
+            self.timings['fetch'].append(latency)
+            self.status_codes[status] += 1
+            self.bytes += size
+
+    def take_timings(self):
+        """Stage timings recorded so far, clearing them (for handing back from worker processes)"""
+        with self.lock:
+            timings, self.timings = self.timings, {stage: [] for stage in STAGES}
+        return timings
+
+    def merge_timings(self, timings):
+        with self.lock:
+            for stage, samples in timings.items():
+                self.timings.setdefault(stage, []).extend(samples)
+
+    def take_counters(self):
+        """Non-zero counters recorded so far, clearing them (for handing back from worker processes)"""
+        with self.lock:
+            counters = {name: n for name, n in self.counters.items() if n}
+            self.counters = Counter({name: 0 for name in COUNTERS})
+        return counters
+
+    def merge_counters(self, counters):
+        with self.lock:
+            self.counters.update(counters)
+
+    def stage_summary(self, samples):
+        if not samples:
+            return {'count': 0, 'total_s': 0.0}
+        ordered = sorted(samples)
+        return {
+            'count': len(ordered),
+            'total_s': round(sum(ordered), 4),
+            'mean_ms': round(statistics.mean(ordered) * 1000, 3),
+            'p50_ms': round(ordered[len(ordered) // 2] * 1000, 3),
+            'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+            'max_ms': round(ordered[-1] * 1000, 3),
+        }
+
+    def summary(self):
+        """JSON-ready summary of the run so far"""
+        with self.lock:
+            timings = {stage: list(samples) for stage, samples in self.timings.items()}
+            status_codes = dict(self.status_codes)
+            counters = dict(self.counters)
+            sleep_seconds, size = self.sleep_seconds, self.bytes
+        return {
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)),
+            'elapsed_s': round(time.time() - self.started, 3),
+            'stages': {stage: self.stage_summary(samples) for stage, samples in timings.items()},
+            'sleep_s': round(sleep_seconds, 3),
+            'bytes': size,
+            'status_codes': {str(status): n for status, n in sorted(status_codes.items())},
+            **counters,
+        }
+
+    def prometheus_lines(self):
+        """Prometheus text exposition of the run"""
+        with self.lock:
+            timings = {stage: list(samples) for stage, samples in self.timings.items()}
+            status_codes = dict(self.status_codes)
+            counters = dict(self.counters)
+            sleep_seconds, size = self.sleep_seconds, self.bytes
+
+        name = f"{PROMETHEUS_PREFIX}_stage_seconds"
+        yield f"# HELP {name} Time spent per page in each scrape stage\n"
+        yield f"# TYPE {name} histogram\n"
+        for stage, samples in timings.items():
+            for bound in BUCKETS:
+                yield f'{name}_bucket{{stage="{stage}",le="{bound}"}} {sum(1 for s in samples if s <= bound)}\n'
+            yield f'{name}_bucket{{stage="{stage}",le="+Inf"}} {len(samples)}\n'
+            yield f'{name}_sum{{stage="{stage}"}} {sum(samples)}\n'
+            yield f'{name}_count{{stage="{stage}"}} {len(samples)}\n'
+
+        yield f"# TYPE {PROMETHEUS_PREFIX}_sleep_seconds_total counter\n"
+        yield f"{PROMETHEUS_PREFIX}_sleep_seconds_total {sleep_seconds}\n"
+        yield f"# TYPE {PROMETHEUS_PREFIX}_bytes_total counter\n"
+        yield f"{PROMETHEUS_PREFIX}_bytes_total {size}\n"
+        yield f"# TYPE {PROMETHEUS_PREFIX}_responses_total counter\n"
+        for status, n in sorted(status_codes.items()):
+            yield f'{PROMETHEUS_PREFIX}_responses_total{{status="{status}"}} {n}\n'
+        for counter, n in sorted(counters.items()):
+            yield f"# TYPE {PROMETHEUS_PREFIX}_{counter}_total counter\n"
+            yield f"{PROMETHEUS_PREFIX}_{counter}_total {n}\n"
+
+    def write_json(self, filepath, extra=None):
+        """Write the summary, with any extra top-level fields"""
+        atomic_write(filepath, [json.dumps({**self.summary(), **(extra or {})}, indent=2), '\n'])
+        return filepath
+
+    def write_prometheus(self, filepath):
+        atomic_write(filepath, self.prometheus_lines())
+        return filepath
+
+    def log_line(self):
+        """One-line digest of where the crawl time went"""
+        summary = self.summary()
+        stages = ', '.join(f"{stage} {data['total_s']:.1f}s/{data['count']}"
+                           for stage, data in summary['stages'].items())
+        return (f"{stages}, sleep {summary['sleep_s']:.1f}s, {summary['bytes'] / 1024:.0f} KiB, "
+                f"{summary['requests']} requests, {summary['errors']} errors, {summary['cache_hits']} cache hits")
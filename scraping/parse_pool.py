@@ -0,0 +1,44 @@
+"""
+Process pool for CPU-bound parsing and extraction
+Fetchers hand raw page bytes to worker processes and get plain dicts back;
+a bounded number of in-flight jobs gives the fetch stage backpressure
+"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+class ParsePool:
+    def __init__(self, workers=None, max_pending=None, initializer=None, initargs=()):
+        self.workers = workers or os.cpu_count() or 1
+        # Jobs queued beyond this make fetchers wait instead of piling up pages in memory
+        self.max_pending = max_pending or self.workers * 2
+        self.initializer = initializer
+        self.initargs = initargs
+        self.executor = None
+        self._slots = None
+
+    def _ensure_started(self):
+        if self.executor is None:
+            # spawn avoids forking a process that already runs fetch threads
+            self.executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                mp_context=multiprocessing.get_context('spawn'),
+                                                initializer=self.initializer, initargs=self.initargs)
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+
+    async def run(self, func, *args):
+        """Run func(*args) in a worker process once a pending slot is free"""
+        self._ensure_started()
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+
+    def close(self):
+        """Stop the worker processes; the pool restarts on next use"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+        self.executor = None
+        self._slots = None
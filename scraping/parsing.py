@@ -0,0 +1,125 @@
+"""
+HTML parser backend selection for the scrapers
+Parses with the fastest installed BeautifulSoup backend and falls back to
+html5lib only for pages the fast backend fails on. Listing and category pages
+can be parsed partially, building only the parts the extractors read.
+"""
+
+import logging
+
+from bs4 import BeautifulSoup, SoupStrainer, UnicodeDammit
+from bs4.builder import builder_registry
+
+try:
+    import lxml.html as lxml_html
+    from lxml import etree
+except ImportError:  # optional dependency
+    lxml_html = None
+
+logger = logging.getLogger(__name__)
+
+# Fastest first; html5lib is the slow but most forgiving last resort
+PARSER_PREFERENCE = ['lxml', 'html.parser', 'html5lib']
+FALLBACK_PARSER = 'html5lib'
+
+# Category extraction only reads these anchors
+CATEGORY_LINKS = SoupStrainer('a', href=lambda href: href and '/categories/' in href)
+
+# What listing extraction reads: agent cards (the immediate parents of agent
+# links), pagination blocks and every link, for next-page and page-number checks
+LISTING_XPATH = ('//a[contains(@href, "/agent/")]/.. | //a'
+                 ' | //div[contains(translate(@class, "PAGINTO", "paginto"), "pagination")]')
+
+# Elements that do not survive being reparsed outside their table, select or document
+UNSPLITTABLE = {'html', 'head', 'body', 'thead', 'tbody', 'tfoot', 'tr', 'td', 'th',
+                'caption', 'colgroup', 'col', 'select', 'optgroup', 'option'}
+
+
+def available_parsers():
+    """BeautifulSoup backends installed in this environment, fastest first"""
+    return [name for name in PARSER_PREFERENCE if builder_registry.lookup(name)]
+
+
+def choose_parser(preferred=None):
+    """Pick a parser backend, honouring a preference when it is installed"""
+    if preferred:
+        if builder_registry.lookup(preferred):
+            return preferred
+        logger.warning(f"Parser backend '{preferred}' is not installed, choosing automatically")
+    return available_parsers()[0]
+
+
+class PageParser:
+    def __init__(self, backend=None, fallback=FALLBACK_PARSER, metrics=None):
+        self.backend = choose_parser(backend)
+        self.fallback = fallback if builder_registry.lookup(fallback) else None
+        self.metrics = metrics
+
+    def parse(self, content, **kwargs):
+        """Parse page content, retrying with the fallback backend on failure"""
+        try:
+            soup = BeautifulSoup(content, self.backend, **kwargs)
+            # A non-empty page that yields no elements did not really parse,
+            # unless a strainer legitimately matched nothing
+            if soup.find() is not None or not content.strip() or kwargs.get('parse_only'):
+                return soup
+            reason = 'empty tree'
+        except Exception as e:
+            reason = e
+
+        if not self.fallback or self.fallback == self.backend:
+            logger.error(f"Failed to parse page with {self.backend}: {reason}")
+            return None
+
+        logger.warning(f"Parser {self.backend} failed ({reason}), falling back to {self.fallback}")
+        if self.metrics:
+            self.metrics.count('parse_fallbacks')
+        return BeautifulSoup(content, self.fallback, **kwargs)
+
+    def parse_category_links(self, content):
+        """Parse only the category anchors of a page"""
+        return self.parse(content, parse_only=CATEGORY_LINKS)
+
+    def parse_listing(self, content):
+        """Parse only the agent cards, pagination and links of a listing page
+
+        Finds the parts with a quick lxml pass and builds the soup from just
+        those subtrees; falls back to a full parse when that is not possible
+        """
+        if self.backend == 'lxml':
+            fragment = listing_fragment(content)
+            if fragment is not None:
+                return self.parse(fragment)
+        return self.parse(content)
+
+
+def listing_fragment(content):
+    """The parts of a listing page its extractors read, as a small HTML document
+
+    A start-tag filter cannot select "the parent of an agent link", so the page
+    is first parsed into a bare lxml tree (no Python object per node) and the
+    subtrees picked out by LISTING_XPATH are serialized in document order.
+    Returns None if the page cannot be cut down safely.
+    """
+    if lxml_html is None or not content.strip():
+        return None
+    if isinstance(content, bytes):
+        content = UnicodeDammit(content, is_html=True).unicode_markup
+        if content is None:
+            return None
+    try:
+        root = lxml_html.document_fromstring(content)
+    except (etree.ParserError, ValueError):
+        return None
+
+    # XPath unions come back in document order
+    elements = root.xpath(LISTING_XPATH)
+    kept = set(elements)
+    parts = []
+    for element in elements:
+        if any(ancestor in kept for ancestor in element.iterancestors()):
+            continue  # Already inside a kept subtree
+        if not isinstance(element.tag, str) or element.tag in UNSPLITTABLE:
+            return None
+        parts.append(lxml_html.tostring(element, encoding='unicode', with_tail=False))
+    return '<html><body>' + ''.join(parts) + '</body></html>'
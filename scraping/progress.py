@@ -0,0 +1,119 @@
+"""
+Live progress status for a running scrape
+A small JSON file rewritten at most once per interval with the current phase,
+queue depth, completed/failed counts, throughput and ETA, so a monitor can
+read it in O(1) instead of reparsing progress snapshots
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from .db_writer import atomic_write
+
+DEFAULT_STATUS_PATH = os.path.join("data", "scrape_status.json")
+
+
+class ProgressReporter:
+    def __init__(self, path=DEFAULT_STATUS_PATH, interval=1.0, window=30.0):
+        self.path = path
+        self.interval = interval
+        self.window = window
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.state = 'running'
+        self.phase_name = None
+        self.phase_started = self.started
+        self.total = None
+        self.completed = 0
+        self.failed = 0
+        self.queued = 0
+        self.samples = deque()  # (time, items done), for throughput over the recent window
+        self.last_write = 0.0
+
+    def phase(self, name, total=None):
+        """Start counting a new phase"""
+        with self.lock:
+            self.phase_name = name
+            self.phase_started = time.time()
+            self.total = total
+            self.completed = self.failed = 0
+            self.queued = total or 0
+            self.samples.clear()
+        self.write(force=True)
+
+    def advance(self, completed=1, failed=0, queued=None, total=None):
+        """Count finished items; queued and total replace the current values when given"""
+        with self.lock:
+            self.completed += completed
+            self.failed += failed
+            if queued is not None:
+                self.queued = queued
+            if total is not None:
+                self.total = total
+            now = time.time()
+            self.samples.append((now, self.completed + self.failed))
+            while len(self.samples) > 2 and now - self.samples[0][0] > self.window:
+                self.samples.popleft()
+            # The last item of a phase is always written, so the file never ends a phase stale
+            phase_done = self.total is not None and self.completed + self.failed >= self.total
+        self.write(force=phase_done)
+
+    def finish(self, state='finished'):
+        with self.lock:
+            self.state = state
+            self.queued = 0
+        self.write(force=True)
+
+    def throughput(self, now):
+        """Items per second over the recent window, or over the whole phase early on"""
+        if len(self.samples) >= 2 and self.samples[-1][0] > self.samples[0][0]:
+            (t0, n0), (t1, n1) = self.samples[0], self.samples[-1]
+            return (n1 - n0) / (t1 - t0)
+        elapsed = now - self.phase_started
+        return (self.completed + self.failed) / elapsed if elapsed > 0 else 0.0
+
+    def snapshot(self):
+        with self.lock:
+            now = time.time()
+            rate = self.throughput(now)
+            done = self.completed + self.failed
+            eta = None
+            if self.total is not None and rate > 0 and self.state == 'running':
+                eta = round(max(0, self.total - done) / rate, 1)
+            return {
+                'pid': os.getpid(),
+                'state': self.state,
+                'phase': self.phase_name,
+                'total': self.total,
+                'completed': self.completed,
+                'failed': self.failed,
+                'queue_depth': self.queued,
+                'throughput_per_s': round(rate, 3),
+                'eta_s': eta,
+                'phase_elapsed_s': round(now - self.phase_started, 1),
+                'elapsed_s': round(now - self.started, 1),
+                'updated_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(now)),
+            }
+
+    def write(self, force=False):
+        """Rewrite the status file, at most once per interval unless forced"""
+        if not self.path:
+            return
+        now = time.monotonic()
+        with self.lock:
+            if not force and now - self.last_write < self.interval:
+                return
+            self.last_write = now
+        atomic_write(self.path, [json.dumps(self.snapshot(), indent=2), '\n'])
+
+
+def read_status(path=DEFAULT_STATUS_PATH):
+    """Status written by a ProgressReporter, or None if there is none"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
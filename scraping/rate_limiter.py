@@ -0,0 +1,97 @@
+"""
+Token-bucket rate limiter shared by the scrapers
+Targets a requests/second rate with burst capacity, slows down when the server
+gets slower and backs off on 429/503 using Retry-After
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+logger = logging.getLogger(__name__)
+
+BACKOFF_STATUSES = (429, 503)
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class RateLimiter:
+    def __init__(self, rate=2.0, burst=4, min_rate=0.2, latency_factor=2.0, latency_slack=0.25, default_backoff=5.0):
+        self.target_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.latency_factor = latency_factor
+        self.latency_slack = latency_slack
+        self.default_backoff = default_backoff
+
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.latency_avg = None
+        self.latency_floor = None
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """Block until a request may be sent, returning the seconds spent waiting"""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.blocked_until:
+                    wait = self.blocked_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                else:
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def record(self, status, latency, retry_after=None):
+        """Feed back a finished request so the rate tracks server health"""
+        with self.lock:
+            if status in BACKOFF_STATUSES:
+                pause = parse_retry_after(retry_after)
+                if pause is None:
+                    pause = self.default_backoff
+                self.blocked_until = max(self.blocked_until, time.monotonic() + pause)
+                self.rate = max(self.min_rate, self.rate / 2)
+                self.tokens = 0.0
+                logger.warning(f"Server returned {status}, pausing {pause:.1f}s and lowering rate to {self.rate:.2f}/s")
+                return
+
+            # Smoothed latency against the fastest smoothed latency seen so far
+            if self.latency_avg is None:
+                self.latency_avg = latency
+            else:
+                self.latency_avg = 0.8 * self.latency_avg + 0.2 * latency
+            if self.latency_floor is None or self.latency_avg < self.latency_floor:
+                self.latency_floor = self.latency_avg
+
+            slow_threshold = max(self.latency_floor * self.latency_factor, self.latency_floor + self.latency_slack)
+            if self.latency_avg > slow_threshold:
+                self.rate = max(self.min_rate, self.rate * 0.9)
+            else:
+                self.rate = min(self.target_rate, self.rate + self.target_rate * 0.05)
@@ -0,0 +1,34 @@
+"""
+Methods the legacy and optimized scrapers share
+Both keep the same run state (base_url, urls, engine, metrics and the saved
+metadata, categories and agents), so URL canonicalization, the in-memory
+database and the metrics files are written once here
+"""
+
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+class ScraperBase:
+    def canonical(self, url):
+        """Canonical form of a URL on this site"""
+        return self.urls.canonical(url, self.base_url)
+
+    def database(self):
+        """The database as last saved, for exporting without reading the file back"""
+        return {'metadata': self.metadata, 'categories': self.categories, 'agents': self.agents_data}
+
+    def save_metrics(self, filepath=os.path.join("data", "scrape_metrics.json"), prometheus_path=None):
+        """Write the run's metrics summary, and a Prometheus text file if asked"""
+        # URLs still failing after every retry, for a follow-up run
+        self.metrics.write_json(filepath, {'dead_letters': list(self.engine.dead_letters.values()),
+                                           'url_canonicalization': self.urls.stats()})
+        if prometheus_path:
+            self.metrics.write_prometheus(prometheus_path)
+        logger.info(f"Metrics: {self.metrics.log_line()}")
+        logger.info(f"URLs: {self.urls.log_line()}")
+        if self.engine.dead_letters:
+            logger.warning(f"{len(self.engine.dead_letters)} URLs still failing, listed under dead_letters in {filepath}")
+        return filepath
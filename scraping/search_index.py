@@ -0,0 +1,175 @@
+"""
+Full-text search index over agent titles, descriptions and tags
+Builds a compact inverted index with normalized tokens and precomputed
+BM25 scores, sorted terms for prefix (autocomplete) lookups, and a small
+query API over the serialized form
+"""
+
+import bisect
+import heapq
+import json
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+SEARCH_INDEX_VERSION = 1
+
+# Field weights for the BM25 term frequency: names and titles count most
+FIELD_WEIGHTS = {
+    'name': 3.0,
+    'title': 3.0,
+    'detailed_title': 3.0,
+    'tags': 2.0,
+    'categories': 1.5,
+    'description': 1.0,
+    'meta_description': 1.0
+}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Scores are stored as integers with this many decimal places
+SCORE_SCALE = 1000
+
+STOPWORDS = frozenset({
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'into', 'is', 'it',
+    'its', 'of', 'on', 'or', 'that', 'the', 'their', 'this', 'to', 'with', 'your'
+})
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+
+def normalize(text):
+    """Lowercase and strip accents"""
+    text = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in text if not unicodedata.combining(char)).lower()
+
+
+def tokenize(text):
+    """Normalized tokens of a text, without stopwords"""
+    return [token for token in TOKEN_PATTERN.findall(normalize(text)) if token not in STOPWORDS]
+
+
+def query_tokens(text, prefix=True):
+    """Tokens of a query, without stopwords except a last token still being typed
+
+    With prefix, a last token not followed by a separator is kept even if it
+    is a stopword, so "in" can still grow into "invoice"
+    """
+    tokens = TOKEN_PATTERN.findall(normalize(text))
+    partial = bool(prefix and tokens and TOKEN_PATTERN.fullmatch(normalize(text[-1:])))
+    completed = tokens[:-1] if partial else tokens
+    return [token for token in completed if token not in STOPWORDS] + (tokens[-1:] if partial else [])
+
+
+def _field_text(value):
+    if isinstance(value, list):
+        return ' '.join(str(item) for item in value)
+    return str(value) if value else ''
+
+
+def build_search_index(database):
+    """Serializable inverted index with BM25 scores precomputed per posting"""
+    agents = database.get('agents', [])
+
+    doc_terms = []
+    for agent in agents:
+        frequencies = Counter()
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(_field_text(agent.get(field))):
+                frequencies[token] += weight
+        doc_terms.append(frequencies)
+
+    doc_lengths = [sum(frequencies.values()) for frequencies in doc_terms]
+    average_length = (sum(doc_lengths) / len(doc_lengths)) if doc_lengths else 0.0
+
+    postings = defaultdict(list)
+    for doc_id, frequencies in enumerate(doc_terms):
+        for term, frequency in frequencies.items():
+            postings[term].append((doc_id, frequency))
+
+    doc_count = len(agents)
+    terms = sorted(postings)
+    serialized_postings = []
+    for term in terms:
+        documents = postings[term]
+        idf = math.log(1 + (doc_count - len(documents) + 0.5) / (len(documents) + 0.5))
+        flat = []
+        for doc_id, frequency in documents:
+            length_norm = 1 - BM25_B + BM25_B * doc_lengths[doc_id] / average_length
+            score = idf * frequency * (BM25_K1 + 1) / (frequency + BM25_K1 * length_norm)
+            flat.extend((doc_id, round(score * SCORE_SCALE)))
+        serialized_postings.append(flat)
+
+    return {
+        'version': SEARCH_INDEX_VERSION,
+        'scraped_at': database.get('metadata', {}).get('scraped_at'),
+        'docs': [agent.get('name') for agent in agents],
+        'terms': terms,
+        'postings': serialized_postings
+    }
+
+
+class SearchIndex:
+    def __init__(self, data):
+        if data.get('version') != SEARCH_INDEX_VERSION:
+            raise ValueError("Unsupported search index version")
+        self.docs = data['docs']
+        self.terms = data['terms']
+        self.postings = data['postings']
+
+    @classmethod
+    def load(cls, filepath):
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def _term_range(self, prefix):
+        """Positions of the terms starting with prefix"""
+        start = bisect.bisect_left(self.terms, prefix)
+        end = bisect.bisect_left(self.terms, prefix + '\uffff', start)
+        return range(start, end)
+
+    def _exact(self, term):
+        position = bisect.bisect_left(self.terms, term)
+        if position < len(self.terms) and self.terms[position] == term:
+            return position
+        return None
+
+    def search(self, query, limit=10, prefix=True):
+        """Agent names ranked by BM25 score; the last query token also matches as a prefix"""
+        tokens = query_tokens(query, prefix)
+        if not tokens:
+            return []
+
+        scores = defaultdict(int)
+        for i, token in enumerate(tokens):
+            if prefix and i == len(tokens) - 1:
+                positions = self._term_range(token)
+            else:
+                position = self._exact(token)
+                positions = [] if position is None else [position]
+
+            # Best expansion per document, so one prefix cannot count several times
+            token_scores = {}
+            for position in positions:
+                flat = self.postings[position]
+                for j in range(0, len(flat), 2):
+                    doc_id, score = flat[j], flat[j + 1]
+                    if score > token_scores.get(doc_id, 0):
+                        token_scores[doc_id] = score
+            for doc_id, score in token_scores.items():
+                scores[doc_id] += score
+
+        ranked = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+        return [(self.docs[doc_id], score / SCORE_SCALE) for doc_id, score in ranked]
+
+    def suggest(self, prefix, limit=10):
+        """Autocomplete: indexed terms starting with prefix, most common first"""
+        tokens = query_tokens(prefix)
+        if not tokens:
+            return []
+        candidates = [(self.terms[position], len(self.postings[position]) // 2)
+                      for position in self._term_range(tokens[-1])]
+        candidates.sort(key=lambda item: (-item[1], item[0]))
+        return [term for term, _ in candidates[:limit]]
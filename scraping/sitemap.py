@@ -0,0 +1,108 @@
+"""
+Streaming reader for sitemaps and feeds
+Yields (kind, url, lastmod) entries from sitemap.xml, sitemap indexes, RSS and
+Atom feeds as the XML is read, dropping each entry's elements once it is
+yielded so memory stays flat however long the file is
+"""
+
+import zlib
+from datetime import date, datetime, timezone
+from email.utils import parsedate_to_datetime
+from xml.etree import ElementTree
+
+CHUNK_SIZE = 1 << 16
+
+# Entry elements and the child elements holding their location and date, by local name
+ENTRY_TAGS = {
+    'url': ('page', ('loc',), ('lastmod',)),
+    'sitemap': ('sitemap', ('loc',), ('lastmod',)),
+    'item': ('page', ('link', 'guid'), ('lastmod', 'updated', 'date', 'pubDate')),
+    'entry': ('page', ('link', 'id'), ('updated', 'published')),
+}
+
+
+def local_name(tag):
+    """Tag without its namespace"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def parse_lastmod(text):
+    """Aware datetime from a W3C (sitemap, Atom) or RFC 822 (RSS) date, or None"""
+    text = (text or '').strip()
+    if not text:
+        return None
+    try:
+        if len(text) == 10:
+            # A bare date could mean any time that day; the end of it errs toward refetching
+            value = datetime.combine(date.fromisoformat(text), datetime.max.time())
+        else:
+            value = datetime.fromisoformat(text.replace('Z', '+00:00'))
+    except ValueError:
+        try:
+            value = parsedate_to_datetime(text)
+        except (TypeError, ValueError):
+            return None
+    # Dates without an offset are read as UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _entry(element, url_tags, date_tags):
+    url = lastmod = None
+    for child in element:
+        name = local_name(child.tag)
+        if url is None and name in url_tags:
+            # Atom links carry the URL in href; RSS guids only count when they are permalinks
+            if name == 'link' and child.get('href'):
+                if child.get('rel', 'alternate') == 'alternate':
+                    url = child.get('href').strip()
+            elif name != 'guid' or child.get('isPermaLink', 'true') == 'true':
+                url = (child.text or '').strip() or None
+        elif lastmod is None and name in date_tags:
+            lastmod = parse_lastmod(child.text)
+    return url, lastmod
+
+
+def iter_sitemap(chunks):
+    """(kind, url, lastmod) for each entry in XML fed as byte chunks
+
+    kind is 'sitemap' for entries of a sitemap index and 'page' otherwise.
+    Gzipped input is detected and decompressed on the fly
+    """
+    parser = ElementTree.XMLPullParser(events=('start', 'end'))
+    decompressor = None
+    first = True
+    open_elements = []
+
+    def entries():
+        for event, element in parser.read_events():
+            if event == 'start':
+                open_elements.append(element)
+                continue
+            open_elements.pop()
+            spec = ENTRY_TAGS.get(local_name(element.tag))
+            if spec is None:
+                continue
+            kind, url_tags, date_tags = spec
+            url, lastmod = _entry(element, url_tags, date_tags)
+            if open_elements:
+                open_elements[-1].remove(element)
+            if url:
+                yield kind, url, lastmod
+
+    for chunk in chunks:
+        if first:
+            first = False
+            if chunk[:2] == b'\x1f\x8b':
+                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        parser.feed(decompressor.decompress(chunk) if decompressor else chunk)
+        yield from entries()
+    if decompressor:
+        parser.feed(decompressor.flush())
+    parser.close()
+    yield from entries()
+
+
+def iter_chunks(content, chunk_size=CHUNK_SIZE):
+    """Fixed-size slices of a response body"""
+    for start in range(0, len(content), chunk_size):
+        yield content[start:start + chunk_size]
@@ -0,0 +1,114 @@
+"""
+URL canonicalization for the crawl
+Folds the variants of a site URL (mirror host, scheme, case, trailing slash,
+tracking query, fragment) into one form before anything is fetched, and keeps
+count of what was folded for the run summary
+"""
+
+import threading
+from collections import Counter
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+# Hosts serving the same directory; URLs on any of them are rewritten to the crawl's base host
+SITE_HOSTS = ('aiagentslist.com', 'www.aiagentslist.com', 'ai-agents.30tools.com')
+
+# Query parameters that never change which page is served
+TRACKING_PARAMS = ('ref', 'ref_src', 'fbclid', 'gclid', 'mc_cid', 'mc_eid')
+TRACKING_PREFIXES = ('utm_',)
+
+# Variants listed individually in the summary
+MAX_EXAMPLES = 10
+
+
+def _keep_param(name):
+    name = name.lower()
+    return name not in TRACKING_PARAMS and not name.startswith(TRACKING_PREFIXES)
+
+
+def canonical_url(url, base_url):
+    """Canonical form of url, resolved against base_url
+
+    Site URLs move to base_url's scheme and host, lose case, trailing slashes,
+    fragments and tracking parameters, and keep their other parameters sorted.
+    Agent pages keep no query at all. Other hosts only lose the fragment
+    """
+    base = urlsplit(base_url)
+    parts = urlsplit(urljoin(base_url.rstrip('/') + '/', url.strip()))
+    host = parts.netloc.lower()
+    if host != base.netloc.lower() and host.split(':')[0] not in SITE_HOSTS:
+        return urlunsplit((parts.scheme, parts.netloc, parts.path, parts.query, ''))
+
+    path = parts.path.lower().rstrip('/')
+    if path.startswith('/agent/'):
+        query = ''
+    else:
+        query = urlencode(sorted((name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+                                 if _keep_param(name)))
+    return urlunsplit((base.scheme, base.netloc.lower(), path, query, ''))
+
+
+def agent_key(value):
+    """Identity of an agent: the lowercased slug from its name or any of its URLs"""
+    path = urlsplit(value.strip()).path
+    if '/agent/' in path:
+        path = path.split('/agent/', 1)[1]
+    return path.strip('/').lower()
+
+
+def rewrite_reasons(url, canonical):
+    """What canonicalization changed about an absolute url"""
+    before, after = urlsplit(url), urlsplit(canonical)
+    reasons = set()
+    if before.scheme.lower() != after.scheme:
+        reasons.add('scheme')
+    if before.netloc.lower() != after.netloc.lower():
+        reasons.add('host')
+    elif before.netloc != after.netloc:
+        reasons.add('case')
+    if before.path != before.path.rstrip('/') and before.path.rstrip('/'):
+        reasons.add('trailing_slash')
+    if before.path.rstrip('/') != before.path.rstrip('/').lower():
+        reasons.add('case')
+    if before.query != after.query:
+        reasons.add('query')
+    if before.fragment:
+        reasons.add('fragment')
+    return reasons
+
+
+class URLCanonicalizer:
+    """canonical_url plus a record of which raw URLs each canonical URL stood for"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.variants = {}
+        self.rewrites = Counter()
+
+    def canonical(self, url, base_url):
+        raw = urljoin(base_url.rstrip('/') + '/', url.strip())
+        canonical = canonical_url(raw, base_url)
+        with self.lock:
+            variants = self.variants.setdefault(canonical, set())
+            if raw not in variants:
+                variants.add(raw)
+                self.rewrites.update(rewrite_reasons(raw, canonical))
+        return canonical
+
+    def stats(self):
+        """JSON-ready collision statistics"""
+        with self.lock:
+            colliding = {canonical: sorted(variants) for canonical, variants in self.variants.items()
+                         if len(variants) > 1}
+            return {
+                'raw_urls': sum(len(variants) for variants in self.variants.values()),
+                'canonical_urls': len(self.variants),
+                'collisions': sum(len(variants) - 1 for variants in colliding.values()),
+                'colliding_urls': len(colliding),
+                'rewrites': dict(self.rewrites.most_common()),
+                'examples': dict(list(colliding.items())[:MAX_EXAMPLES]),
+            }
+
+    def log_line(self):
+        stats = self.stats()
+        return (f"{stats['raw_urls']} distinct URLs folded into {stats['canonical_urls']} "
+                f"({stats['collisions']} duplicates avoided)")
@@ -0,0 +1,162 @@
+"""
+Single-pass validation of the agents database
+Streams agents from the file and gathers completeness, pricing, per-category
+counts, duplicates and schema violations in one walk, as a JSON-ready report
+"""
+
+import os
+from collections import Counter
+
+from .json_stream import iter_database
+
+# Field types from the AIAgent interface in src/types/index.ts
+AGENT_FIELDS = {
+    'name': str,
+    'url': str,
+    'source': str,
+    'title': str,
+    'description': str,
+    'pricing': str,
+    'categories': list,
+    'detailed_title': str,
+    'meta_description': str,
+    'pricing_info': str,
+    'external_links': list,
+    'tags': list,
+}
+
+# Fields the site reads without a guard; categories is typed required but every use checks for it
+REQUIRED_FIELDS = ('name', 'url', 'source', 'title', 'description', 'pricing')
+
+PRICING_VALUES = ('Free', 'Paid', 'Free + Paid', 'Ask for Pricing')
+
+COMPLETENESS_FIELDS = ('description', 'pricing', 'categories', 'detailed_title', 'meta_description',
+                       'pricing_info', 'external_links', 'tags')
+
+# Violations listed individually in the report; the rest are only counted
+MAX_EXAMPLES = 50
+
+
+class AgentStats:
+    """Running statistics over agents seen so far"""
+
+    def __init__(self):
+        self.count = 0
+        self.completeness = Counter({field: 0 for field in COMPLETENESS_FIELDS})
+        self.pricing = Counter()
+        self.categories = Counter()
+        self.names = Counter()
+        self.urls = Counter()
+        self.violations = Counter()
+        self.examples = []
+        self.first = None
+
+    def violation(self, index, agent, rule, field=None):
+        self.violations[rule] += 1
+        if len(self.examples) < MAX_EXAMPLES:
+            example = {'index': index, 'rule': rule}
+            if field:
+                example['field'] = field
+            if isinstance(agent, dict) and isinstance(agent.get('name'), str):
+                example['name'] = agent['name']
+            self.examples.append(example)
+
+    def add(self, agent):
+        index = self.count
+        self.count += 1
+        if not isinstance(agent, dict):
+            self.violation(index, agent, 'not_an_object')
+            return
+        if self.first is None:
+            self.first = agent
+
+        for field in REQUIRED_FIELDS:
+            if field not in agent:
+                self.violation(index, agent, 'missing_field', field)
+        for field, value in agent.items():
+            expected = AGENT_FIELDS.get(field)
+            if expected is None:
+                self.violation(index, agent, 'unknown_field', field)
+            elif not isinstance(value, expected):
+                self.violation(index, agent, 'wrong_type', field)
+            elif expected is list and not all(isinstance(item, str) for item in value):
+                self.violation(index, agent, 'non_string_item', field)
+
+        for field in COMPLETENESS_FIELDS:
+            if agent.get(field):
+                self.completeness[field] += 1
+
+        pricing = agent.get('pricing')
+        if pricing:
+            self.pricing[pricing] += 1
+            if pricing not in PRICING_VALUES:
+                self.violation(index, agent, 'unknown_pricing', 'pricing')
+
+        categories = agent.get('categories')
+        if isinstance(categories, list):
+            self.categories.update(category for category in dict.fromkeys(categories) if isinstance(category, str))
+
+        if isinstance(agent.get('name'), str):
+            self.names[agent['name']] += 1
+        if isinstance(agent.get('url'), str):
+            self.urls[agent['url']] += 1
+
+
+def percent(part, whole):
+    return round(part / whole * 100, 1) if whole else 0.0
+
+
+def validation_report(path):
+    """Report on the database at path, reading each agent exactly once"""
+    stats = AgentStats()
+    metadata = None
+    categories = None
+    keys = []
+
+    with open(path, 'r', encoding='utf-8') as f:
+        for key, value in iter_database(f):
+            if key == 'agents':
+                stats.add(value)
+                continue
+            keys.append(key)
+            if key == 'metadata':
+                metadata = value
+            elif key == 'categories':
+                categories = value
+
+    structure = [f"missing top-level key '{key}'" for key in ('metadata', 'categories') if key not in keys]
+    if not stats.count:
+        structure.append("no agents in file")
+    if metadata is not None:
+        if metadata.get('total_agents') != stats.count:
+            structure.append(f"metadata.total_agents is {metadata.get('total_agents')}, file has {stats.count} agents")
+        if categories is not None and metadata.get('total_categories') != len(categories):
+            structure.append(f"metadata.total_categories is {metadata.get('total_categories')}, "
+                             f"file has {len(categories)} categories")
+
+    duplicate_names = {name: n for name, n in stats.names.items() if n > 1}
+    duplicate_urls = {url: n for url, n in stats.urls.items() if n > 1}
+    violation_count = sum(stats.violations.values())
+
+    return {
+        'path': path,
+        'size_bytes': os.path.getsize(path),
+        'valid': not structure and not violation_count and not duplicate_names and not duplicate_urls,
+        'metadata': metadata,
+        'structure_errors': structure,
+        'total_agents': stats.count,
+        'total_categories': len(categories) if categories is not None else None,
+        'completeness': {field: {'count': n, 'percent': percent(n, stats.count)}
+                         for field, n in stats.completeness.items()},
+        'pricing': dict(stats.pricing.most_common()),
+        'agents_per_category': dict(stats.categories.most_common()),
+        'top_categories': [{'name': category.get('name'), 'count': category.get('count')}
+                           for category in sorted(categories or [], key=lambda c: -(c.get('count') or 0))[:10]],
+        'duplicates': {'names': duplicate_names, 'urls': duplicate_urls},
+        'schema_violations': {
+            'count': violation_count,
+            'by_rule': dict(stats.violations.most_common()),
+            'examples': stats.examples,
+        },
+        'sample_agent': stats.first,
+    }
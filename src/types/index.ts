@@ -32,5 +32,15 @@ export interface AIAgentsDatabase {
   agents: AIAgent[];
 }
 
+export interface AIAgentsIndexes {
+  scraped_at: string;
+  total_agents: number;
+  by_name: Record<string, number>;
+  by_category: Record<string, number[]>;
+  by_tag: Record<string, number[]>;
+  featured: number[];
+  categories_by_count: number[];
+}
+
 export type PricingFilter = 'all' | 'free' | 'paid' | 'freemium';
 export type SortOption = 'name' | 'category' | 'pricing' | 'newest';
@@ -1,10 +1,29 @@
-import { AIAgentsDatabase } from '@/types';
+import { AIAgentsDatabase, AIAgentsIndexes } from '@/types';
 import databaseData from '@/data/ai_agents_database.json';
+import indexesData from '@/data/ai_agents_database.indexes.json';
 
 export function getDatabase(): AIAgentsDatabase {
   return databaseData as AIAgentsDatabase;
 }
 
+// Precomputed by the Python export step; ignored if built from a different database
+function getIndexes(): AIAgentsIndexes | null {
+  const indexes = indexesData as AIAgentsIndexes;
+  const { metadata, agents } = getDatabase();
+  return indexes.scraped_at === metadata.scraped_at && indexes.total_agents === agents.length
+    ? indexes
+    : null;
+}
+
+function lookup<T>(index: Record<string, T>, key: string): T | undefined {
+  return Object.prototype.hasOwnProperty.call(index, key) ? index[key] : undefined;
+}
+
+function agentsAt(positions: number[]) {
+  const agents = getAllAgents();
+  return positions.map(position => agents[position]);
+}
+
 export function getAllAgents() {
   return getDatabase().agents;
 }
@@ -14,10 +33,19 @@ export function getAllCategories() {
 }
 
 export function getAgentByName(name: string) {
+  const indexes = getIndexes();
+  if (indexes) {
+    const position = lookup(indexes.by_name, name);
+    return position === undefined ? undefined : getAllAgents()[position];
+  }
   return getAllAgents().find(agent => agent.name === name);
 }
 
 export function getAgentsByCategory(categoryName: string) {
+  const indexes = getIndexes();
+  if (indexes) {
+    return agentsAt(lookup(indexes.by_category, categoryName.toLowerCase()) ?? []);
+  }
   return getAllAgents().filter(agent => 
     agent.categories && agent.categories.some(cat => 
       cat.toLowerCase().replace(/\s+/g, '-') === categoryName.toLowerCase()
@@ -25,13 +53,30 @@ export function getAgentsByCategory(categoryName: string) {
   );
 }
 
+export function getAgentsByTag(tag: string) {
+  const indexes = getIndexes();
+  if (indexes) {
+    return agentsAt(lookup(indexes.by_tag, tag) ?? []);
+  }
+  return getAllAgents().filter(agent => agent.tags?.includes(tag));
+}
+
 export function getFeaturedAgents(limit: number = 6) {
+  const indexes = getIndexes();
+  if (indexes) {
+    return agentsAt(indexes.featured.slice(0, limit));
+  }
   return getAllAgents()
     .filter(agent => agent.detailed_title && agent.tags?.length)
     .slice(0, limit);
 }
 
 export function getPopularCategories(limit: number = 8) {
+  const indexes = getIndexes();
+  if (indexes) {
+    const categories = getAllCategories();
+    return indexes.categories_by_count.slice(0, limit).map(position => categories[position]);
+  }
   return getAllCategories()
     .sort((a, b) => b.count - a.count)
     .slice(0, limit);
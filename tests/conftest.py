@@ -0,0 +1,75 @@
+"""
+Shared fixtures for the offline regression tests
+Pages come from the stand-in corpus synthesized from data/ai_agents_database.json,
+so nothing here touches the network
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from standin_server import DEFAULT_DATABASE, StandInServer, load_fixtures, synthesize_fixtures
+
+
+@pytest.fixture(scope='session')
+def database():
+    with open(DEFAULT_DATABASE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope='session')
+def standin_pages(tmp_path_factory):
+    """{request path: body} of the synthesized stand-in site"""
+    directory = str(tmp_path_factory.mktemp('fixtures'))
+    synthesize_fixtures(DEFAULT_DATABASE, directory)
+    return load_fixtures(directory)
+
+
+@pytest.fixture(scope='session')
+def listing_pages(standin_pages):
+    """Main and category listing pages, every page of each"""
+    return {path: body for path, body in standin_pages.items()
+            if path == '/' or path.startswith('/?') or path.startswith('/categories/')}
+
+
+@pytest.fixture
+def scraper(tmp_path):
+    """Network-free optimized scraper, as the parse workers use"""
+    from scrape_optimized import OptimizedAIAgentsScraper
+    scraper = OptimizedAIAgentsScraper(cache_dir=None, journal_path=str(tmp_path / 'journal.jsonl'), status_path=None)
+    yield scraper
+    scraper.engine.close()
+
+
+@pytest.fixture
+def standin_server(standin_pages):
+    """Stand-in site serving its own copy of the corpus, so a test can edit pages"""
+    with StandInServer(standin_pages) as server:
+        yield server
+
+
+@pytest.fixture
+def make_scraper(tmp_path, monkeypatch):
+    """Factory for unthrottled optimized scrapers against a stand-in site; databases land under tmp_path/data"""
+    from scrape_optimized import OptimizedAIAgentsScraper
+    monkeypatch.chdir(tmp_path)
+    scrapers = []
+
+    def make(base_url, **kwargs):
+        options = dict(requests_per_second=1e6, burst=1e6, max_per_host=16, detail_workers=16, cache_dir=None,
+                       journal_path=str(tmp_path / f'journal{len(scrapers)}.jsonl'), status_path=None)
+        options.update(kwargs)
+        scraper = OptimizedAIAgentsScraper(**options)
+        scraper.base_url = base_url
+        scrapers.append(scraper)
+        return scraper
+
+    yield make
+    for scraper in scrapers:
+        scraper.engine.close()
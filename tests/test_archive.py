@@ -0,0 +1,83 @@
+"""
+The page archive records each crawl's mode and completion; re-extraction trusts only complete full crawls
+"""
+
+import os
+import sys
+
+import pytest
+
+from scraping import PageArchive
+from test_incremental import load
+
+
+@pytest.fixture
+def archive_path(tmp_path):
+    return str(tmp_path / 'archive.warc.gz')
+
+
+def crawl(make_scraper, server, archive_path, method='scrape_all', *args):
+    scraper = make_scraper(server.base_url, archive_path=archive_path)
+    getattr(scraper, method)(*args)
+    scraper.save_to_json()
+    scraper.engine.close()
+    return scraper
+
+
+def test_only_complete_full_crawls_count(standin_server, make_scraper, archive_path):
+    full = crawl(make_scraper, standin_server, archive_path)
+    assert PageArchive(archive_path).crawl_started_at() == full.crawl_started_at
+
+    incremental = crawl(make_scraper, standin_server, archive_path, 'scrape_incremental',
+                        os.path.join('data', 'ai_agents_database.json'))
+    # A failed full crawl starts later but leaves pages unfetched
+    del standin_server.pages[next(path for path in standin_server.pages if path.startswith('/agent/'))]
+    failed = crawl(make_scraper, standin_server, archive_path)
+
+    archive = PageArchive(archive_path)
+    assert archive.crawl_started_at() == full.crawl_started_at
+    assert [crawl['mode'] for crawl in archive.crawls.values()] == ['full', 'incremental', 'full']
+    assert [crawl['completed'] for crawl in archive.crawls.values()] == [True, False, False]
+    assert failed.crawl_started_at is None and incremental.crawl_started_at == full.crawl_started_at
+
+
+def test_rebuilt_index_keeps_crawl_records(standin_server, make_scraper, archive_path):
+    full = crawl(make_scraper, standin_server, archive_path)
+    with open(archive_path + '.idx', 'rb') as f:
+        index = f.read()
+    os.remove(archive_path + '.idx')
+
+    archive = PageArchive(archive_path)
+    assert archive.crawl_started_at() == full.crawl_started_at
+    with open(archive_path + '.idx', 'rb') as f:
+        assert f.read() == index
+
+
+def test_reextract_dates_database_by_last_complete_full_crawl(standin_server, make_scraper, archive_path,
+                                                              monkeypatch):
+    import reextract_archive
+
+    full = crawl(make_scraper, standin_server, archive_path)
+    crawl(make_scraper, standin_server, archive_path, 'scrape_incremental',
+          os.path.join('data', 'ai_agents_database.json'))
+
+    monkeypatch.setattr(sys, 'argv', ['reextract_archive.py', archive_path, '--output', 'reextracted.json',
+                                      '--parse-workers', '0', '--metrics', 'metrics.json'])
+    reextract_archive.main()
+    metadata = load(os.path.join('data', 'reextracted.json'))['metadata']
+    assert metadata['crawl_started_at'] == metadata['scraped_at'] == full.crawl_started_at
+
+
+def test_reextract_without_complete_crawl_uses_oldest_page(standin_server, make_scraper, archive_path, monkeypatch):
+    import reextract_archive
+
+    del standin_server.pages[next(path for path in standin_server.pages if path.startswith('/agent/'))]
+    crawl(make_scraper, standin_server, archive_path)
+    dates = [entry['date'] for entry in PageArchive(archive_path).load().values()]
+
+    monkeypatch.setattr(sys, 'argv', ['reextract_archive.py', archive_path, '--output', 'reextracted.json',
+                                      '--parse-workers', '0', '--metrics', 'metrics.json'])
+    reextract_archive.main()
+    metadata = load(os.path.join('data', 'reextracted.json'))['metadata']
+    assert metadata['crawl_started_at'] == min(dates)
+    assert metadata['scraped_at'] == max(dates)
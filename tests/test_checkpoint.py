@@ -0,0 +1,58 @@
+"""
+Resuming from a checkpoint journal whose last record a crash cut short
+"""
+
+import json
+
+from scraping import CheckpointJournal
+
+
+def write_journal(path, records, partial):
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record) + '\n')
+        f.write(partial)
+
+
+def test_truncated_last_line_is_skipped_and_dropped(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    records = [{'url': f'https://example.test/agent/{i}', 'title': f'Agent {i}'} for i in range(3)]
+    write_journal(path, records, '{"url": "https://example.test/agent/3", "tit')
+
+    journal = CheckpointJournal(path)
+    assert journal.load() == {record['url']: record for record in records}
+
+    # The torn tail is gone, so records appended on resume start on a fresh line
+    journal.open(resume=True)
+    journal.append({'url': 'https://example.test/agent/3', 'title': 'Agent 3'})
+    journal.close()
+    assert len(CheckpointJournal(path).load()) == 4
+
+
+def test_complete_but_unterminated_line_is_not_trusted(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    records = [{'url': 'https://example.test/agent/0'}]
+    write_journal(path, records, json.dumps({'url': 'https://example.test/agent/1'}))
+    assert list(CheckpointJournal(path).load()) == ['https://example.test/agent/0']
+
+
+def test_resumed_crawl_restores_journaled_details(standin_server, make_scraper, tmp_path):
+    journal_path = str(tmp_path / 'details.jsonl')
+    scraper = make_scraper(standin_server.base_url, journal_path=journal_path)
+    first = scraper.scrape_all()
+    full_requests = scraper.metrics.summary()['requests']
+
+    # Keep five complete records and half of the sixth, as a crash mid-write would
+    with open(journal_path, 'r', encoding='utf-8') as f:
+        lines = f.readlines()
+    with open(journal_path, 'w', encoding='utf-8') as f:
+        f.writelines(lines[:5])
+        f.write(lines[5][:len(lines[5]) // 2])
+
+    scraper = make_scraper(standin_server.base_url, journal_path=journal_path)
+    resumed = scraper.scrape_all(resume=True)
+    assert json.dumps(resumed, sort_keys=True) == json.dumps(first, sort_keys=True)
+    # Only the five complete records skip their detail pages; the torn one is fetched again
+    assert scraper.reused_details == 5
+    assert scraper.metrics.summary()['requests'] == full_requests - 5
+    assert len(CheckpointJournal(journal_path).load()) == len(first)
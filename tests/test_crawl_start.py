@@ -0,0 +1,76 @@
+"""
+crawl_started_at only advances on runs that fetched every page a later discovery run would skip
+"""
+
+import json
+import re
+import time
+from datetime import datetime, timezone
+
+from test_incremental import load, set_title
+
+
+def set_lastmod(server, name, lastmod):
+    """Mark an agent modified at lastmod in the stand-in sitemap"""
+    sitemap = server.pages['/sitemap-agents.xml']
+    loc = re.escape(f'/agent/{name}</loc><lastmod>'.encode('utf-8'))
+    server.put('/sitemap-agents.xml', re.sub(rb'(' + loc + rb')[^<]+', rb'\g<1>' + lastmod.encode('utf-8'), sitemap))
+
+
+def test_full_crawl_records_its_start(standin_server, make_scraper):
+    scraper = make_scraper(standin_server.base_url)
+    scraper.scrape_all()
+    started = scraper.crawl_started_at
+    metadata = load(scraper.save_to_json())['metadata']
+    assert started and metadata['crawl_started_at'] == started
+    assert metadata['crawl_started_at'] <= metadata['scraped_at']
+
+
+def test_full_crawl_with_failed_pages_records_no_start(standin_server, make_scraper):
+    name = next(path for path in standin_server.pages if path.startswith('/agent/'))
+    del standin_server.pages[name]
+    scraper = make_scraper(standin_server.base_url)
+    scraper.scrape_all()
+    assert load(scraper.save_to_json())['metadata']['crawl_started_at'] is None
+
+
+def test_detail_edit_survives_incremental_then_discovery(standin_server, make_scraper):
+    scraper = make_scraper(standin_server.base_url)
+    agents = scraper.scrape_all()
+    filepath = scraper.save_to_json()
+    first_start = scraper.crawl_started_at
+    name = agents[0]['name']
+
+    # Edited after the full crawl, with a card that does not change
+    time.sleep(1.1)
+    set_title(standin_server, name, 'Edited after the crawl')
+    set_lastmod(standin_server, name, datetime.now(timezone.utc).isoformat(timespec='seconds'))
+    time.sleep(1.1)
+
+    scraper = make_scraper(standin_server.base_url)
+    scraper.scrape_incremental(filepath)
+    database = load(scraper.save_to_json())
+    assert database['metadata']['changes']['changed'] == []
+    # The incremental run never looked at the edited page, so it cannot vouch for it
+    assert database['metadata']['crawl_started_at'] == first_start
+
+    scraper = make_scraper(standin_server.base_url)
+    scraper.scrape_discovery(filepath)
+    database = load(scraper.save_to_json())
+    assert database['metadata']['changes']['changed'] == [name]
+    assert {agent['name']: agent for agent in database['agents']}[name]['detailed_title'] == 'Edited after the crawl'
+    # Everything else is unchanged per the sitemap, so this run's start now holds
+    assert database['metadata']['crawl_started_at'] == scraper.crawl_started_at > first_start
+
+
+def test_empty_listing_fallback_keeps_stored_start(standin_server, make_scraper):
+    scraper = make_scraper(standin_server.base_url)
+    scraper.scrape_all()
+    filepath = scraper.save_to_json()
+    first_start = scraper.crawl_started_at
+
+    for path in [path for path in standin_server.pages if not path.startswith('/agent/')]:
+        del standin_server.pages[path]
+    scraper = make_scraper(standin_server.base_url)
+    scraper.scrape_incremental(filepath)
+    assert load(scraper.save_to_json())['metadata']['crawl_started_at'] == first_start
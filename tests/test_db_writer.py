@@ -0,0 +1,42 @@
+"""
+The streaming database writer must produce exactly what json.dumps would
+"""
+
+import json
+import os
+
+import pytest
+
+from scraping.db_writer import iter_database_chunks, write_database
+
+
+def expected(document, indent):
+    if indent is None:
+        return json.dumps(document, ensure_ascii=False, separators=(',', ':'))
+    return json.dumps(document, indent=indent, ensure_ascii=False)
+
+
+@pytest.mark.parametrize('indent', [2, 4, None])
+def test_chunks_match_json_dumps(database, indent):
+    text = ''.join(iter_database_chunks(database['metadata'], database['categories'], iter(database['agents']),
+                                        indent=indent))
+    assert text == expected(database, indent)
+
+
+@pytest.mark.parametrize('indent', [2, None])
+@pytest.mark.parametrize('agents', [[], [{}], [{'name': 'solo', 'tags': [], 'pricing': None}]])
+def test_edge_cases_match_json_dumps(indent, agents):
+    metadata = {'scraped_at': '2025-06-23T15:48:51', 'note': 'non-ASCII — ✓ kept as is', 'empty': {}}
+    document = {'metadata': metadata, 'categories': [], 'agents': agents}
+    text = ''.join(iter_database_chunks(metadata, [], agents, indent=indent))
+    assert text == expected(document, indent)
+
+
+@pytest.mark.parametrize('indent', [2, None])
+def test_written_file_is_byte_identical(database, tmp_path, indent):
+    filepath = str(tmp_path / 'db.json')
+    write_database(filepath, database['metadata'], database['categories'], iter(database['agents']), indent=indent)
+    with open(filepath, 'rb') as f:
+        assert f.read() == expected(database, indent).encode('utf-8')
+    # Nothing but the database is left behind
+    assert os.listdir(str(tmp_path)) == ['db.json']
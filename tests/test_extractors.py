@@ -0,0 +1,76 @@
+"""
+The single-pass listing card scanner must find what the per-link matcher it replaced did
+"""
+
+import re
+from urllib.parse import urljoin
+
+import pytest
+
+from scraping.parsing import PageParser
+
+# Cards the stand-in pages do not have: comments, scripts, CDATA, several links per card, bare links
+EDGE_CASES = [
+    '<div><a href="/agent/one">One</a><a href="/agent/two">Two</a><p>AI tools that help with two things at once</p>'
+    '<p>A second description line about automation</p><p>Third line about generating things</p></div>',
+    '<div><a href="/agent/hidden">Hidden</a><!-- An AI tool described only in a comment -->'
+    '<script>var pricing = "Paid plans from $49";</script><p>Tool help text long enough</p><b>$1,200</b></div>',
+    '<div><a href="/agent/cdata">Cdata</a><svg><![CDATA[Free AI tool inside a CDATA section]]></svg></div>',
+    '<div><a href="/agent/same">An AI tool titled the same as its text</a>'
+    '<p>An AI tool titled the same as its text</p><span>FREE + PAID</span></div>',
+    '<div><a href="/agent/words">Words</a><p>Useful tool for spreadsheets and docs</p>'
+    '<p>Helps write better emails</p><p>Generates slides from outlines</p></div>',
+    '<a href="/agent/orphan">Orphan AI tool with no card around it</a>',
+    '<div><a href="https://elsewhere.example/agent/external">External</a><a href="/agent/ok">Ok</a>'
+    '<p>Pricing: contact us, no AI tool price given</p></div>',
+]
+
+
+def old_extract(soup, base_url, source_info=''):
+    """extract_agent_info_from_listing before scan_listing_card, kept as the reference"""
+    agents = []
+    for link in soup.find_all('a', href=lambda href: href and '/agent/' in href):
+        href = link.get('href')
+        if not href or not href.startswith('/agent/'):
+            continue
+        agent_name = href.split('/agent/')[-1]
+        agent_data = {'name': agent_name, 'url': urljoin(base_url, href), 'source': source_info}
+        title = link.get_text(strip=True)
+        if title:
+            agent_data['title'] = title
+
+        parent = link.find_parent()
+        if parent:
+            description_parts = []
+            for text in parent.find_all(string=True):
+                text = text.strip()
+                if len(text) > 20 and text not in [title, agent_name]:
+                    if any(word in text.lower() for word in ['ai', 'tool', 'help', 'automat', 'generat', 'creat']):
+                        description_parts.append(text)
+            if description_parts:
+                agent_data['description'] = ' '.join(description_parts[:2])
+
+        pricing_text = parent.get_text() if parent else ""
+        if any(word in pricing_text.lower() for word in ['free', 'paid', '$', 'pricing']):
+            pricing_match = re.search(r'(free|paid|free \+ paid|\$[\d,]+)', pricing_text, re.IGNORECASE)
+            if pricing_match:
+                agent_data['pricing'] = pricing_match.group(1)
+        agents.append(agent_data)
+    return agents
+
+
+@pytest.mark.parametrize('backend', ['lxml', 'html.parser'])
+def test_scanner_matches_old_matcher(scraper, listing_pages, backend):
+    parser = PageParser(backend)
+    for path, content in listing_pages.items():
+        soup = parser.parse(content)
+        agents = scraper.extract_agent_info_from_listing(soup, path)
+        assert agents, path
+        assert agents == old_extract(soup, scraper.base_url, path), path
+
+
+@pytest.mark.parametrize('backend', ['lxml', 'html.parser'])
+@pytest.mark.parametrize('content', EDGE_CASES)
+def test_scanner_edge_cases(scraper, backend, content):
+    soup = PageParser(backend).parse(f'<html><body>{content}</body></html>')
+    assert scraper.extract_agent_info_from_listing(soup) == old_extract(soup, scraper.base_url)
@@ -0,0 +1,94 @@
+"""
+Incremental runs against the stand-in site: agents whose detail pages fail are fetched again later
+"""
+
+import json
+import re
+
+import pytest
+
+
+def set_card(server, name, description):
+    """Give an agent's listing cards a new description"""
+    card = re.compile(rb'(<a href="/agent/' + re.escape(name.encode('utf-8')) + rb'">[^<]*</a><p>)[^<]*(</p>)')
+    for path, body in list(server.pages.items()):
+        if card.search(body):
+            server.put(path, card.sub(rb'\g<1>' + description.encode('utf-8') + rb'\g<2>', body))
+
+
+def set_title(server, name, title):
+    """Give an agent's detail page a new heading"""
+    path = f'/agent/{name}'
+    server.put(path, re.sub(rb'<h1>[^<]*</h1>', b'<h1>' + title.encode('utf-8') + b'</h1>', server.pages[path]))
+
+
+def load(filepath):
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def crawled(standin_server, make_scraper):
+    """A stored full crawl of the stand-in site and one of its agents"""
+    scraper = make_scraper(standin_server.base_url)
+    agents = scraper.scrape_all()
+    filepath = scraper.save_to_json()
+    name = next(agent['name'] for agent in agents if agent.get('detailed_title'))
+    return filepath, name
+
+
+def test_failed_refetch_keeps_stored_record_until_fetched(standin_server, make_scraper, crawled):
+    filepath, name = crawled
+    stored = {agent['name']: agent for agent in load(filepath)['agents']}[name]
+
+    set_card(standin_server, name, 'A new AI tool description from the listing')
+    set_title(standin_server, name, 'New detailed title')
+    page = standin_server.pages.pop(f'/agent/{name}')
+
+    scraper = make_scraper(standin_server.base_url)
+    scraper.scrape_incremental(filepath)
+    scraper.save_to_json()
+    database = load(filepath)
+    assert database['metadata']['changes']['changed'] == [name]
+    assert database['metadata']['changes']['failed'] == [name]
+    # Listing fields stay as stored, so the card still counts as changed next time
+    assert {agent['name']: agent for agent in database['agents']}[name] == stored
+
+    standin_server.put(f'/agent/{name}', page)
+    scraper = make_scraper(standin_server.base_url)
+    scraper.scrape_incremental(filepath)
+    scraper.save_to_json()
+    database = load(filepath)
+    assert database['metadata']['changes']['changed'] == [name]
+    assert database['metadata']['changes']['failed'] == []
+    agent = {agent['name']: agent for agent in database['agents']}[name]
+    assert agent['description'] == 'A new AI tool description from the listing'
+    assert agent['detailed_title'] == 'New detailed title'
+
+
+def test_agents_failed_last_run_are_retried(standin_server, make_scraper, crawled):
+    filepath, name = crawled
+    set_title(standin_server, name, 'Fetched on retry')
+    page = standin_server.pages.pop(f'/agent/{name}')
+
+    # A new agent whose page fails keeps only its card, which the next diff sees as unchanged
+    database = load(filepath)
+    database['agents'] = [agent for agent in database['agents'] if agent['name'] != name]
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(database, f)
+    scraper = make_scraper(standin_server.base_url)
+    scraper.scrape_incremental(filepath)
+    scraper.save_to_json()
+    changes = load(filepath)['metadata']['changes']
+    assert changes['new'] == [name]
+    assert changes['failed'] == [name]
+
+    standin_server.put(f'/agent/{name}', page)
+    scraper = make_scraper(standin_server.base_url)
+    scraper.scrape_incremental(filepath)
+    scraper.save_to_json()
+    database = load(filepath)
+    assert database['metadata']['changes']['retried'] == [name]
+    assert database['metadata']['changes']['changed'] == []
+    assert database['metadata']['changes']['failed'] == []
+    assert {agent['name']: agent for agent in database['agents']}[name]['detailed_title'] == 'Fetched on retry'
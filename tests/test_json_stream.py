@@ -0,0 +1,63 @@
+"""
+The streaming database reader must see exactly what json.load does, wherever chunks split the text
+"""
+
+import io
+import json
+
+import pytest
+
+from scraping.json_stream import iter_database
+from standin_server import DEFAULT_DATABASE
+
+CHUNK_SIZES = [1, 2, 7, 64]
+
+# Scalars that decode wrongly if cut short ("2.5" as 2, "true" as nothing), escapes and odd spacing
+TRICKY = ('{ "metadata" : {"total_agents": 2, "ratio": 2.5e-3, "ok": true, "missing": null, "neg": -12},\n'
+          '"categories":[],"agents" : [ {"name": "a\\"b\\\\c", "title": "\\u00e9t\\u00e9 ✓", "n": 10},\n'
+          '  {"name": "b", "tags": [[], {}, [1, [2.0]]], "flag": false} ] , "trailer": 12345678901234567890}')
+
+
+def collect(text, chunk_size):
+    """Reassemble the document from iter_database's pairs"""
+    document = {}
+    for key, value in iter_database(io.StringIO(text), chunk_size=chunk_size):
+        if key == 'agents':
+            document.setdefault('agents', []).append(value)
+        else:
+            assert key not in document
+            document[key] = value
+    return document
+
+
+@pytest.fixture(scope='module')
+def shipped():
+    with open(DEFAULT_DATABASE, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_shipped_database_matches_json_load(shipped, chunk_size):
+    assert collect(shipped, chunk_size) == json.loads(shipped)
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_minified_database_matches_json_load(shipped, chunk_size):
+    minified = json.dumps(json.loads(shipped), ensure_ascii=False, separators=(',', ':'))
+    assert collect(minified, chunk_size) == json.loads(minified)
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+@pytest.mark.parametrize('text', [TRICKY, '{}', '{"agents": []}', ' {"metadata": {}, "agents": [{}]} '])
+def test_edge_cases_match_json_load(text, chunk_size):
+    document = json.loads(text)
+    if document.get('agents') == []:
+        # An empty array yields no pairs at all
+        document.pop('agents')
+    assert collect(text, chunk_size) == document
+
+
+@pytest.mark.parametrize('text', ['{"agents": [1, 2', '{"agents": [1 2]}', '["agents"]', '{"a": 1'])
+def test_malformed_documents_raise(text):
+    with pytest.raises(ValueError):
+        collect(text, 2)
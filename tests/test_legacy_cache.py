@@ -0,0 +1,29 @@
+"""
+The legacy scraper reuses listing and agent extractions for pages the server answers 304 for
+"""
+
+import json
+
+
+def scrape(standin_server, tmp_path, **kwargs):
+    from scrape_ai_agents import AIAgentsListScraper
+    scraper = AIAgentsListScraper(requests_per_second=1e6, burst=1e6, cache_dir=str(tmp_path / 'cache'),
+                                  journal_path=str(tmp_path / 'journal.jsonl'), status_path=None, **kwargs)
+    scraper.base_url = standin_server.base_url
+    try:
+        agents = scraper.scrape_all_agents()
+    finally:
+        scraper.engine.close()
+    return agents, scraper.metrics.summary()
+
+
+def test_second_cached_run_parses_nothing(standin_server, tmp_path):
+    first, cold = scrape(standin_server, tmp_path)
+    second, warm = scrape(standin_server, tmp_path)
+
+    assert json.dumps(second, sort_keys=True) == json.dumps(first, sort_keys=True)
+    assert cold.get('extract_reused', 0) == 0
+    # Every page but the categories index comes back 304 with its extraction stored
+    assert warm['cache_hits'] == warm['requests'] - warm['status_codes'].get('404', 0)
+    assert warm['extract_reused'] == warm['cache_hits'] - 1
+    assert warm['stages']['parse']['count'] == 1
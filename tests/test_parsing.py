@@ -0,0 +1,77 @@
+"""
+Listing and category pages parsed partially must extract what a full parse does
+"""
+
+import pytest
+
+from scraping.metrics import PROMETHEUS_PREFIX, ScrapeMetrics
+from scraping.parsing import PageParser, listing_fragment
+
+pytest.importorskip('lxml')
+
+# Markup the stand-in pages do not have: table rows, shared and nested cards, comments, scripts
+EDGE_CASES = [
+    '<html><body><table><tr><td><a href="/agent/in-a-table">In A Table</a>'
+    '<p>An AI tool that lives in a table cell</p></td></tr></table></body></html>',
+    '<html><body><div class="card"><a href="/agent/one">One</a><a href="/agent/two">Two</a>'
+    '<p>AI tools that help with two things at once</p><!-- Free tier hidden in a comment -->'
+    '<script>var pricing = "$99";</script><span>Free + Paid</span></div>'
+    '<div class="Pagination"><a href="/?page=2">2</a></div></body></html>',
+    '<html><body><section><div><a href="/agent/outer">Outer</a><div><a href="/agent/inner">Inner</a>'
+    '<p>Automation helper for creative work</p></div><em>$1,200</em></div></section></body></html>',
+    '',
+]
+
+
+def listing_source(scraper, path):
+    if path.startswith('/categories/'):
+        return scraper.new_listing('category', path, name=path.split('/')[2].split('?')[0])
+    return scraper.new_listing('main', path)
+
+
+def summaries(scraper, soup, path):
+    listing = listing_source(scraper, path)
+    return [scraper.summarize_listing_page(soup, listing, page) for page in (1, 2)]
+
+
+def test_listing_fragment_matches_full_parse(scraper, listing_pages):
+    parser = PageParser('lxml')
+    for path, content in listing_pages.items():
+        # The stand-in pages are cut down, not passed through whole
+        assert listing_fragment(content) is not None, path
+        assert summaries(scraper, parser.parse_listing(content), path) == \
+               summaries(scraper, parser.parse(content), path), path
+
+
+@pytest.mark.parametrize('content', EDGE_CASES)
+def test_listing_fragment_edge_cases(scraper, content):
+    parser = PageParser('lxml')
+    partial = parser.parse_listing(content)
+    full = parser.parse(content)
+    if full is None:
+        assert partial is None
+        return
+    assert summaries(scraper, partial, '/') == summaries(scraper, full, '/')
+
+
+def test_category_links_match_full_parse(scraper, standin_pages, monkeypatch):
+    parser = PageParser('lxml')
+    content = standin_pages['/categories']
+
+    monkeypatch.setattr(scraper, 'get_page', lambda url, mode=None: parser.parse(content))
+    full = scraper.extract_categories()
+    monkeypatch.setattr(scraper, 'get_page', lambda url, mode=None: parser.parse_category_links(content))
+    partial = scraper.extract_categories()
+
+    assert full
+    assert partial == full
+
+
+def test_fallback_is_counted_in_metrics(monkeypatch):
+    metrics = ScrapeMetrics()
+    parser = PageParser('lxml', metrics=metrics)
+    monkeypatch.setattr(parser, 'backend', 'no-such-backend')
+
+    assert parser.parse('<html><body><p>x</p></body></html>').find('p') is not None
+    assert metrics.summary()['parse_fallbacks'] == 1
+    assert f'{PROMETHEUS_PREFIX}_parse_fallbacks_total 1\n' in ''.join(metrics.prometheus_lines())
@@ -0,0 +1,206 @@
+"""
+Retry backoff, the per-host circuit breaker, Retry-After handling and dead letters, on a fake clock
+"""
+
+import threading
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+import requests
+from requests import Response
+
+from scraping import circuit_breaker, engine, rate_limiter
+from scraping import CircuitBreaker, FetchEngine, RateLimiter, ScrapeMetrics, parse_retry_after
+
+HOST = 'stand-in.test'
+URL = f'http://{HOST}/page'
+
+
+class FakeClock:
+    """Stands in for the time module: sleeping only moves the clock"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class FakeSession:
+    """Answers GETs from a script of statuses (or exceptions), one per request"""
+
+    def __init__(self, script, error_headers=None):
+        self.script = list(script)
+        self.error_headers = error_headers or {}
+        self.requests = 0
+
+    def mount(self, prefix, adapter):
+        pass
+
+    def get(self, url, timeout=None, headers=None):
+        self.requests += 1
+        outcome = self.script.pop(0) if self.script else 200
+        if isinstance(outcome, Exception):
+            raise outcome
+        response = Response()
+        response.status_code = outcome
+        response.url = url
+        response.reason = 'Scripted'
+        response.headers.update(self.error_headers if outcome != 200 else {})
+        response._content = b'<html><body>ok</body></html>' if outcome == 200 else b''
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    for module in (engine, rate_limiter, circuit_breaker):
+        monkeypatch.setattr(module, 'time', clock)
+    return clock
+
+
+def make_engine(script, error_headers=None, breaker=None, **kwargs):
+    metrics = ScrapeMetrics()
+    fetch_engine = FetchEngine(FakeSession(script, error_headers), limiter=RateLimiter(rate=1e6, burst=1e6),
+                               metrics=metrics, max_workers=1, breaker=breaker, **kwargs)
+    return fetch_engine, metrics
+
+
+def test_backoff_is_full_jitter_under_a_capped_exponential(monkeypatch):
+    fetch_engine, _ = make_engine([], backoff_base=0.5, backoff_cap=3.0)
+    monkeypatch.setattr(engine.random, 'uniform', lambda low, high: (low, high))
+    assert [fetch_engine.backoff(attempt) for attempt in range(1, 6)] == \
+           [(0, 0.5), (0, 1.0), (0, 2.0), (0, 3.0), (0, 3.0)]
+    monkeypatch.undo()
+    assert all(0 <= fetch_engine.backoff(4) <= 3.0 for _ in range(200))
+    fetch_engine.close()
+
+
+def test_transient_failures_are_retried_until_success(clock):
+    fetch_engine, metrics = make_engine([503, requests.ConnectionError('reset'), 200], retries=3)
+    response = fetch_engine.get(URL)
+    assert response.status_code == 200
+    summary = metrics.summary()
+    assert (summary['requests'], summary['retries'], summary['errors']) == (3, 2, 0)
+    assert fetch_engine.dead_letters == {}
+    fetch_engine.close()
+
+
+def test_final_errors_are_not_retried_or_dead_lettered(clock):
+    fetch_engine, metrics = make_engine([404, 200])
+    assert fetch_engine.get(URL) is None
+    assert fetch_engine.session.requests == 1
+    assert metrics.summary()['retries'] == 0
+    assert not fetch_engine.failed_transiently(URL)
+    fetch_engine.close()
+
+
+def test_exhausted_retries_become_dead_letters_until_settled(clock):
+    fetch_engine, metrics = make_engine([503] * 3 + [200], retries=2,
+                                        breaker=CircuitBreaker(failure_threshold=100))
+    assert fetch_engine.get(URL) is None
+    assert fetch_engine.failed_transiently(URL)
+    assert fetch_engine.dead_letters[URL]['attempts'] == 3
+    assert 'failed_at' in fetch_engine.dead_letters[URL]
+    assert metrics.summary()['errors'] == 1
+
+    # A later pass that gets the page clears it
+    assert fetch_engine.get(URL).status_code == 200
+    assert not fetch_engine.failed_transiently(URL)
+    fetch_engine.close()
+
+
+def test_retry_after_pauses_the_limiter(clock):
+    fetch_engine, _ = make_engine([429, 200], error_headers={'Retry-After': '7'}, retries=1)
+    started = clock.now
+    assert fetch_engine.get(URL).status_code == 200
+    # The retry waited out Retry-After on top of its own backoff
+    assert clock.now - started >= 7
+    # Halved by the 429, then recovering by a step with the successful retry
+    assert fetch_engine.limiter.rate == 1e6 / 2 + 1e6 * 0.05
+    fetch_engine.close()
+
+
+def test_parse_retry_after():
+    assert parse_retry_after('120') == 120.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('soon') is None
+    later = datetime.now(timezone.utc) + timedelta(seconds=90)
+    assert 80 <= parse_retry_after(format_datetime(later, usegmt=True)) <= 90
+    assert parse_retry_after(format_datetime(datetime(2000, 1, 1, tzinfo=timezone.utc), usegmt=True)) == 0.0
+
+
+def test_limiter_without_retry_after_uses_default_backoff(clock):
+    limiter = RateLimiter(rate=10, burst=1, default_backoff=5.0)
+    limiter.record(503, 0.1)
+    assert limiter.blocked_until == clock.now + 5.0
+    assert limiter.acquire() >= 5.0
+
+
+def test_circuit_opens_probes_and_closes(clock):
+    metrics = ScrapeMetrics()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10.0, max_reset_timeout=30.0, metrics=metrics)
+    assert breaker.wait(HOST) == 0
+    breaker.record(HOST, False)
+    breaker.record(HOST, False)
+    circuit = breaker.hosts[HOST]
+    assert circuit.tripped and circuit.open_until == clock.now + 10.0
+    assert metrics.summary()['circuit_trips'] == 1
+
+    # Half-open: once the pause is over, one request goes out as the trial
+    clock.advance(10.0)
+    breaker.wait(HOST)
+    assert circuit.trial_thread == threading.get_ident()
+
+    # A failed trial keeps the circuit open for twice as long, up to the cap
+    breaker.record(HOST, False)
+    assert circuit.tripped and circuit.reset_timeout == 20.0 and circuit.trial_thread is None
+    clock.advance(20.0)
+    breaker.wait(HOST)
+    breaker.record(HOST, False)
+    assert circuit.reset_timeout == 30.0
+
+    # A successful trial closes it and resets the pause
+    clock.advance(30.0)
+    breaker.wait(HOST)
+    breaker.record(HOST, True)
+    assert not circuit.tripped and circuit.failures == 0 and circuit.reset_timeout == 10.0
+    assert metrics.summary()['circuit_trips'] == 1
+
+
+def test_open_circuit_holds_other_requests_until_the_trial_settles(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10.0)
+    breaker.record(HOST, False)
+    clock.advance(10.0)
+    breaker.wait(HOST)  # This thread is the trial
+
+    waiting = threading.Thread(target=breaker.wait, args=(HOST,), daemon=True)
+    waiting.start()
+    waiting.join(0.1)
+    assert waiting.is_alive()
+
+    breaker.record(HOST, True)
+    waiting.join(1.0)
+    assert not waiting.is_alive()
+
+
+def test_engine_reports_circuit_trips(clock):
+    fetch_engine, metrics = make_engine([503] * 2, retries=0)
+    fetch_engine.breaker.failure_threshold = 2
+    fetch_engine.get(URL)
+    fetch_engine.get(URL + '2')
+    assert metrics.summary()['circuit_trips'] == 1
+    assert 'ai_agents_scraper_circuit_trips_total 1' in ''.join(metrics.prometheus_lines())
+    fetch_engine.close()
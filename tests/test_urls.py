@@ -0,0 +1,84 @@
+"""
+canonical_url must be idempotent and fold every variant of a site URL into one form
+"""
+
+import re
+from urllib.parse import urlsplit
+
+import pytest
+
+from scraping.urls import URLCanonicalizer, agent_key, canonical_url
+
+BASE_URLS = ['https://aiagentslist.com', 'http://127.0.0.1:8765/']
+
+HREF = re.compile(rb'<(?:a href|loc)="?>?([^"<]+)')
+
+# Other sites' URLs only lose the fragment; their case, slashes and queries may matter
+EXTERNAL = {
+    'https://example.com/Tool/?utm_source=x#pricing': 'https://example.com/Tool/?utm_source=x',
+    'http://other.example:8080/a//b?B=2&a=1': 'http://other.example:8080/a//b?B=2&a=1',
+    'mailto:team@example.com': 'mailto:team@example.com',
+    '//cdn.example.com/logo.png#top': 'https://cdn.example.com/logo.png',
+}
+
+
+@pytest.fixture(scope='module')
+def hrefs(standin_pages):
+    """Every link and sitemap location in the stand-in corpus"""
+    found = set()
+    for body in standin_pages.values():
+        found.update(match.decode('utf-8') for match in HREF.findall(body))
+    return sorted(found)
+
+
+def variants(url):
+    """Spellings of a site URL that name the same page"""
+    parts = urlsplit(url)
+    path = parts.path or '/'
+    query = parts.query
+    tracked = '&'.join(filter(None, [query, 'utm_source=newsletter', 'ref=producthunt']))
+    yield path + (f'?{query}' if query else '')
+    for origin in ('https://aiagentslist.com', 'http://www.aiagentslist.com:80', 'https://AI-Agents.30tools.com'):
+        yield origin + path + (f'?{query}' if query else '')
+    yield f"{path.upper()}{'/' if path != '/' else ''}?{tracked}#reviews"
+    yield f"  https://www.aiagentslist.com{path}/?{tracked}  "
+
+
+@pytest.mark.parametrize('base_url', BASE_URLS)
+def test_canonical_url_is_idempotent(hrefs, base_url):
+    for href in hrefs + list(EXTERNAL):
+        canonical = canonical_url(href, base_url)
+        assert canonical_url(canonical, base_url) == canonical, href
+
+
+@pytest.mark.parametrize('base_url', BASE_URLS)
+def test_site_variants_fold_together(hrefs, base_url):
+    site = [href for href in hrefs if not urlsplit(href).netloc or urlsplit(href).netloc.endswith('aiagentslist.com')]
+    assert site
+    for href in site:
+        forms = {canonical_url(variant, base_url) for variant in variants(href)}
+        assert len(forms) == 1, (href, forms)
+        canonical = forms.pop()
+        assert canonical_url(canonical, base_url) == canonical
+        assert urlsplit(canonical).netloc == urlsplit(base_url).netloc
+        if '/agent/' in href:
+            assert agent_key(canonical) == agent_key(href)
+
+
+def test_external_urls_keep_all_but_the_fragment():
+    for url, expected in EXTERNAL.items():
+        assert canonical_url(url, BASE_URLS[0]) == expected
+
+
+def test_canonicalizer_counts_folded_variants(hrefs):
+    urls = URLCanonicalizer()
+    agent_paths = [href for href in hrefs if href.startswith('/agent/')]
+    for href in agent_paths:
+        for variant in variants(href):
+            urls.canonical(variant, BASE_URLS[0])
+    stats = urls.stats()
+    assert stats['canonical_urls'] == len(agent_paths)
+    # Canonical forms fed back in are not new variants
+    for canonical in list(urls.variants):
+        assert urls.canonical(canonical, BASE_URLS[0]) == canonical
+    assert urls.stats()['canonical_urls'] == len(agent_paths)
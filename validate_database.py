@@ -1,102 +1,134 @@
 #!/usr/bin/env python3
 """
 Validate and summarize the AI agents database.
+Agents are streamed from the file and every statistic is gathered in one pass;
+--report writes the full machine-readable report and --strict fails the run
+on schema violations, duplicates or metadata mismatches.
 """
 
+import argparse
 import json
 import os
-from collections import Counter
+import sys
+
+from scraping.db_writer import atomic_write
+from scraping.validation import validation_report
+
+DEFAULT_DATABASE = os.path.join("data", "ai_agents_database.json")
+
+def print_report(report):
+    """Human-readable summary of a validation report"""
+    total = report['total_agents']
 
-def validate_database():
-    """Validate and provide summary of the scraped AI agents database"""
-    
-    db_path = "./data/ai_agents_database.json"
-    
-    if not os.path.exists(db_path):
-        print("❌ Database file not found!")
-        return
-    
-    try:
-        with open(db_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-    except Exception as e:
-        print(f"❌ Error reading database: {e}")
-        return
-    
     print("🎉 AI AGENTS DATABASE VALIDATION REPORT")
     print("=" * 50)
-    
+
     # Metadata validation
-    if 'metadata' in data:
-        metadata = data['metadata']
+    metadata = report['metadata']
+    if metadata:
         print(f"📊 Scraping Date: {metadata.get('scraped_at', 'Unknown')}")
         print(f"📊 Total Agents: {metadata.get('total_agents', 'Unknown')}")
         print(f"📊 Total Categories: {metadata.get('total_categories', 'Unknown')}")
         print(f"📊 Source URL: {metadata.get('source_url', 'Unknown')}")
         print(f"📊 Scraper Version: {metadata.get('scraper_version', 'Unknown')}")
-    
+
     print("\n" + "=" * 50)
-    
+
     # Categories validation
-    if 'categories' in data:
-        categories = data['categories']
-        print(f"📁 Categories Found: {len(categories)}")
-        
-        # Sort categories by count
-        sorted_categories = sorted(categories, key=lambda x: x.get('count', 0), reverse=True)
+    if report['total_categories'] is not None:
+        print(f"📁 Categories Found: {report['total_categories']}")
         print("\n🏆 Top Categories by Agent Count:")
-        for i, cat in enumerate(sorted_categories[:10], 1):
-            print(f"  {i:2d}. {cat.get('name', 'Unknown'):20} - {cat.get('count', 0):3d} agents")
-    
+        for i, cat in enumerate(report['top_categories'], 1):
+            print(f"  {i:2d}. {cat['name'] or 'Unknown':20} - {cat['count'] or 0:3d} agents")
+
     print("\n" + "=" * 50)
-    
+
     # Agents validation
-    if 'agents' in data:
-        agents = data['agents']
-        print(f"🤖 Total Agents: {len(agents)}")
-        
-        # Check data completeness
-        agents_with_details = sum(1 for agent in agents if 'detailed_title' in agent)
-        agents_with_pricing = sum(1 for agent in agents if 'pricing' in agent and agent['pricing'])
-        agents_with_tags = sum(1 for agent in agents if 'tags' in agent and agent['tags'])
-        agents_with_external_links = sum(1 for agent in agents if 'external_links' in agent and agent['external_links'])
-        
-        print(f"\n📈 Data Completeness:")
-        print(f"  • Agents with detailed info: {agents_with_details:3d} ({agents_with_details/len(agents)*100:.1f}%)")
-        print(f"  • Agents with pricing info: {agents_with_pricing:3d} ({agents_with_pricing/len(agents)*100:.1f}%)")
-        print(f"  • Agents with tags:         {agents_with_tags:3d} ({agents_with_tags/len(agents)*100:.1f}%)")
-        print(f"  • Agents with external links: {agents_with_external_links:3d} ({agents_with_external_links/len(agents)*100:.1f}%)")
-        
-        # Pricing analysis
-        pricing_counter = Counter()
-        for agent in agents:
-            pricing = agent.get('pricing', 'Unknown')
-            if pricing:
-                pricing_counter[pricing] += 1
-        
-        print(f"\n💰 Pricing Distribution:")
-        for pricing, count in pricing_counter.most_common():
-            print(f"  • {pricing:15} - {count:3d} agents ({count/len(agents)*100:.1f}%)")
-        
-        # Sample agent data
+    print(f"🤖 Total Agents: {total}")
+
+    completeness = report['completeness']
+    print(f"\n📈 Data Completeness:")
+    for field in ('detailed_title', 'pricing', 'tags', 'external_links', 'categories'):
+        print(f"  • {field + ':':16} {completeness[field]['count']:5d} ({completeness[field]['percent']:.1f}%)")
+
+    print(f"\n💰 Pricing Distribution:")
+    for pricing, count in report['pricing'].items():
+        print(f"  • {pricing:15} - {count:3d} agents ({count/total*100:.1f}%)")
+
+    if report['agents_per_category']:
+        print(f"\n📂 Scraped Agents per Category:")
+        for category, count in list(report['agents_per_category'].items())[:10]:
+            print(f"  • {category:25} - {count:3d} agents")
+
+    # Sample agent data
+    sample = report['sample_agent']
+    if sample:
         print(f"\n🔍 Sample Agent (First Entry):")
-        if agents:
-            sample = agents[0]
-            print(f"  • Name: {sample.get('name', 'Unknown')}")
-            print(f"  • Title: {sample.get('title', 'Unknown')}")
-            print(f"  • URL: {sample.get('url', 'Unknown')}")
-            print(f"  • Pricing: {sample.get('pricing', 'Unknown')}")
-            print(f"  • Categories: {len(sample.get('categories', []))} categories")
-            if 'tags' in sample and sample['tags']:
-                print(f"  • Tags: {len(sample['tags'])} tags")
-                print(f"    Example tags: {', '.join(sample['tags'][:5])}")
-    
+        print(f"  • Name: {sample.get('name', 'Unknown')}")
+        print(f"  • Title: {sample.get('title', 'Unknown')}")
+        print(f"  • URL: {sample.get('url', 'Unknown')}")
+        print(f"  • Pricing: {sample.get('pricing', 'Unknown')}")
+        print(f"  • Categories: {len(sample.get('categories', []))} categories")
+        if sample.get('tags'):
+            print(f"  • Tags: {len(sample['tags'])} tags")
+            print(f"    Example tags: {', '.join(sample['tags'][:5])}")
+
     print("\n" + "=" * 50)
-    print("✅ DATABASE VALIDATION COMPLETE")
-    
+
+    # Problems
+    duplicates = report['duplicates']
+    violations = report['schema_violations']
+    for error in report['structure_errors']:
+        print(f"⚠️  {error}")
+    if duplicates['names'] or duplicates['urls']:
+        print(f"⚠️  Duplicate names: {len(duplicates['names'])}, duplicate URLs: {len(duplicates['urls'])}")
+    if violations['count']:
+        rules = ', '.join(f"{rule} {count}" for rule, count in violations['by_rule'].items())
+        print(f"⚠️  Schema violations: {violations['count']} ({rules})")
+
+    if report['valid']:
+        print("✅ DATABASE VALIDATION COMPLETE")
+    else:
+        print("❌ DATABASE VALIDATION FOUND PROBLEMS")
+
     # File size info
-    file_size = os.path.getsize(db_path) / (1024 * 1024)  # MB
-    print(f"📁 Database File Size: {file_size:.2f} MB")
+    print(f"📁 Database File Size: {report['size_bytes'] / (1024 * 1024):.2f} MB")
+
+def validate_database(db_path=DEFAULT_DATABASE, report_path=None):
+    """Validate and provide summary of the scraped AI agents database"""
+
+    if not os.path.exists(db_path):
+        print("❌ Database file not found!")
+        return None
+
+    try:
+        report = validation_report(db_path)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error reading database: {e}")
+        return None
+
+    print_report(report)
+
+    if report_path:
+        atomic_write(report_path, [json.dumps(report, indent=2, ensure_ascii=False), '\n'])
+        print(f"📝 Report written to {report_path}")
+
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate and summarize the AI agents database")
+    parser.add_argument('database', nargs='?', default=DEFAULT_DATABASE)
+    parser.add_argument('--report', metavar='PATH', help="write the full report as JSON")
+    parser.add_argument('--strict', action='store_true',
+                        help="exit non-zero if the database has any problems")
+    args = parser.parse_args()
+
+    report = validate_database(args.database, args.report)
+    if report is None:
+        return 2
+    if args.strict and not report['valid']:
+        return 1
+    return 0
 
 if __name__ == "__main__":
-    validate_database()
+    sys.exit(main())